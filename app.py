@@ -1,14 +1,22 @@
 import streamlit as st
 from modules import (
+    admin_analytics,
     ai_simulator,
     dashboard,
     data_management,
     fertilizer_processing,
+    guide,
     maggot_cultivation,
+    metrics,
+    performance_monitor,
+    plant_allocation,
+    profiler,
+    session_memory,
     plastic_upcycling,
     prediction_dashboard,
     price_settings,
     pyrolysis,
+    static_assets,
     transformation,
     waste_input,
 )
@@ -21,49 +29,16 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for "Green Gold" Aesthetics
-st.markdown("""
-<style>
-    :root {
-        --primary-color: #2E7d32; /* Green Gold */
-        --secondary-color: #F9A825; /* Gold */
-        --background-color: #F1F8E9; /* Light Green */
-    }
-    .main .block-container {
-        padding-top: 2rem;
-        padding-bottom: 2rem;
-    }
-    h1, h2, h3 {
-        color: #1B5E20;
-        font-family: 'Helvetica Neue', sans-serif;
-    }
-    .stButton>button {
-        background-color: #2E7d32;
-        color: white;
-        border-radius: 20px;
-        border: none;
-        padding: 10px 24px;
-        transition: all 0.3s ease;
-    }
-    .stButton>button:hover {
-        background-color: #1B5E20;
-        transform: translateY(-2px);
-        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-    }
-    .metric-card {
-        background-color: white;
-        padding: 20px;
-        border-radius: 10px;
-        box-shadow: 0 2px 5px rgba(0,0,0,0.05);
-        border-left: 5px solid #2E7d32;
-    }
-</style>
-""", unsafe_allow_html=True)
+# "Green Gold" theme: one local stylesheet for every page (static/app.css)
+static_assets.inject_css()
 
-# Check Authentication Status
+# Check Authentication Status (a signed token in the URL survives refreshes)
 if 'logged_in' not in st.session_state:
     st.session_state['logged_in'] = False
 
+from modules import auth_service
+auth_service.restore_session()
+
 if not st.session_state['logged_in']:
     from modules import login_page
     login_page.show()
@@ -73,7 +48,7 @@ else:
     
     # Sidebar
     with st.sidebar:
-        st.image("https://img.icons8.com/color/96/000000/recycle-sign.png", width=80)
+        static_assets.logo(width=80)
         st.title("AgriSensa Hub")
         
         # User Profile Widget
@@ -95,109 +70,57 @@ else:
                 "Pengaturan Harga",
                 "Upcycling: Plastik ke Filamen",
                 "Energy: Pyrolysis (Plastik BBM)",
+                "Optimasi Alokasi Pabrik",
                 "AI Logic: Strategic Simulator",
                 "Manajemen Data & Laporan",
                 "Panduan 5R",
-            ],
+            ] + ([
+                "Admin: Analitik Petugas & Unit",
+                "Admin: Monitoring Performa",
+            ] if auth_service.is_admin() else []),
             index=0
         )
         
         st.markdown("---")
-        from modules import auth_service
+        st.caption("🔒 URL halaman ini memuat token login. Jangan dibagikan; logout di perangkat bersama.")
         if st.button("🚪 Logout", use_container_width=True):
             auth_service.logout()
             st.rerun()
             
         st.caption("© 2026 AgriSensa - Circular Economy")
 
-    # Router
-    if menu == "Dashboard Utama":
-        dashboard.show()
-    elif menu == "Input Sampah (Pilah)":
-        waste_input.show()
-    elif menu == "Simulasi Live & Prediksi":
-        prediction_dashboard.show()
-    elif menu == "Kalkulator Nilai Ekonomi":
-        transformation.show()
-    elif menu == "Pupuk Organik Premium":
-        fertilizer_processing.show()
-        
-    elif menu == "Budidaya Maggot BSF":
-         maggot_cultivation.show()
-    
-    elif menu == "Pengaturan Harga":
-        price_settings.show()
-    elif menu == "Upcycling: Plastik ke Filamen":
-        plastic_upcycling.show()
-    
-    elif menu == "Energy: Pyrolysis (Plastik BBM)":
-        pyrolysis.show()
-        
-    elif menu == "AI Logic: Strategic Simulator":
-        ai_simulator.show()
-    
-    elif menu == "Manajemen Data & Laporan":
-        data_management.show()
-    
-    elif menu == "Panduan 5R":
-        st.title("Panduan Pembuangan Sampah")
-        st.markdown("Berikut adalah panduan visual klasifikasi sampah (Standard Acuan).")
-        
-        try:
-            st.image("assets/guide_ref.jpg", caption="Panduan Klasifikasi Sampah Rumah Tangga", use_column_width=True)
-        except:
-            st.warning("Gambar panduan belum dimuat. Pastikan file 'assets/guide_ref.jpg' tersedia.")
-
-        st.markdown("### Prinsip 5R: Menuju Nol Limbah")
-        st.info("Penerapan pola pikir sirkular untuk meminimalkan dampak lingkungan.")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            with st.expander("1. Refuse (Tolak) 🚫", expanded=True):
-                st.markdown("""
-                **Definisi:** Menolak barang yang tidak perlu atau berpotensi menjadi sampah sulit urai.
-                - **Contoh:** 
-                    - Tolak kantong plastik saat belanja, gunakan tas kain.
-                    - Tolak sedotan plastik di restoran.
-                    - Tolak brosur/spam mail fisik jika tersedia versi digital.
-                """)
-
-            with st.expander("2. Reduce (Kurangi) 📉", expanded=True):
-                st.markdown("""
-                **Definisi:** Mengurangi konsumsi sumber daya dan penggunaan barang sekali pakai.
-                - **Contoh:**
-                    - Beli produk dalam kemasan besar (bulk) untuk kurangi sampah sachet.
-                    - Kurangi penggunaan kertas dengan mencetak bolak-balik.
-                    - Hemat energi dan air di rumah.
-                """)
-
-            with st.expander("3. Reuse (Gunakan Kembali) 🔄", expanded=True):
-                st.markdown("""
-                **Definisi:** Menggunakan kembali barang untuk fungsi yang sama atau berbeda tanpa mengubah bentuk drastis.
-                - **Contoh:**
-                    - Gunakan botol kaca bekas selai untuk wadah bumbu.
-                    - Sumbangkan pakaian layak pakai alih-alih membuangnya.
-                    - Gunakan baterai isi ulang (rechargeable).
-                """)
-
-        with col2:
-            with st.expander("4. Repurpose (Alih Fungsi) 🎨", expanded=True):
-                st.markdown("""
-                **Definisi:** Memodifikasi barang bekas untuk kegunaan baru yang kreatif (Upcycling).
-                - **Contoh:**
-                    - Ban bekas disulap menjadi kursi atau pot tanaman.
-                    - Kulit buah jeruk diolah menjadi eco-enzyme pembersih lantai.
-                    - Kaos bekas dijadikan kain lap atau tote bag.
-                """)
-
-            with st.expander("5. Recycle (Daur Ulang) ♻️", expanded=True):
-                st.markdown("""
-                **Definisi:** Mengolah sampah menjadi bahan baku baru melalui proses industri atau pengomposan.
-                - **Contoh:**
-                    - **Bank Sampah:** Setor botol PET untuk dilebur jadi bijih plastik.
-                    - **Kompos:** Olah sisa makanan menjadi pupuk organik (Emas Hijau).
-                    - **Kertas:** Daur ulang kardus bekas menjadi bubur kertas.
-                """)
-        
-        st.success("Mulai dari langkah kecil: **Pilah Sampahmu dari Rumah!**")
+    # Router (each render is timed into the metrics registry, and profiled when enabled)
+    with metrics.timer("page_render_seconds", page=menu):
+        with profiler.profile_render(menu, st.session_state.get('user_info', {}).get('email')):
+            if menu == "Dashboard Utama":
+                dashboard.show()
+            elif menu == "Input Sampah (Pilah)":
+                waste_input.show()
+            elif menu == "Simulasi Live & Prediksi":
+                prediction_dashboard.show()
+            elif menu == "Kalkulator Nilai Ekonomi":
+                transformation.show()
+            elif menu == "Pupuk Organik Premium":
+                fertilizer_processing.show()
+            elif menu == "Budidaya Maggot BSF":
+                maggot_cultivation.show()
+            elif menu == "Pengaturan Harga":
+                price_settings.show()
+            elif menu == "Upcycling: Plastik ke Filamen":
+                plastic_upcycling.show()
+            elif menu == "Energy: Pyrolysis (Plastik BBM)":
+                pyrolysis.show()
+            elif menu == "Optimasi Alokasi Pabrik":
+                plant_allocation.show()
+            elif menu == "AI Logic: Strategic Simulator":
+                ai_simulator.show()
+            elif menu == "Manajemen Data & Laporan":
+                data_management.show()
+            elif menu == "Panduan 5R":
+                guide.show()
+            elif menu == "Admin: Analitik Petugas & Unit":
+                admin_analytics.show()
+            elif menu == "Admin: Monitoring Performa":
+                performance_monitor.show()
+    session_memory.track()
+    metrics.maybe_flush()
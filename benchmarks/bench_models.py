@@ -0,0 +1,105 @@
+"""Process-model throughput benchmarks.
+
+Evaluates each model of modules/process_models.py on a batch of random
+scenarios, both as a raw vectorized call and through evaluate() (which also
+builds the result table), and reports scenarios per second (best of a few
+repeats). Exits non-zero when a throughput falls below its budget.
+
+    python benchmarks/bench_models.py                        # 10k scenarios, all models
+    python benchmarks/bench_models.py --scenarios 1000000 --models pyrolysis
+    python benchmarks/bench_models.py --write-budgets        # record current results as budgets
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+BUDGETS_FILE = os.path.join(BENCH_DIR, "model_budgets.json")
+sys.path.insert(0, REPO_DIR)
+from modules import process_models  # noqa: E402
+
+DEFAULT_SCENARIOS = 10_000
+REPEATS = 5
+BUDGET_HEADROOM = 3.0  # --write-budgets allows throughput down to a third of the measured value
+
+# Parameter ranges the random scenarios are drawn from (uniform)
+RANGES = {
+    'pyrolysis': {'input_plastic_kg': (50, 1000), 'target_temp': (300, 500), 'price_oil': (8000, 16000),
+                  'price_char': (1000, 3000)},
+    'maggot': {'waste_input_daily': (10, 500), 'price_fresh': (4000, 8000), 'price_dried': (30000, 60000),
+               'price_kasgot': (500, 1500)},
+    'compost': {'input_waste_kg': (100, 5000), 'price_solid': (1500, 3500), 'price_liquid': (10000, 20000),
+                'ratio_liquid': (0, 50), 'total_opex': (500_000, 2_000_000)},
+    'compost_maturity': {'days_running': (-5, 40)},
+    'upcycling': {'input_qty': (0.1, 50), 'pet_price_raw': (3000, 8000), 'filament_price': (100000, 200000)},
+}
+
+def scenarios(model, n, seed=0):
+    rng = np.random.default_rng(seed)
+    return {k: rng.uniform(lo, hi, n) for k, (lo, hi) in RANGES[model].items()}
+
+def best_rate(func, n, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+def measure(model, n, repeats=REPEATS):
+    params = scenarios(model, n)
+    func = process_models.MODELS[model]
+    return {
+        "call_per_s": round(best_rate(lambda: func(**params), n, repeats)),
+        "evaluate_per_s": round(best_rate(lambda: process_models.evaluate(model, params), n, repeats)),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--models", nargs="+", default=list(RANGES), choices=list(RANGES))
+    parser.add_argument("--scenarios", type=int, default=DEFAULT_SCENARIOS)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--budgets", default=BUDGETS_FILE)
+    parser.add_argument("--write-budgets", action="store_true", help="store current results (minus headroom) as budgets")
+    args = parser.parse_args(argv)
+
+    budgets = {}
+    if os.path.exists(args.budgets):
+        with open(args.budgets) as f:
+            budgets = json.load(f)
+
+    size = str(args.scenarios)
+    results, failures = {}, []
+    print(f"{'model':<20}{'scenarios':>11}{'call/s':>14}{'evaluate/s':>14}  status")
+    for model in args.models:
+        result = measure(model, args.scenarios, args.repeats)
+        results[model] = result
+        budget = budgets.get(model, {}).get(size, {})
+        under = [k for k, floor in budget.items() if result.get(k, 0) < floor]
+        if under:
+            failures.append((model, under))
+        status = f"UNDER BUDGET: {', '.join(under)}" if under else "ok"
+        print(f"{model:<20}{args.scenarios:>11,}{result['call_per_s']:>14,}{result['evaluate_per_s']:>14,}  {status}", flush=True)
+
+    if args.write_budgets:
+        for model, result in results.items():
+            budgets.setdefault(model, {})[size] = {k: int(v / BUDGET_HEADROOM) for k, v in result.items()}
+        with open(args.budgets, "w") as f:
+            json.dump(budgets, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Budgets written to {args.budgets}")
+        return 0
+
+    if failures:
+        print(f"\n{len(failures)} regression(s):")
+        for model, under in failures:
+            print(f"  {model}: {', '.join(under)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""Headless page-latency benchmarks.
+
+Drives each page's show() through Streamlit's AppTest against working
+directories seeded with N transactions, recording cold (first) and warm
+(median of later reruns) render time plus the peak RSS of the process.
+Each (page, size) runs in a fresh subprocess so caches never leak between
+measurements. Exits non-zero when a result exceeds its budget.
+
+    python benchmarks/bench_pages.py                      # 10k + 100k, all pages
+    python benchmarks/bench_pages.py --sizes 1000000 --pages dashboard
+    python benchmarks/bench_pages.py --write-budgets      # record current results as budgets
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+CACHE_DIR = os.path.join(BENCH_DIR, ".cache")
+BUDGETS_FILE = os.path.join(BENCH_DIR, "budgets.json")
+
+PAGES = [
+    "dashboard", "waste_input", "data_management", "prediction_dashboard", "transformation",
+    "ai_simulator", "fertilizer_processing", "maggot_cultivation", "plastic_upcycling",
+    "pyrolysis", "plant_allocation", "price_settings", "guide",
+]
+DEFAULT_SIZES = [10_000, 100_000]
+WARM_RUNS = 3
+BUDGET_HEADROOM = 1.5  # --write-budgets allows 50% over the measured value
+MIN_BUDGET_SECONDS = 0.1  # ...but never less than this, so near-zero reruns don't flake
+SEED_VERSION = "v3"  # bump when seed.py changes the generated data
+BENCH_USER = {"name": "Petugas 1", "email": "petugas1@bench.local", "role": "admin"}
+
+SCRIPT = """
+import streamlit as st
+st.session_state.setdefault('logged_in', True)
+st.session_state.setdefault('user_info', {user!r})
+from modules import {page}
+{page}.show()
+"""
+
+def seeded_dir(size):
+    """Working directory seeded with `size` transactions (built once, then reused)."""
+    directory = os.path.join(CACHE_DIR, f"seed-{SEED_VERSION}-{size}")
+    marker = os.path.join(directory, ".complete")
+    if not os.path.exists(marker):
+        import shutil
+        shutil.rmtree(directory, ignore_errors=True)
+        start = time.perf_counter()
+        # In a subprocess: workers forked from a parent that held the seed data
+        # would inherit its peak RSS (ru_maxrss survives fork and exec)
+        subprocess.run([sys.executable, os.path.join(BENCH_DIR, "seed.py"), directory, str(size)],
+                       check=True, capture_output=True, cwd=REPO_DIR)
+        open(marker, "w").close()
+        print(f"  seeded {size:,} transactions in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return directory
+
+def run_worker(page, directory, warm_runs):
+    """Measure one page in this process (called in the subprocess)."""
+    sys.path.insert(0, REPO_DIR)
+    os.chdir(directory)
+    from streamlit.testing.v1 import AppTest
+
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    at = AppTest.from_string(SCRIPT.format(page=page, user=BENCH_USER), default_timeout=600)
+    start = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - start
+    warm = []
+    for _ in range(warm_runs):
+        start = time.perf_counter()
+        at.run()
+        warm.append(time.perf_counter() - start)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "cold_s": round(cold, 4),
+        "warm_s": round(statistics.median(warm), 4) if warm else None,
+        "peak_rss_mb": round(peak_kb / 1024, 1),
+        "rss_growth_mb": round((peak_kb - baseline_kb) / 1024, 1),
+        "exceptions": [e.message for e in at.exception],
+    }
+
+def measure(page, size, warm_runs):
+    directory = seeded_dir(size)
+    proc = subprocess.run(
+        [sys.executable, __file__, "--worker", page, directory, "--warm-runs", str(warm_runs)],
+        capture_output=True, text=True, cwd=REPO_DIR
+    )
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "worker failed"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def check_budget(result, budget):
+    """Names of the metrics above their budget."""
+    return [k for k, limit in budget.items() if result.get(k) is not None and result[k] > limit]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", nargs="+", default=PAGES, choices=PAGES)
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--warm-runs", type=int, default=WARM_RUNS)
+    parser.add_argument("--budgets", default=BUDGETS_FILE)
+    parser.add_argument("--write-budgets", action="store_true", help="store current results (plus headroom) as budgets")
+    parser.add_argument("--output", help="write all results as JSON")
+    parser.add_argument("--worker", nargs=2, metavar=("PAGE", "DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(*args.worker, args.warm_runs)))
+        return 0
+
+    budgets = {}
+    if os.path.exists(args.budgets):
+        with open(args.budgets) as f:
+            budgets = json.load(f)
+
+    results, failures = {}, []
+    print(f"{'page':<24}{'size':>10}{'cold s':>9}{'warm s':>9}{'peak MB':>9}  status")
+    for size in args.sizes:
+        for page in args.pages:
+            result = measure(page, size, args.warm_runs)
+            results.setdefault(page, {})[str(size)] = result
+            if "error" in result or result["exceptions"]:
+                status = f"ERROR {result.get('error') or result['exceptions'][0]}"
+                failures.append((page, size, ["error"]))
+            else:
+                over = check_budget(result, budgets.get(page, {}).get(str(size), {}))
+                status = f"OVER BUDGET: {', '.join(over)}" if over else "ok"
+                if over:
+                    failures.append((page, size, over))
+            print(f"{page:<24}{size:>10,}{result.get('cold_s', 0):>9.2f}{result.get('warm_s') or 0:>9.2f}"
+                  f"{result.get('peak_rss_mb', 0):>9.0f}  {status}", flush=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.write_budgets:
+        for page, by_size in results.items():
+            for size, result in by_size.items():
+                if "error" not in result:
+                    budget = {k: round(result[k] * BUDGET_HEADROOM, 2) for k in ("cold_s", "warm_s", "peak_rss_mb")}
+                    for k in ("cold_s", "warm_s"):
+                        budget[k] = max(budget[k], MIN_BUDGET_SECONDS)
+                    budgets.setdefault(page, {})[size] = budget
+        with open(args.budgets, "w") as f:
+            json.dump(budgets, f, indent=2, sort_keys=True)
+        print(f"Budgets written to {args.budgets}")
+        return 0
+
+    if failures:
+        print(f"\n{len(failures)} regression(s):")
+        for page, size, over in failures:
+            print(f"  {page} @ {size:,}: {', '.join(over)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
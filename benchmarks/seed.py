@@ -0,0 +1,192 @@
+"""Realistic synthetic transaction generator for load tests and benchmarks.
+
+Creates a working directory (users.db + data/units/*.db) holding N
+transactions with:
+  - per-category presence/weight mixes over the price_service categories,
+  - weekly seasonality (weekend collection days) and slow growth,
+  - power-law (Zipf) visit frequency per customer,
+  - several units and officers,
+  - totals priced with price_service prices (buy/sell of each category).
+
+    python benchmarks/seed.py /tmp/bank-1m 1000000
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modules import auth_db, price_service, rollup_service, unit_store  # noqa: E402
+
+# Category -> (share of deposits containing it, median kg when present)
+CATEGORY_MIX = {
+    'Paper': (0.55, 2.0), 'PET_Bottles': (0.50, 0.8), 'Plastic_Marks': (0.45, 1.0),
+    'Cans': (0.25, 0.4), 'Burnable': (0.20, 1.5), 'Glass_Bottles': (0.15, 1.5),
+    'Metal_Small': (0.12, 0.8), 'Cloth': (0.10, 1.0), 'White_Trays': (0.10, 0.3),
+    'Electronics': (0.03, 1.5), 'Hazardous': (0.02, 0.2),
+}
+WEIGHT_SIGMA = 0.7  # lognormal spread of a category's weight
+WEEKDAY_WEIGHTS = [0.8, 0.9, 0.9, 1.0, 1.1, 1.8, 1.5]  # Mon..Sun, weekend collection days
+ANNUAL_GROWTH = 0.15
+ZIPF_EXPONENT = 1.1
+UNIT_SHARES = [0.5, 0.25, 0.25]
+OFFICERS_PER_UNIT = 3
+CUSTOMERS_PER_UNIT = 5000
+DAYS = 730
+CHUNK = 100_000
+
+HONORIFICS = ["Bu", "Pak", "Mbak", "Mas"]
+FIRST_NAMES = ["Siti", "Budi", "Ani", "Joko", "Dewi", "Agus", "Rina", "Eko", "Sri", "Wahyu",
+               "Yuni", "Hadi", "Lestari", "Bambang", "Ratna", "Tono", "Wati", "Rudi", "Nur", "Dian"]
+LAST_NAMES = ["Santoso", "Wijaya", "Saputra", "Lestari", "Hidayat", "Kusuma", "Pratama", "Utami",
+              "Nugroho", "Rahayu", "Setiawan", "Purnomo", "Susanti", "Gunawan", "Handayani"]
+
+def officer_names(unit_index):
+    first = unit_index * OFFICERS_PER_UNIT + 1
+    return [f"Petugas {i}" for i in range(first, first + OFFICERS_PER_UNIT)]
+
+def customer_names(rng, n):
+    """Distinct 'Bu Siti Santoso RT 05'-style names."""
+    names, seen = [], set()
+    while len(names) < n:
+        name = (f"{HONORIFICS[rng.integers(len(HONORIFICS))]} {FIRST_NAMES[rng.integers(len(FIRST_NAMES))]} "
+                f"{LAST_NAMES[rng.integers(len(LAST_NAMES))]} RT {rng.integers(1, 21):02d}")
+        key = unit_store.nasabah_key(name)
+        if key in seen:
+            name = f"{name} RW {len(names) % 9 + 1:02d}"
+            key = unit_store.nasabah_key(name)
+            if key in seen:
+                continue
+        seen.add(key)
+        names.append(name)
+    return names
+
+def day_probabilities(days):
+    """Probability of each of the last `days` days (oldest first)."""
+    today = datetime.date.today()
+    dates = [today - datetime.timedelta(days=days - 1 - i) for i in range(days)]
+    weekday = np.array([WEEKDAY_WEIGHTS[d.weekday()] for d in dates])
+    growth = (1 + ANNUAL_GROWTH) ** (np.arange(days) / 365)
+    p = weekday * growth
+    return dates, p / p.sum()
+
+def zipf_probabilities(n):
+    p = 1.0 / np.arange(1, n + 1) ** ZIPF_EXPONENT
+    return p / p.sum()
+
+def generate(rng, n, prices, dates, day_p, customer_p):
+    """Column arrays for n deposits of one unit."""
+    categories = list(auth_db.CATEGORY_COLUMNS.values())
+    present = np.column_stack([rng.random(n) < CATEGORY_MIX[c][0] for c in categories])
+    # Every deposit carries at least one category
+    empty = ~present.any(axis=1)
+    present[empty, rng.integers(0, len(categories), empty.sum())] = True
+    medians = np.array([CATEGORY_MIX[c][1] for c in categories])
+    weights = np.round(rng.lognormal(np.log(medians), WEIGHT_SIGMA, (n, len(categories))) * present, 2)
+    buy = np.array([prices[c]['buy'] for c in categories])
+    sell = np.array([prices[c]['sell'] for c in categories])
+    paid = np.rint(weights @ buy).astype(np.int64)
+    revenue = np.rint(weights @ sell).astype(np.int64)
+    day = rng.choice(len(dates), n, p=day_p)
+    order = np.argsort(day, kind="stable")  # insert chronologically, like the real counter
+    return {
+        "day": day[order],
+        "customer": rng.choice(len(customer_p), n, p=customer_p)[order],
+        "seconds": rng.integers(7 * 3600, 16 * 3600, n)[order],
+        "weights": weights[order],
+        "total_kg": weights.sum(axis=1).round(2)[order],
+        "paid": paid[order],
+        "revenue": revenue[order],
+    }
+
+def seed(directory, n_transactions, random_seed=42, days=DAYS, customers=CUSTOMERS_PER_UNIT):
+    """Create `directory` with users.db and unit partitions holding `n_transactions` rows."""
+    os.makedirs(directory, exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        auth_db.init_db()
+        prices = price_service.load_prices()
+        rng = np.random.default_rng(random_seed)
+        dates, day_p = day_probabilities(days)
+        customer_p = zipf_probabilities(customers)
+        counts = rng.multinomial(n_transactions, UNIT_SHARES)
+        for unit_index, (lokasi, n) in enumerate(zip(unit_store.UNITS, counts)):
+            conn = unit_store.get_unit_connection(lokasi)
+            try:
+                _load_unit(conn, lokasi, officer_names(unit_index), customer_names(rng, customers),
+                           int(n), rng, prices, dates, day_p, customer_p)
+            finally:
+                conn.close()
+        # Recreate the indexes dropped for the load
+        unit_store.init_partitions()
+        # The app keeps its rollups current as deposits arrive
+        rollup_service.refresh(force=True)
+    finally:
+        os.chdir(cwd)
+
+def _load_unit(conn, lokasi, officers, names, n, rng, prices, dates, day_p, customer_p):
+    conn.execute("PRAGMA journal_mode=MEMORY")
+    conn.execute("PRAGMA synchronous=OFF")
+    for index in ("idx_transactions_petugas", "idx_transactions_tanggal", "idx_transactions_nasabah"):
+        conn.execute(f"DROP INDEX IF EXISTS {index}")
+
+    weight_cols = list(auth_db.CATEGORY_COLUMNS)
+    columns = ["timestamp", "tanggal", "nasabah", "nasabah_id", "petugas", "lokasi", *weight_cols,
+               "total_kg", "total_paid", "total_revenue", "profit"]
+    sql = f"INSERT INTO transactions ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    day_text = [d.isoformat() for d in dates]
+    officer_p = rng.dirichlet(np.full(len(officers), 5.0))
+
+    conn.execute("BEGIN")
+    first_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM nasabah").fetchone()[0] + 1
+    conn.executemany(
+        "INSERT INTO nasabah (nama, nama_key, rt_rw) VALUES (?, ?, ?)",
+        [(name, unit_store.nasabah_key(name), unit_store.rt_rw_tags(name)) for name in names]
+    )
+    for start in range(0, n, CHUNK):
+        size = min(CHUNK, n - start)
+        cols = generate(rng, size, prices, dates, day_p, customer_p)
+        officer = rng.choice(len(officers), size, p=officer_p)
+        tanggal = [day_text[d] for d in cols["day"].tolist()]
+        timestamp = [f"{t} {s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}" for t, s in zip(tanggal, cols["seconds"].tolist())]
+        customer = cols["customer"].tolist()
+        rows = zip(
+            timestamp, tanggal, [names[c] for c in customer], [first_id + c for c in customer],
+            [officers[o] for o in officer.tolist()], [lokasi] * size,
+            *cols["weights"].T.tolist(), cols["total_kg"].tolist(),
+            cols["paid"].tolist(), cols["revenue"].tolist(), (cols["revenue"] - cols["paid"]).tolist()
+        )
+        conn.executemany(sql, rows)
+
+    # Balances and ledger in one set-based pass instead of per-row posting
+    conn.execute(
+        "INSERT INTO nasabah_ledger (nasabah_id, transaction_id, timestamp, jenis, amount, saldo_after) "
+        "SELECT nasabah_id, id, timestamp, 'setor', total_paid, "
+        "SUM(total_paid) OVER (PARTITION BY nasabah_id ORDER BY id) FROM transactions"
+    )
+    conn.execute(
+        "UPDATE nasabah SET saldo = t.saldo, total_kg = t.kg, jumlah_transaksi = t.n, last_transaction_at = t.last "
+        "FROM (SELECT nasabah_id, SUM(total_paid) AS saldo, SUM(total_kg) AS kg, COUNT(*) AS n, MAX(timestamp) AS last "
+        "FROM transactions GROUP BY nasabah_id) AS t WHERE nasabah.id = t.nasabah_id"
+    )
+    conn.execute("COMMIT")
+    conn.execute("PRAGMA synchronous=FULL")
+    conn.execute("PRAGMA journal_mode=WAL")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory")
+    parser.add_argument("transactions", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=DAYS)
+    parser.add_argument("--customers", type=int, default=CUSTOMERS_PER_UNIT, help="customers per unit")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    seed(args.directory, args.transactions, args.seed, args.days, args.customers)
+    print(f"{args.transactions:,} transactions written to {args.directory} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,230 @@
+"""Database maintenance and diagnostics.
+
+Works on users.db and every unit partition (data/units/*.db) unless --db is given.
+
+    python check_db.py                       # tables + latest users/transactions
+    python check_db.py integrity [--quick]   # PRAGMA integrity_check / quick_check
+    python check_db.py analyze               # refresh planner statistics
+    python check_db.py vacuum [--pages N]    # incremental vacuum (--full converts/rebuilds)
+    python check_db.py checkpoint            # WAL checkpoint (TRUNCATE)
+    python check_db.py stats                 # rows, pages and size per table/index
+    python check_db.py explain               # EXPLAIN QUERY PLAN of the app's queries
+    python check_db.py slow-queries          # report from the recorded slow-query log
+"""
+import argparse
+import json
+import os
 import sqlite3
+import sys
 import pandas as pd
+from modules import auth_db, metrics, unit_store
+
+# The app's hot queries, by database kind: (label, sql, sample params)
+KNOWN_QUERIES = {
+    "users": [
+        ("login", "SELECT id, email, password_hash, name, role FROM users WHERE email = ?", ("a@b.c",)),
+    ],
+    "unit": [
+        ("transaksi per petugas", "SELECT * FROM transactions WHERE petugas = ?", ("Petugas 1",)),
+        ("transaksi per rentang tanggal", "SELECT * FROM transactions WHERE tanggal >= ? AND tanggal <= ?", ("2024-01-01", "2024-01-31")),
+        ("arsip: transaksi lama", "SELECT * FROM transactions WHERE tanggal < ?", ("2024-01-01",)),
+        ("total harian", "SELECT tanggal, SUM(total_kg) FROM transactions WHERE petugas = ? GROUP BY tanggal", ("Petugas 1",)),
+        ("nasabah per nama", "SELECT id, saldo FROM nasabah WHERE nama_key = ?", ("bu siti",)),
+        ("transaksi per nasabah", "SELECT * FROM transactions WHERE nasabah_id = ?", (1,)),
+        ("buku tabungan", "SELECT * FROM nasabah_ledger WHERE nasabah_id = ? ORDER BY id DESC LIMIT 10", (1,)),
+        ("autocomplete", "SELECT n.id FROM nasabah_fts JOIN nasabah n ON n.id = nasabah_fts.rowid "
+                         "WHERE nasabah_fts MATCH ? ORDER BY rank LIMIT 10", ('"sit"',)),
+    ],
+}
+
+def databases():
+    """(kind, path) of every existing database."""
+    found = [("users", auth_db.DB_FILE)] if os.path.exists(auth_db.DB_FILE) else []
+    for lokasi in unit_store.list_units():
+        path = unit_store.partition_path(lokasi)
+        if os.path.exists(path):
+            found.append(("unit", path))
+    return found
+
+def _connect(path):
+    return sqlite3.connect(path, timeout=30)
+
+def show_overview(conn, kind):
+    print(pd.read_sql("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name", conn).to_string(index=False))
+    table = "users" if kind == "users" else "transactions"
+    try:
+        print(f"\n-- {table} (5 terakhir) --")
+        print(pd.read_sql(f"SELECT * FROM {table} ORDER BY id DESC LIMIT 5", conn).to_string(index=False))
+    except Exception as e:
+        print(f"Error reading {table}: {e}")
+    return True
+
+def integrity(conn, quick=False):
+    pragma = "quick_check" if quick else "integrity_check"
+    problems = [row[0] for row in conn.execute(f"PRAGMA {pragma}").fetchall()]
+    ok = problems == ["ok"]
+    print("ok" if ok else "\n".join(problems))
+    # FTS indexes keep their own structure; check it too
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'nasabah_fts'").fetchone():
+        try:
+            conn.execute("INSERT INTO nasabah_fts(nasabah_fts, rank) VALUES ('integrity-check', 1)")
+            print("nasabah_fts: ok")
+        except sqlite3.DatabaseError as e:
+            print(f"nasabah_fts: {e} (perbaiki dengan: INSERT INTO nasabah_fts(nasabah_fts) VALUES ('rebuild'))")
+            ok = False
+    return ok
+
+def analyze(conn):
+    conn.execute("ANALYZE")
+    conn.execute("PRAGMA optimize")
+    conn.commit()
+    print("statistik diperbarui")
+    return True
+
+def vacuum(conn, pages=0, full=False):
+    mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    if full:
+        # Switching to incremental mode only takes effect through a full VACUUM
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+        print(f"VACUUM penuh selesai ({free:,} halaman kosong dilepas, mode incremental aktif)")
+    elif mode == 2:
+        # execute() stops this pragma after its first page; executescript runs it to completion
+        conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+        after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        print(f"{free - after:,} dari {free:,} halaman kosong dilepas")
+    else:
+        print(f"{free:,} halaman kosong; auto_vacuum belum incremental, jalankan sekali dengan --full")
+    return True
+
+def checkpoint(conn, mode="TRUNCATE"):
+    busy, log, done = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+    if log < 0:
+        print("bukan mode WAL")
+    else:
+        print(f"{done:,}/{log:,} frame WAL di-checkpoint" + (" (sebagian: ada pembaca aktif)" if busy else ""))
+    return not busy
+
+def stats(conn):
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    objects = pd.read_sql("SELECT name, type, tbl_name, sql FROM sqlite_master WHERE type IN ('table', 'index')", conn)
+    try:
+        pages = pd.read_sql("SELECT name, COUNT(*) AS pages, SUM(pgsize) AS bytes FROM dbstat GROUP BY name", conn)
+        objects = objects.merge(pages, on="name", how="left")
+    except Exception:
+        objects["pages"] = objects["bytes"] = None  # SQLite built without dbstat
+    rows = []
+    for obj in objects.itertuples():
+        count = None
+        if obj.type == "table" and not (obj.sql or "").upper().startswith("CREATE VIRTUAL"):
+            count = conn.execute(f'SELECT COUNT(*) FROM "{obj.name}"').fetchone()[0]
+        rows.append({"Objek": obj.name, "Jenis": obj.type, "Tabel": obj.tbl_name, "Baris": count,
+                     "Halaman": obj.pages, "Ukuran (KB)": None if pd.isna(obj.bytes) else round(obj.bytes / 1024, 1)})
+    report = pd.DataFrame(rows).astype({"Baris": "Int64", "Halaman": "Int64"})
+    report = report.sort_values("Halaman", ascending=False, na_position="last")
+    print(report.to_string(index=False))
+    print(f"\n{page_count:,} halaman x {page_size} B = {page_count * page_size / 1024 / 1024:,.1f} MB; {free:,} halaman kosong")
+    return True
+
+def explain(conn, kind):
+    ok = True
+    for label, sql, params in KNOWN_QUERIES[kind]:
+        try:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+        except sqlite3.OperationalError as e:
+            print(f"{label}: {e}")
+            continue
+        # A SCAN of a base table (no index) grows with the table
+        full_scans = [p for p in plan if p.startswith("SCAN") and "INDEX" not in p and "VIRTUAL TABLE" not in p]
+        print(f"{'⚠️ ' if full_scans else '✅'} {label}")
+        for step in plan:
+            print(f"     {step}")
+        ok = ok and not full_scans
+    return ok
+
+def slow_query_report(path=None, top=20, since=None):
+    """Statements from the slow-query log, grouped and sorted by total time."""
+    path = path or metrics.SLOW_QUERY_LOG
+    if not os.path.exists(path):
+        print(f"{path} belum ada (query di atas {metrics.SLOW_QUERY_SECONDS * 1000:.0f} ms dicatat oleh aplikasi)")
+        return True
+    with open(path) as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    df = pd.DataFrame(entries, columns=["timestamp", "query", "rows", "seconds"])
+    if since:
+        df = df[df["timestamp"] >= since]
+    if df.empty:
+        print("Tidak ada query lambat.")
+        return True
+    report = df.groupby("query").agg(
+        jumlah=("seconds", "size"), total_s=("seconds", "sum"), rata_s=("seconds", "mean"),
+        maks_s=("seconds", "max"), rata_baris=("rows", "mean"), terakhir=("timestamp", "max"),
+    ).sort_values("total_s", ascending=False).head(top).reset_index()
+    with pd.option_context("display.max_colwidth", 120, "display.width", 250):
+        print(report.round(4).to_string(index=False))
+    return True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", action="append", help="only this database file (repeatable)")
+    sub = parser.add_subparsers(dest="command")
+    sub.add_parser("show", help="tables and latest rows (default)")
+    p = sub.add_parser("integrity", help="PRAGMA integrity_check")
+    p.add_argument("--quick", action="store_true", help="quick_check (skips index consistency)")
+    sub.add_parser("analyze", help="ANALYZE + PRAGMA optimize")
+    p = sub.add_parser("vacuum", help="release free pages")
+    p.add_argument("--pages", type=int, default=0, help="pages to release (0 = all)")
+    p.add_argument("--full", action="store_true", help="full VACUUM and switch to incremental auto_vacuum")
+    p = sub.add_parser("checkpoint", help="WAL checkpoint")
+    p.add_argument("--mode", default="TRUNCATE", choices=["PASSIVE", "FULL", "RESTART", "TRUNCATE"])
+    sub.add_parser("stats", help="rows and pages per table and index")
+    sub.add_parser("explain", help="query plans of the app's known queries")
+    p = sub.add_parser("slow-queries", help="report from the slow-query log")
+    p.add_argument("--log", default=None, help=f"log file (default {metrics.SLOW_QUERY_LOG})")
+    p.add_argument("--top", type=int, default=20)
+    p.add_argument("--since", help="ISO date/time lower bound")
+    args = parser.parse_args(argv)
+    command = args.command or "show"
+
+    if command == "slow-queries":
+        return 0 if slow_query_report(args.log, args.top, args.since) else 1
+
+    targets = databases()
+    if args.db:
+        targets = [(("users" if os.path.basename(db) == os.path.basename(auth_db.DB_FILE) else "unit"), db) for db in args.db]
+    if not targets:
+        print("Tidak ada database ditemukan.")
+        return 1
+
+    ok = True
+    for kind, path in targets:
+        print(f"\n=== {path} ===")
+        conn = _connect(path)
+        try:
+            if command == "show":
+                result = show_overview(conn, kind)
+            elif command == "integrity":
+                result = integrity(conn, args.quick)
+            elif command == "analyze":
+                result = analyze(conn)
+            elif command == "vacuum":
+                result = vacuum(conn, args.pages, args.full)
+            elif command == "checkpoint":
+                result = checkpoint(conn, args.mode)
+            elif command == "stats":
+                result = stats(conn)
+            else:
+                result = explain(conn, kind)
+        except sqlite3.DatabaseError as e:
+            print(f"Error: {e}")
+            result = False
+        finally:
+            conn.close()
+        ok = ok and result
+    return 0 if ok else 1
 
-# Connect to database
-conn = sqlite3.connect('users.db')
-
-print("=== TABLES IN DB ===")
-tables = pd.read_sql("SELECT name FROM sqlite_master WHERE type='table';", conn)
-print(tables)
-print("\n")
-
-print("=== USERS TABLE (Last 5) ===")
-try:
-    users = pd.read_sql("SELECT * FROM users ORDER BY id DESC LIMIT 5", conn)
-    print(users)
-except Exception as e:
-    print(f"Error reading users: {e}")
-print("\n")
-
-print("=== TRANSACTIONS TABLE (Last 5) ===")
-try:
-    trx = pd.read_sql("SELECT * FROM transactions ORDER BY id DESC LIMIT 5", conn)
-    print(trx)
-except Exception as e:
-    print(f"Error reading transactions: {e}")
-
-conn.close()
+if __name__ == "__main__":
+    sys.exit(main())
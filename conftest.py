@@ -0,0 +1,36 @@
+import os
+import tempfile
+import datetime
+import pytest
+from modules import auth_db, unit_store, archive_service, analytics_engine, replica
+
+def make_transaction(lokasi, petugas, burnable, paper, paid):
+    return {
+        "Tanggal": datetime.date(2026, 1, 5), "Nasabah": "Bu Siti", "Petugas": petugas, "Lokasi": lokasi,
+        "Burnable": burnable, "Paper": paper, "Cloth": 0, "Cans": 0, "Electronics": 0,
+        "PET_Bottles": 0, "Plastic_Marks": 0, "White_Trays": 0, "Glass_Bottles": 0,
+        "Metal_Small": 0, "Hazardous": 0,
+        "total_kg": burnable + paper, "Total_Bayar_Nasabah": paid,
+        "Est_Pendapatan_Bank": paid * 2, "Est_Profit": paid,
+    }
+
+def use_workdir(setattr, workdir=None):
+    """Point the app's data files into `workdir` (a new temp dir by default) and return it.
+
+    `setattr` is monkeypatch.setattr under pytest, so the globals are restored
+    afterwards, or the builtin when a test file runs as a script.
+    """
+    workdir = workdir or tempfile.mkdtemp()
+    setattr(auth_db, "DB_FILE", os.path.join(workdir, "users.db"))
+    setattr(unit_store, "PARTITION_DIR", os.path.join(workdir, "units"))
+    setattr(archive_service, "ARCHIVE_DIR", os.path.join(workdir, "archive"))
+    setattr(analytics_engine, "ANALYTICS_FILE", os.path.join(workdir, "analytics.duckdb"))
+    setattr(replica, "REPLICA_DIR", os.path.join(workdir, "replica"))
+    setattr(replica, "ENABLED", False)  # tests expect reads to see every write at once
+    return workdir
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Temporary working directory holding every data file a test touches."""
+    yield use_workdir(monkeypatch.setattr, str(tmp_path))
+    analytics_engine.reset()  # the mirror connection points into tmp_path
@@ -0,0 +1,100 @@
+import datetime
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from modules import chart_cache, rollup_service, unit_store
+
+TREND_DAYS = 30
+DEFAULT_RANGE_DAYS = 90
+
+def officer_summary(df, end, trend_days=TREND_DAYS):
+    """Totals per officer and unit with margin and the change of the last `trend_days` vs the period before."""
+    end = pd.Timestamp(end)
+    recent = df['Tanggal'] > end - pd.Timedelta(days=trend_days)
+    before = (df['Tanggal'] > end - pd.Timedelta(days=2 * trend_days)) & ~recent
+    summary = df.assign(
+        Berat_Terakhir=df['Berat_KG'].where(recent, 0.0),
+        Berat_Sebelumnya=df['Berat_KG'].where(before, 0.0),
+    ).groupby(['Petugas', 'Unit'], as_index=False, observed=True).agg(
+        Transaksi=('Transaksi', 'sum'), Berat_KG=('Berat_KG', 'sum'), Dibayar=('Dibayar', 'sum'),
+        Pendapatan=('Pendapatan', 'sum'), Profit=('Profit', 'sum'), Hari_Aktif=('Tanggal', 'nunique'),
+        Berat_Terakhir=('Berat_Terakhir', 'sum'), Berat_Sebelumnya=('Berat_Sebelumnya', 'sum'),
+    )
+    pendapatan = summary['Pendapatan'].where(summary['Pendapatan'] != 0)
+    summary['Margin'] = summary['Profit'] / pendapatan
+    sebelumnya = summary['Berat_Sebelumnya'].where(summary['Berat_Sebelumnya'] != 0)
+    summary['Tren'] = summary['Berat_Terakhir'] / sebelumnya - 1
+    summary['Porsi'] = summary['Berat_KG'] / summary['Berat_KG'].sum()
+    return summary.drop(columns=['Berat_Terakhir', 'Berat_Sebelumnya']).sort_values('Berat_KG', ascending=False, ignore_index=True)
+
+def weekly_trend(df):
+    """Collected weight per officer and week."""
+    return df.groupby([pd.Grouper(key='Tanggal', freq='W-MON', label='left', closed='left'), 'Petugas'],
+                      as_index=False)['Berat_KG'].sum()
+
+def unit_chart(summary):
+    fig = px.bar(summary, x='Unit', y='Berat_KG', color='Petugas', title="Volume per Unit & Petugas",
+                 labels={'Berat_KG': 'Berat (kg)'})
+    fig.update_layout(barmode='stack')
+    return fig
+
+def trend_chart(weekly):
+    return px.line(weekly, x='Tanggal', y='Berat_KG', color='Petugas', markers=True,
+                   title="Tren Mingguan per Petugas", labels={'Berat_KG': 'Berat (kg)', 'Tanggal': 'Minggu'})
+
+def show():
+    st.title("📈 Analitik Petugas & Unit")
+    st.markdown("*Perbandingan seluruh petugas dan unit: volume, pembayaran, margin, dan tren.*")
+
+    today = datetime.date.today()
+    c1, c2 = st.columns([1, 2])
+    with c1:
+        period = st.date_input("Periode", value=(today - datetime.timedelta(days=DEFAULT_RANGE_DAYS), today))
+    with c2:
+        all_units = unit_store.list_units()
+        units = st.multiselect("Unit", all_units, default=all_units)
+    if not isinstance(period, (tuple, list)) or len(period) != 2 or not units:
+        st.info("Pilih rentang tanggal dan minimal satu unit.")
+        return
+    start, end = period
+
+    df = rollup_service.load(start, end, units)
+    age = rollup_service.last_refresh_age(units)
+    st.caption(f"Dibaca dari agregat harian per petugas ({len(df):,} baris), bukan dari seluruh transaksi; "
+               f"diperbarui paling lambat tiap {rollup_service.REFRESH_SECONDS} detik"
+               + (f", terakhir {age:.0f} detik lalu." if age is not None else "."))
+    if df.empty:
+        st.info("Belum ada transaksi pada periode ini.")
+    else:
+        pendapatan = df['Pendapatan'].sum()
+        k1, k2, k3, k4 = st.columns(4)
+        k1.metric("Total Volume", f"{df['Berat_KG'].sum():,.1f} kg")
+        k2.metric("Dibayar ke Nasabah", f"Rp {df['Dibayar'].sum():,.0f}")
+        k3.metric("Estimasi Profit", f"Rp {df['Profit'].sum():,.0f}")
+        k4.metric("Margin", f"{df['Profit'].sum() / pendapatan:.1%}" if pendapatan else "-")
+
+        summary = officer_summary(df, end)
+        st.subheader("Perbandingan Petugas")
+        st.dataframe(summary, use_container_width=True, hide_index=True, column_config={
+            "Berat_KG": st.column_config.NumberColumn("Berat (kg)", format="%.1f"),
+            "Dibayar": st.column_config.NumberColumn(format="Rp %d"),
+            "Pendapatan": st.column_config.NumberColumn(format="Rp %d"),
+            "Profit": st.column_config.NumberColumn(format="Rp %d"),
+            "Hari_Aktif": st.column_config.NumberColumn("Hari Aktif"),
+            "Margin": st.column_config.NumberColumn(format="percent"),
+            "Tren": st.column_config.NumberColumn(f"Tren {TREND_DAYS} hr", format="percent",
+                                                  help=f"Volume {TREND_DAYS} hari terakhir dibanding {TREND_DAYS} hari sebelumnya"),
+            "Porsi": st.column_config.NumberColumn(format="percent"),
+        })
+
+        g1, g2 = st.columns(2)
+        with g1:
+            st.plotly_chart(chart_cache.figure(unit_chart, summary), use_container_width=True)
+        with g2:
+            st.plotly_chart(chart_cache.figure(trend_chart, weekly_trend(df)), use_container_width=True)
+
+    st.markdown("---")
+    st.caption("Hitung ulang agregat dari transaksi aktif dan arsip bila data pernah diubah di luar aplikasi.")
+    from modules import data_management  # report_job widget and the registered jobs
+    data_management.report_job("rollup_rebuild", "♻️ Hitung Ulang Agregat", {},
+                               st.session_state.get('user_info', {}).get('email'))
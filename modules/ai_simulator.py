@@ -3,6 +3,27 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from modules.price_service import load_prices
+from modules import chart_cache, route_planner
+
+def route_map(partners, routes):
+    """Pickup routes on a lat/lon plane: one line per trip from its unit and back."""
+    fig = go.Figure()
+    for unit, group in routes.groupby('Unit', sort=False):
+        depot_lat, depot_lon = route_planner.UNIT_LOCATIONS[unit]
+        lat, lon = [], []
+        for stops in group['Mitra']:
+            lat += [depot_lat, *partners['Lat'].iloc[stops], depot_lat, None]
+            lon += [depot_lon, *partners['Lon'].iloc[stops], depot_lon, None]
+        fig.add_trace(go.Scatter(x=lon, y=lat, mode='lines+markers', name=unit,
+                                 line=dict(width=1.5), marker=dict(size=4)))
+    units = list(route_planner.UNIT_LOCATIONS)
+    fig.add_trace(go.Scatter(x=[route_planner.UNIT_LOCATIONS[u][1] for u in units],
+                             y=[route_planner.UNIT_LOCATIONS[u][0] for u in units], mode='markers+text',
+                             text=units, textposition='top center', name='Unit',
+                             marker=dict(size=14, symbol='square', color='black')))
+    fig.update_layout(title="Rute Penjemputan Harian", xaxis_title="Longitude", yaxis_title="Latitude",
+                      height=450, yaxis=dict(scaleanchor='x'))
+    return fig
 
 def show():
     st.title("🤖 AI Strategic Simulator")
@@ -18,6 +39,13 @@ def show():
     days_per_month = st.sidebar.slider("Hari Kerja/Bulan", 20, 30, 26)
     partner_capacity = st.sidebar.slider("Avg Setoran Mitra (kg/hari)", 10, 100, 20)
     pickup_capacity = st.sidebar.slider("Kapasitas Pickup (kg/trip)", 100, 1000, 300)
+
+    st.sidebar.header("📍 Jaringan Mitra")
+    partner_source = st.sidebar.radio("Lokasi Mitra", ["Simulasi (sebar di sekitar unit)", "Unggah CSV"])
+    uploaded = None
+    if partner_source == "Unggah CSV":
+        uploaded = st.sidebar.file_uploader("CSV mitra (lat, lon, kg)", type=["csv"])
+    service_radius = st.sidebar.slider("Radius Layanan (km)", 2, 20, 8)
     
     # --- 2. AI Calculation Engine ---
     
@@ -40,9 +68,20 @@ def show():
     required_volume_daily = required_revenue_daily / avg_price_per_kg
     required_volume_monthly = required_volume_daily * days_per_month
     
-    # C. Logistics Load
+    # C. Logistics Load: capacitated routes over the partner network
     required_partners = np.ceil(required_volume_daily / partner_capacity)
-    required_pickups = np.ceil(required_volume_daily / pickup_capacity)
+    partners = None
+    if uploaded is not None:
+        try:
+            partners = route_planner.read_partners(uploaded)
+        except ValueError as e:
+            st.sidebar.error(str(e))
+    if partners is None or partners.empty:
+        partners = route_planner.synthetic_partners(required_partners, partner_capacity, service_radius)
+    else:
+        required_partners = len(partners)
+    plan = route_planner.plan_routes(partners, pickup_capacity)
+    required_pickups = plan['trips']
     
     # D. Energy & Carbon
     # Energy: ~0.05 kWh/kg for sorting/shredding machines
@@ -76,7 +115,7 @@ def show():
         <div class="metric-card">
             <h3>Logistics Load</h3>
             <h2>{int(required_partners)} Partners</h2>
-            <p>{int(required_pickups)} Pickups/Day</p>
+            <p>{int(required_pickups)} Pickups/Day · {plan['km']:,.0f} km</p>
         </div>
         """, unsafe_allow_html=True)
         
@@ -123,8 +162,30 @@ def show():
         
         **Kebutuhan Sumber Daya:**
         1. **SDM**: Membutuhkan jaringan minimal **{int(required_partners)} mitra aktif** (Bank Sampah Unit/Pengepul).
-        2. **Logistik**: Armada harus siap melakukan **{int(required_pickups)} rit** penjemputan kapasitas {pickup_capacity}kg.
+        2. **Logistik**: **{plan['vehicles']} armada** kapasitas {pickup_capacity}kg menjalankan **{int(required_pickups)} rit** (total {plan['km']:,.0f} km, {plan['hours']:,.1f} jam kerja) per hari.
         3. **Operasional**: Biaya listrik estimasi untuk mesin pencacah/press sekitar **{(daily_energy*1500):,.0f} IDR/hari**.
         """)
         
+    st.markdown("---")
+    st.subheader("🚚 Rencana Rute Penjemputan")
+    naive_trips = int(np.ceil(plan['kg'] / pickup_capacity))
+    r1, r2, r3, r4 = st.columns(4)
+    r1.metric("Rit per Hari", f"{plan['trips']}", delta=f"{plan['trips'] - naive_trips:+d} vs pembagian kapasitas",
+              delta_color="off")
+    r2.metric("Jarak Tempuh", f"{plan['km']:,.0f} km/hari")
+    r3.metric("Armada", f"{plan['vehicles']} kendaraan",
+              help=f"Shift {route_planner.SHIFT_HOURS} jam, {route_planner.SPEED_KMH} km/jam, "
+                   f"{route_planner.SERVICE_MINUTES} menit per titik")
+    r4.metric("Mitra Dilayani", f"{len(partners):,}")
+    st.caption(f"Rute dari unit terdekat (savings + 2-opt/or-opt), dihitung dalam {plan['seconds']:.2f} detik"
+               + (" — batas waktu optimasi tercapai, rute bisa sedikit lebih panjang dari optimal." if plan['timed_out'] else "."))
+    st.plotly_chart(chart_cache.figure(route_map, partners, plan['routes']), use_container_width=True)
+    with st.expander("Detail Rit"):
+        st.dataframe(plan['routes'].drop(columns=['Mitra']), use_container_width=True, hide_index=True,
+                     column_config={
+                         "Muatan_KG": st.column_config.NumberColumn("Muatan (kg)", format="%.1f"),
+                         "Jarak_KM": st.column_config.NumberColumn("Jarak (km)", format="%.1f"),
+                         "Durasi_Jam": st.column_config.NumberColumn("Durasi (jam)", format="%.2f"),
+                     })
+
     st.success("💡 **Recommendation:** Fokus pada akuisisi mitra baru untuk memenuhi kuota volume harian.")
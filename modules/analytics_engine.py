@@ -0,0 +1,275 @@
+import glob
+import os
+import sqlite3
+import threading
+import time
+import pandas as pd
+import pyarrow as pa
+from modules import metrics, replica, unit_store
+
+try:
+    import duckdb
+except ImportError:  # optional: without it every read stays on the SQLite fan-out path
+    duckdb = None
+
+# Optional analytical read path on an embedded DuckDB database.
+# The unit partitions stay the only write path; DuckDB keeps a columnar
+# mirror of their transactions (table `hot`, in ANALYTICS_FILE) that is
+# synced before each query from the same file reports read: the unit's
+# read snapshot when fresh (see replica), else the partition. A sync copies
+# the appended id range plus the rows listed in the partition's change log
+# (ids updated or deleted since the last sync, see unit_store); the whole
+# unit is reloaded only on first sync or when the mirror fell behind the
+# log. Bulk copies go through DuckDB's sqlite scanner when that extension
+# is installed (it is only loaded, never downloaded at runtime), otherwise
+# through Arrow batches fetched with sqlite3. The view `transactions` unions
+# the mirror with the Parquet archive, so dashboard and report aggregates
+# run vectorized on all cores. Any failure returns None (counted in
+# analytics_fallbacks_total) and the caller falls back to SQLite.
+#   BANK_SAMPAH_ANALYTICS=sqlite  -> never use DuckDB
+ANALYTICS_FILE = "data/analytics.duckdb"
+ENV_VAR = "BANK_SAMPAH_ANALYTICS"
+THREADS = os.cpu_count() or 1
+USE_SQLITE_SCANNER = True
+BATCH_ROWS = 50000
+ID_CHUNK = 500  # ids per IN list when re-copying changed rows
+
+_lock = threading.Lock()
+_conn = None
+_path = None
+_scanner = False  # sqlite scanner loaded into _conn
+_archive_parts = None  # (archive dir, part files) the view was built for
+_seen = {}  # partition path -> (source file, file signature) at the last sync
+
+def available():
+    return duckdb is not None
+
+def enabled():
+    return available() and os.environ.get(ENV_VAR, "").lower() != "sqlite"
+
+def queries_served():
+    """Queries answered by DuckDB in this process (the rest fell back to SQLite)."""
+    return metrics.counter_value("analytics_queries_total")
+
+def _columns():
+    """(name, DuckDB type) of the mirrored transaction columns (the archive layout)."""
+    from modules import archive_service
+    columns = [("id", "BIGINT")]
+    columns += [(c, "VARCHAR") for c in archive_service.TEXT_COLUMNS]
+    columns += [(c, "DOUBLE") for c in archive_service.WEIGHT_COLUMNS]
+    columns += [(c, "BIGINT") for c in archive_service.MONEY_COLUMNS]
+    columns.append(("nasabah_id", "BIGINT"))
+    return columns
+
+def _select():
+    return ", ".join(f"CAST({name} AS {kind}) AS {name}" for name, kind in _columns())
+
+def _scan_select():
+    """_select() over the all-VARCHAR columns of sqlite_scan."""
+    casts = {"VARCHAR": "{}", "DOUBLE": "CAST({} AS DOUBLE)", "BIGINT": "CAST(CAST({} AS DOUBLE) AS BIGINT)"}
+    return ", ".join(f"{casts[kind].format(name)} AS {name}" for name, kind in _columns())
+
+def _open():
+    global _scanner
+    conn = duckdb.connect(ANALYTICS_FILE)
+    conn.execute(f"SET threads TO {THREADS}")
+    ddl = ", ".join(f"{name} {kind}" for name, kind in _columns())
+    conn.execute(f"CREATE TABLE IF NOT EXISTS hot ({ddl}, _unit VARCHAR)")
+    conn.execute("CREATE TABLE IF NOT EXISTS mirror_state (unit VARCHAR PRIMARY KEY, max_id BIGINT, row_count BIGINT)")
+    conn.execute("ALTER TABLE mirror_state DROP COLUMN IF EXISTS version")
+    conn.execute("ALTER TABLE mirror_state ADD COLUMN IF NOT EXISTS change_seq BIGINT")
+    _scanner = False
+    if USE_SQLITE_SCANNER:
+        try:
+            conn.execute("SET autoinstall_known_extensions = false")
+            conn.execute("LOAD sqlite")
+            # Text as stored (no TIMESTAMP re-formatting); numbers are cast in _scan_select
+            conn.execute("SET sqlite_all_varchar = true")
+            _scanner = True
+        except duckdb.Error:
+            pass  # not installed on this host: copy through Arrow batches
+    return conn
+
+def _file_signature(path):
+    """Changes whenever SQLite commits to the file (main file or WAL)."""
+    signature = []
+    for name in (path, f"{path}-wal"):
+        try:
+            st = os.stat(name)
+            signature.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+def _open_source(path, snapshot):
+    if snapshot:
+        return sqlite3.connect(f"file:{path}?mode=ro&immutable=1", uri=True)
+    return sqlite3.connect(path, timeout=30)
+
+def _insert_batches(conn, unit, cursor):
+    """Insert the rows of a sqlite3 cursor into `hot` as Arrow batches."""
+    names = [d[0] for d in cursor.description]
+    while True:
+        rows = cursor.fetchmany(BATCH_ROWS)
+        if not rows:
+            return
+        batch = pa.table({name: pa.array(values) for name, values in zip(names, zip(*rows))})
+        conn.register("sync_rows", batch)
+        try:
+            conn.execute(f"INSERT INTO hot SELECT {_select()}, ? FROM sync_rows", [unit])
+        finally:
+            conn.unregister("sync_rows")
+
+def _copy_range(conn, unit, source, src, low, high):
+    """Copy the rows with low < id <= high from the source file into `hot`."""
+    if _scanner:
+        conn.execute(f"INSERT INTO hot SELECT {_scan_select()}, ? FROM sqlite_scan(?, 'transactions') "
+                     "WHERE CAST(id AS BIGINT) > ? AND CAST(id AS BIGINT) <= ?", [unit, source, low, high])
+    else:
+        names = ", ".join(name for name, _ in _columns())
+        _insert_batches(conn, unit, src.execute(f"SELECT {names} FROM transactions WHERE id > ? AND id <= ?", (low, high)))
+
+def _copy_ids(conn, unit, src, ids):
+    """Copy the current rows of `ids` (a few changed rows) from the source file into `hot`."""
+    names = ", ".join(name for name, _ in _columns())
+    for i in range(0, len(ids), ID_CHUNK):
+        chunk = ids[i:i + ID_CHUNK]
+        _insert_batches(conn, unit, src.execute(
+            f"SELECT {names} FROM transactions WHERE id IN ({','.join('?' * len(chunk))})", chunk))
+
+def _change_range(src):
+    """(first, last) sequence number in the change log, or None for a partition without one."""
+    try:
+        return src.execute("SELECT MIN(seq), COALESCE(MAX(seq), 0) FROM transaction_changes").fetchone()
+    except sqlite3.OperationalError:
+        return None
+
+def _sync_unit(conn, lokasi):
+    """Bring the mirror of one unit up to date (rows are keyed by its absolute partition path)."""
+    unit = os.path.abspath(unit_store.partition_path(lokasi))
+    source = os.path.abspath(replica.read_path(lokasi))
+    seen = (source, _file_signature(source))
+    if _seen.get(unit) == seen:
+        return
+    start = time.perf_counter()
+    state = conn.execute("SELECT max_id, row_count, change_seq FROM mirror_state WHERE unit = ?", [unit]).fetchone()
+    src = _open_source(source, snapshot=source != unit)
+    try:
+        # Log position before the rows: a change racing this sync is applied again next time
+        changes = _change_range(src)
+        max_id, count = src.execute("SELECT COALESCE(MAX(id), 0), COUNT(*) FROM transactions").fetchone()
+        seq = changes[1] if changes else None
+        changed = None
+        if state is not None and changes is not None and state[2] is not None and max_id >= state[0] and seq >= state[2]:
+            first = changes[0]
+            if seq == state[2] or (first is not None and first <= state[2] + 1):
+                changed = [i for (i,) in src.execute(
+                    "SELECT DISTINCT id FROM transaction_changes WHERE seq > ? AND seq <= ? AND id <= ?",
+                    (state[2], seq, state[0]))]
+        if changed is not None and not changed and state[:2] == (max_id, count):
+            _seen[unit] = seen
+            return
+
+        conn.execute("BEGIN")
+        try:
+            mode = "delta"
+            if changed is not None:
+                if changed:
+                    conn.register("changed_ids", pa.table({"id": pa.array(changed, pa.int64())}))
+                    try:
+                        conn.execute("DELETE FROM hot WHERE _unit = ? AND id IN (SELECT id FROM changed_ids)", [unit])
+                    finally:
+                        conn.unregister("changed_ids")
+                    _copy_ids(conn, unit, src, changed)
+                _copy_range(conn, unit, source, src, state[0], max_id)
+                mirrored = conn.execute("SELECT COUNT(*) FROM hot WHERE _unit = ?", [unit]).fetchone()[0]
+                if mirrored != count:
+                    # e.g. rows inserted below max_id: only a reload is sure to match
+                    conn.execute("ROLLBACK")
+                    conn.execute("BEGIN")
+                    changed = None
+            if changed is None:
+                mode = "reload"
+                conn.execute("DELETE FROM hot WHERE _unit = ?", [unit])
+                _copy_range(conn, unit, source, src, 0, max_id)
+            mirrored = conn.execute("SELECT COUNT(*) FROM hot WHERE _unit = ?", [unit]).fetchone()[0]
+            conn.execute("INSERT OR REPLACE INTO mirror_state (unit, max_id, row_count, change_seq) VALUES (?, ?, ?, ?)",
+                         [unit, max_id, mirrored, seq])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        src.close()
+    _seen[unit] = seen
+    metrics.observe("analytics_sync_seconds", time.perf_counter() - start, mode=mode)
+
+def _create_view(conn, archive_dir):
+    names = ", ".join(name for name, _ in _columns())
+    sql = f"CREATE OR REPLACE VIEW transactions AS SELECT {names} FROM hot"
+    if archive_dir:
+        pattern = os.path.join(archive_dir, "unit=*", "bulan=*", "*.parquet").replace("'", "''")
+        sql += f" UNION ALL SELECT {_select()} FROM read_parquet('{pattern}', hive_partitioning = true, union_by_name = true)"
+    conn.execute(sql)
+
+def _connection():
+    """Cursor on the synced DuckDB mirror (re-opened when ANALYTICS_FILE resolves elsewhere)."""
+    global _conn, _path, _archive_parts
+    from modules import archive_service
+    with _lock:
+        if _conn is None or _path != os.path.abspath(ANALYTICS_FILE):
+            if _conn is not None:
+                _conn.close()
+            os.makedirs(os.path.dirname(ANALYTICS_FILE) or ".", exist_ok=True)
+            _conn, _path, _archive_parts = _open(), os.path.abspath(ANALYTICS_FILE), None
+            _seen.clear()
+        units = [u for u in unit_store.list_units() if os.path.exists(unit_store.partition_path(u))]
+        for lokasi in units:
+            _sync_unit(_conn, lokasi)
+        paths = [os.path.abspath(unit_store.partition_path(u)) for u in units]
+        for (path,) in _conn.execute("SELECT unit FROM mirror_state").fetchall():
+            if path not in paths:
+                _conn.execute("DELETE FROM hot WHERE _unit = ?", [path])
+                _conn.execute("DELETE FROM mirror_state WHERE unit = ?", [path])
+        archive = os.path.abspath(archive_service.ARCHIVE_DIR)
+        parts = len(glob.glob(os.path.join(archive, "unit=*", "bulan=*", "*.parquet"))) if archive_service.available() else 0
+        if (archive, parts) != _archive_parts:
+            _create_view(_conn, archive if parts else None)
+            _archive_parts = (archive, parts)
+        # A cursor is a separate connection to the same database, usable outside the lock
+        return _conn.cursor()
+
+def query(sql, params=(), arrow=False):
+    """Run `sql` against the unified `transactions` view (hot mirror + archive).
+
+    Returns a DataFrame (Arrow-backed dtypes when `arrow`), or None when DuckDB
+    is unavailable or fails so the caller can take the SQLite path.
+    """
+    if not enabled():
+        return None
+    try:
+        cursor = _connection()
+        try:
+            result = cursor.execute(sql, list(params))
+            if arrow:
+                # to_arrow_table() replaced fetch_arrow_table() in newer DuckDB releases
+                fetch = getattr(result, "to_arrow_table", None) or result.fetch_arrow_table
+                frame = fetch().to_pandas(types_mapper=pd.ArrowDtype)
+            else:
+                frame = result.df()
+        finally:
+            cursor.close()
+    except Exception as e:
+        metrics.inc("analytics_fallbacks_total", error=type(e).__name__)
+        return None
+    metrics.inc("analytics_queries_total")
+    return frame
+
+def reset():
+    """Close the mirror connection (e.g. before deleting the working directory)."""
+    global _conn, _path, _archive_parts
+    with _lock:
+        if _conn is not None:
+            _conn.close()
+        _conn = _path = _archive_parts = None
+        _seen.clear()
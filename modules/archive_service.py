@@ -0,0 +1,231 @@
+import datetime
+import glob
+import os
+import uuid
+import pandas as pd
+from modules import analytics_engine, replica, rollup_service, unit_store
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow ships with streamlit, but keep the hot path usable without it
+    pa = None
+
+# Cold tier: transactions older than the horizon move out of the unit
+# partitions into compressed Parquet files, one directory per unit and month:
+#   data/archive/unit=<slug>/bulan=YYYY-MM/part-<id>.parquet
+ARCHIVE_DIR = "data/archive"
+ARCHIVE_HORIZON_DAYS = 365
+COMPRESSION = "zstd"
+
+TEXT_COLUMNS = ['timestamp', 'tanggal', 'nasabah', 'petugas', 'lokasi']
+WEIGHT_COLUMNS = [
+    'burnable', 'paper', 'cloth', 'cans', 'electronics', 'pet_bottles', 'plastic_marks',
+    'white_trays', 'glass_bottles', 'metal_small', 'hazardous', 'total_kg',
+]
+MONEY_COLUMNS = ['total_paid', 'total_revenue', 'profit']
+
+def available():
+    return pa is not None
+
+def archive_schema():
+    """Fixed schema so every part file (and schema evolution) reads as one dataset."""
+    fields = [pa.field('id', pa.int64())]
+    fields += [pa.field(c, pa.string()) for c in TEXT_COLUMNS]
+    fields += [pa.field(c, pa.float64()) for c in WEIGHT_COLUMNS]
+    fields += [pa.field(c, pa.int64()) for c in MONEY_COLUMNS]
+    fields.append(pa.field('nasabah_id', pa.int64()))
+    return pa.schema(fields)
+
+def _partitioning():
+    return ds.partitioning(pa.schema([('unit', pa.string()), ('bulan', pa.string())]), flavor="hive")
+
+def has_archive():
+    return available() and bool(glob.glob(os.path.join(ARCHIVE_DIR, "unit=*", "bulan=*", "*.parquet")))
+
+def _month_dir(lokasi, bulan):
+    return os.path.join(ARCHIVE_DIR, f"unit={unit_store.unit_slug(lokasi)}", f"bulan={bulan}")
+
+def _to_table(rows):
+    schema = archive_schema()
+    rows = rows.reindex(columns=schema.names)
+    for c in TEXT_COLUMNS:
+        rows[c] = rows[c].astype("string")
+    for c in MONEY_COLUMNS:
+        rows[c] = rows[c].fillna(0).astype("int64")
+    rows['nasabah_id'] = rows['nasabah_id'].astype("Int64")
+    return pa.Table.from_pandas(rows, schema=schema, preserve_index=False)
+
+def _recover_pending(conn, lokasi):
+    """Finish or discard part files left behind by an interrupted archive run.
+
+    Parts are written as *.pending before their rows are deleted from SQLite.
+    If the rows are gone the delete committed and the part is kept, otherwise
+    the rows are still hot and the part is dropped.
+    """
+    pattern = os.path.join(ARCHIVE_DIR, f"unit={unit_store.unit_slug(lokasi)}", "bulan=*", "*.parquet.pending")
+    for path in glob.glob(pattern):
+        ids = pq.read_table(path, columns=['id']).column('id').to_pylist()
+        # Through a temp table: a large month has more ids than SQLite allows bound variables
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS pending_ids (id INTEGER PRIMARY KEY)")
+        conn.execute("DELETE FROM pending_ids")
+        conn.executemany("INSERT OR IGNORE INTO pending_ids (id) VALUES (?)", ((i,) for i in ids))
+        still_hot = conn.execute(
+            "SELECT COUNT(*) FROM transactions JOIN pending_ids USING (id)"
+        ).fetchone()[0]
+        conn.execute("DELETE FROM pending_ids")
+        conn.commit()
+        if still_hot:
+            os.remove(path)
+        else:
+            os.replace(path, path[:-len(".pending")])
+
+def archive_unit(lokasi, horizon_days=ARCHIVE_HORIZON_DAYS):
+    """Move rows of one unit older than `horizon_days` into monthly Parquet files."""
+    cutoff = (datetime.date.today() - datetime.timedelta(days=horizon_days)).isoformat()
+    conn = unit_store.get_unit_connection(lokasi)
+    try:
+        _recover_pending(conn, lokasi)
+        cold = pd.read_sql_query("SELECT * FROM transactions WHERE tanggal < ?", conn, params=(cutoff,))
+        if cold.empty:
+            return 0
+
+        pending = []
+        for bulan, rows in cold.groupby(cold['tanggal'].str[:7]):
+            month_dir = _month_dir(lokasi, bulan)
+            os.makedirs(month_dir, exist_ok=True)
+            path = os.path.join(month_dir, f"part-{uuid.uuid4().hex}.parquet.pending")
+            pq.write_table(_to_table(rows), path, compression=COMPRESSION)
+            pending.append(path)
+
+        # The rollups keep counting the moved rows; make sure they were folded in first
+        rollup_service.refresh_unit(conn, lokasi)
+        with conn:
+            conn.executemany("DELETE FROM transactions WHERE id = ?", [(int(i),) for i in cold['id']])
+        for path in pending:
+            os.replace(path, path[:-len(".pending")])
+        return len(cold)
+    finally:
+        conn.close()
+
+def archive_transactions(horizon_days=ARCHIVE_HORIZON_DAYS, units=None):
+    """Archive every unit; returns the number of rows moved per unit."""
+    if not available():
+        raise RuntimeError("Library 'pyarrow' belum terinstall. Arsip Parquet tidak tersedia.")
+    units = unit_store.list_units() if units is None else units
+    moved = dict(zip(units, unit_store.fan_out(lambda conn, lokasi: archive_unit(lokasi, horizon_days), units)))
+    for lokasi, n in moved.items():
+        if n:
+            # A snapshot still holding the moved rows would count them twice next to the archive
+            replica.invalidate(lokasi)
+    return moved
+
+def read_archive(columns=None, start=None, end=None, petugas=None, units=None, aliases=None):
+    """Read cold rows with partition pruning on unit/month and column projection.
+
+    `start`/`end` are inclusive dates (date or 'YYYY-MM-DD'); `columns` are
+    transactions table column names, optionally renamed via `aliases`
+    ({column: output name}).
+    """
+    schema = archive_schema()
+    columns = columns or (list(aliases) if aliases else schema.names)
+    output_names = [aliases.get(c, c) for c in columns] if aliases else columns
+    if not has_archive():
+        return pd.DataFrame(columns=output_names)
+
+    # Committed parts only: *.parquet.pending files still have their rows in the hot tier
+    unit_dirs = ["unit=*"] if units is None else [f"unit={unit_store.unit_slug(u)}" for u in units]
+    parts = [p for d in unit_dirs for p in glob.glob(os.path.join(ARCHIVE_DIR, d, "bulan=*", "*.parquet"))]
+    if not parts:
+        return pd.DataFrame(columns=output_names)
+    dataset = ds.dataset(parts, format="parquet", partition_base_dir=ARCHIVE_DIR, schema=schema.append(pa.field('bulan', pa.string())).append(pa.field('unit', pa.string())),
+                         partitioning=_partitioning())
+    conditions = []
+    if units is not None:
+        conditions.append(ds.field('unit').isin([unit_store.unit_slug(u) for u in units]))
+    if start is not None:
+        start = str(start)
+        conditions += [ds.field('bulan') >= start[:7], ds.field('tanggal') >= start]
+    if end is not None:
+        end = str(end)
+        conditions += [ds.field('bulan') <= end[:7], ds.field('tanggal') <= end]
+    if petugas:
+        conditions.append(ds.field('petugas') == petugas)
+
+    expr = None
+    for cond in conditions:
+        expr = cond if expr is None else expr & cond
+    table = dataset.to_table(columns=columns, filter=expr)
+    # Rename on the Arrow table, before any pandas copy exists
+    return table.rename_columns(output_names).to_pandas()
+
+def read_transactions(columns=None, start=None, end=None, petugas=None, units=None, aliases=None):
+    """Unified reader: hot rows from the unit partitions plus cold Parquet rows."""
+    columns = columns or (list(aliases) if aliases else None)
+    if columns:
+        select = ", ".join(f'{c} AS "{aliases[c]}"' if aliases and c in aliases else c for c in columns)
+    else:
+        select = "*"
+    query = f"SELECT {select} FROM transactions WHERE 1=1"
+    params = []
+    if start is not None:
+        query += " AND tanggal >= ?"
+        params.append(str(start))
+    if end is not None:
+        query += " AND tanggal <= ?"
+        params.append(str(end))
+    if petugas:
+        query += " AND petugas = ?"
+        params.append(petugas)
+
+    # One vectorized scan over both tiers when the DuckDB read path is available
+    merged = None
+    if units is None:
+        merged = analytics_engine.query(query, params, arrow=True)
+    elif units:
+        in_list = ",".join("?" * len(units))
+        merged = analytics_engine.query(f"{query} AND lokasi IN ({in_list})", [*params, *units], arrow=True)
+    if merged is not None:
+        return merged
+
+    hot = unit_store.read_frames(query, tuple(params), units)
+
+    cold = read_archive(columns, start, end, petugas, units, aliases)
+    if cold.empty:
+        return hot
+    if hot.empty:
+        return cold
+    return pd.concat([hot, cold[hot.columns]], ignore_index=True)
+
+def archive_summary():
+    """Files, months and bytes per unit in the cold tier."""
+    rows = []
+    for path in glob.glob(os.path.join(ARCHIVE_DIR, "unit=*", "bulan=*", "*.parquet")):
+        month_dir = os.path.dirname(path)
+        rows.append({
+            "Unit": os.path.basename(os.path.dirname(month_dir))[len("unit="):],
+            "Bulan": os.path.basename(month_dir)[len("bulan="):],
+            "Baris": pq.ParquetFile(path).metadata.num_rows,
+            "Ukuran (KB)": os.path.getsize(path) / 1024,
+        })
+    if not rows:
+        return pd.DataFrame(columns=["Unit", "Bulan", "Baris", "Ukuran (KB)"])
+    return pd.DataFrame(rows).groupby(["Unit", "Bulan"], as_index=False).sum()
+
+def yearly_comparison(petugas=None, years=2):
+    """Monthly volume and revenue of the last `years` years for a year-over-year view.
+
+    Reads only the four columns and the months it needs from both tiers.
+    """
+    first_year = datetime.date.today().year - years + 1
+    df = read_transactions(
+        columns=['tanggal', 'total_kg', 'total_paid', 'total_revenue'],
+        start=datetime.date(first_year, 1, 1), petugas=petugas
+    )
+    if df.empty:
+        return pd.DataFrame(columns=["Tahun", "Bulan", "Total_KG", "Total_Bayar_Nasabah", "Est_Pendapatan_Bank"])
+    df['Tahun'] = df['tanggal'].str[:4].astype(int)
+    df['Bulan'] = df['tanggal'].str[5:7].astype(int)
+    out = df.groupby(['Tahun', 'Bulan'], as_index=False)[['total_kg', 'total_paid', 'total_revenue']].sum()
+    return out.rename(columns={'total_kg': 'Total_KG', 'total_paid': 'Total_Bayar_Nasabah', 'total_revenue': 'Est_Pendapatan_Bank'})
@@ -1,12 +1,53 @@
+import secrets
 import sqlite3
+import threading
+import time
 import pandas as pd
 import datetime
+from collections import OrderedDict
+from modules import unit_store, archive_service, analytics_engine, metrics, replica
 
 DB_FILE = "users.db"
 
+# Weight columns in the transactions table and their display names
+CATEGORY_COLUMNS = {
+    'burnable': 'Burnable', 'paper': 'Paper', 'cloth': 'Cloth',
+    'cans': 'Cans', 'electronics': 'Electronics', 'pet_bottles': 'PET_Bottles',
+    'plastic_marks': 'Plastic_Marks', 'white_trays': 'White_Trays',
+    'glass_bottles': 'Glass_Bottles', 'metal_small': 'Metal_Small',
+    'hazardous': 'Hazardous',
+}
+
+# Every transactions column and its display name (the legacy CSV headers)
+TRANSACTION_COLUMNS = {
+    'id': 'id', 'timestamp': 'Timestamp', 'tanggal': 'Tanggal', 'nasabah': 'Nasabah',
+    'petugas': 'Petugas', 'lokasi': 'Lokasi',
+    **CATEGORY_COLUMNS,
+    'total_kg': 'Total_KG',
+    'total_paid': 'Total_Bayar_Nasabah',
+    'total_revenue': 'Est_Pendapatan_Bank',
+    'profit': 'Est_Profit',
+    'nasabah_id': 'Nasabah_ID',
+}
+
+# Compact dtypes for loaded transactions: few distinct names repeat on every
+# row, gram-level weights fit float32 and per-transaction rupiah fit int32.
+CATEGORICAL_COLUMNS = ['Nasabah', 'Petugas', 'Lokasi']
+DATE_COLUMNS = ['Tanggal', 'Timestamp']
+WEIGHT_DTYPE = 'float32'
+MONEY_COLUMNS = ['Total_Bayar_Nasabah', 'Est_Pendapatan_Bank', 'Est_Profit']
+MONEY_DTYPE = 'int32'
+
+# In-process cache of user profiles (no password hash), so a session restored
+# from its token and per-rerun user lookups don't query users.db each time
+PROFILE_TTL_SECONDS = 300
+PROFILE_CACHE_SIZE = 1024
+_profiles = OrderedDict()  # email -> (loaded at, profile or None)
+_profiles_lock = threading.Lock()
+
 def get_connection():
     """Create a database connection."""
-    conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+    conn = sqlite3.connect(DB_FILE, check_same_thread=False, factory=metrics.TimedConnection)
     return conn
 
 def init_db():
@@ -26,32 +67,73 @@ def init_db():
         )
     ''')
 
-    # Transactions Table (New)
+    # Login sessions behind the signed URL tokens (see auth_service); kept
+    # here so logout holds across restarts and every worker process
     c.execute('''
-        CREATE TABLE IF NOT EXISTS transactions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp TIMESTAMP,
-            tanggal DATE,
-            nasabah TEXT,
-            petugas TEXT,
-            lokasi TEXT,
-            
-            -- Waste Categories (Weights)
-            burnable REAL, paper REAL, cloth REAL, cans REAL,
-            electronics REAL, pet_bottles REAL, plastic_marks REAL,
-            white_trays REAL, glass_bottles REAL, metal_small REAL, hazardous REAL,
-            
-            -- Financials
-            total_kg REAL,
-            total_paid INTEGER,
-            total_revenue INTEGER,
-            profit INTEGER
+        CREATE TABLE IF NOT EXISTS auth_sessions (
+            id TEXT PRIMARY KEY,
+            email TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            revoked_at REAL
         )
     ''')
-    
+
     conn.commit()
     conn.close()
 
+    # Transactions live in one partition per unit (see unit_store)
+    unit_store.init_partitions()
+    _migrate_legacy_transactions()
+
+def _migrate_legacy_transactions():
+    """Move rows from the old single-file transactions table into unit partitions."""
+    conn = get_connection()
+    try:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='transactions'"
+        ).fetchone()
+        if not exists:
+            return
+        cursor = conn.execute("SELECT * FROM transactions")
+        columns = [d[0] for d in cursor.description]
+        legacy = cursor.fetchall()
+        if not legacy:
+            return
+        at_lokasi = columns.index('lokasi')
+        by_unit = {}
+        for row in legacy:
+            lokasi = row[at_lokasi] or unit_store.DEFAULT_UNIT
+            by_unit.setdefault(lokasi, []).append(row[:at_lokasi] + (lokasi,) + row[at_lokasi + 1:])
+
+        content = [c for c in columns if c != 'id']
+        insert_with_id = f"INSERT OR IGNORE INTO transactions ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        insert_new_id = f"INSERT INTO transactions ({', '.join(content)}) VALUES ({', '.join('?' * len(content))})"
+        same_row = f"SELECT 1 FROM transactions WHERE {' AND '.join(f'{c} IS ?' for c in content)} LIMIT 1"
+        for lokasi, rows in by_unit.items():
+            unit_conn = unit_store.get_unit_connection(lokasi)
+            try:
+                with unit_conn:
+                    for row in rows:
+                        values = [v for c, v in zip(columns, row) if c != 'id']
+                        # Rows keep their legacy ids where free
+                        if unit_conn.execute(insert_with_id, row).rowcount:
+                            continue
+                        # The id is taken: by this row (copied by an interrupted earlier run)
+                        # or by a different one (written to the partition meanwhile). Only
+                        # the latter is copied, under a new id.
+                        if not unit_conn.execute(same_row, values).fetchone():
+                            unit_conn.execute(insert_new_id, values)
+                unit_store.backfill_nasabah(unit_conn)
+            finally:
+                unit_conn.close()
+            # Every row is in the partition now
+            at_id = columns.index('id')
+            conn.executemany("DELETE FROM transactions WHERE id = ?", [(row[at_id],) for row in rows])
+            conn.commit()
+    finally:
+        conn.close()
+
 def create_user(email, password_hash, name, role="user"):
     """Register a new user."""
     conn = get_connection()
@@ -60,6 +142,7 @@ def create_user(email, password_hash, name, role="user"):
         c.execute('INSERT INTO users (email, password_hash, name, role) VALUES (?, ?, ?, ?)', 
                   (email, password_hash, name, role))
         conn.commit()
+        invalidate_profile(email)
         return True
     except sqlite3.IntegrityError:
         return False # Email already exists
@@ -87,28 +170,100 @@ def get_user_by_email(email):
         }
     return None
 
-def save_transaction(data):
-    """Save a transaction dictionary to SQLite."""
+def get_user_profile(email):
+    """Name, email and role of a user (cached for PROFILE_TTL_SECONDS), or None."""
+    now = time.monotonic()
+    with _profiles_lock:
+        hit = _profiles.get(email)
+        if hit is not None and now - hit[0] < PROFILE_TTL_SECONDS:
+            _profiles.move_to_end(email)
+            return hit[1]
+    return remember_profile(email, get_user_by_email(email))
+
+def remember_profile(email, user):
+    """Cache the profile part of a `get_user_by_email` row (e.g. right after login)."""
+    profile = {"id": user["id"], "name": user["name"], "email": user["email"], "role": user["role"]} if user else None
+    with _profiles_lock:
+        _profiles[email] = (time.monotonic(), profile)
+        _profiles.move_to_end(email)
+        while len(_profiles) > PROFILE_CACHE_SIZE:
+            _profiles.popitem(last=False)
+    return profile
+
+def invalidate_profile(email=None):
+    """Drop one cached profile (after it changed) or all of them."""
+    with _profiles_lock:
+        if email is None:
+            _profiles.clear()
+        else:
+            _profiles.pop(email, None)
+
+def create_auth_session(email, lifetime_seconds):
+    """Open a login session that ends after `lifetime_seconds` at the latest; returns its id."""
+    session_id = secrets.token_urlsafe(16)
+    now = time.time()
     conn = get_connection()
+    try:
+        with conn:
+            # Sessions past their hard expiry can never be restored again
+            conn.execute("DELETE FROM auth_sessions WHERE expires_at < ?", (now,))
+            conn.execute("INSERT INTO auth_sessions (id, email, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                         (session_id, email, now, now + lifetime_seconds))
+    finally:
+        conn.close()
+    return session_id
+
+def get_auth_session(session_id):
+    """Email of a login session that is neither revoked nor expired, else None."""
+    conn = get_connection()
+    try:
+        row = conn.execute("SELECT email FROM auth_sessions WHERE id = ? AND revoked_at IS NULL AND expires_at > ?",
+                           (session_id, time.time())).fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+def revoke_auth_session(session_id):
+    conn = get_connection()
+    try:
+        with conn:
+            conn.execute("UPDATE auth_sessions SET revoked_at = ? WHERE id = ?", (time.time(), session_id))
+    finally:
+        conn.close()
+
+def save_transaction(data):
+    """Save a transaction dictionary to the SQLite partition of its unit.
+
+    The customer row, its running balance and the ledger entry are written in
+    the same SQL transaction as the transaction row.
+    """
+    conn = unit_store.get_unit_connection(data['Lokasi'] or unit_store.DEFAULT_UNIT)
     c = conn.cursor()
     
     try:
-        c.execute('''
-            INSERT INTO transactions (
-                timestamp, tanggal, nasabah, petugas, lokasi,
-                burnable, paper, cloth, cans, electronics, pet_bottles, plastic_marks,
-                white_trays, glass_bottles, metal_small, hazardous,
-                total_kg, total_paid, total_revenue, profit
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            datetime.datetime.now(),
-            data['Tanggal'], data['Nasabah'], data['Petugas'], data['Lokasi'],
-            data['Burnable'], data['Paper'], data['Cloth'], data['Cans'],
-            data['Electronics'], data['PET_Bottles'], data['Plastic_Marks'],
-            data['White_Trays'], data['Glass_Bottles'], data['Metal_Small'], data['Hazardous'],
-            data['total_kg'], data['Total_Bayar_Nasabah'], data['Est_Pendapatan_Bank'], data['Est_Profit']
-        ))
-        conn.commit()
+        with conn:
+            now = datetime.datetime.now()
+            nasabah_id = unit_store.upsert_nasabah(c, data['Nasabah'], now) if str(data['Nasabah'] or '').strip() else None
+            c.execute('''
+                INSERT INTO transactions (
+                    timestamp, tanggal, nasabah, petugas, lokasi,
+                    burnable, paper, cloth, cans, electronics, pet_bottles, plastic_marks,
+                    white_trays, glass_bottles, metal_small, hazardous,
+                    total_kg, total_paid, total_revenue, profit, nasabah_id
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                now,
+                data['Tanggal'], data['Nasabah'], data['Petugas'], data['Lokasi'],
+                data['Burnable'], data['Paper'], data['Cloth'], data['Cans'],
+                data['Electronics'], data['PET_Bottles'], data['Plastic_Marks'],
+                data['White_Trays'], data['Glass_Bottles'], data['Metal_Small'], data['Hazardous'],
+                data['total_kg'], data['Total_Bayar_Nasabah'], data['Est_Pendapatan_Bank'], data['Est_Profit'],
+                nasabah_id
+            ))
+            if nasabah_id is not None:
+                unit_store.post_ledger(c, nasabah_id, 'setor', int(data['Total_Bayar_Nasabah'] or 0),
+                                       data['total_kg'] or 0.0, c.lastrowid, now)
+        replica.note_write(data['Lokasi'] or unit_store.DEFAULT_UNIT)
         return True
     except Exception as e:
         print(f"Error saving transaction: {e}")
@@ -116,39 +271,227 @@ def save_transaction(data):
     finally:
         conn.close()
 
-def get_all_transactions(petugas_filter=None):
-    """Fetch transactions as a Pandas DataFrame, optionally filtered by petugas."""
-    conn = get_connection()
+def get_nasabah(lokasi, nama):
+    """Master row of a customer of one unit (balance included), or None."""
+    conn = unit_store.get_unit_connection(lokasi)
     try:
-        query = "SELECT * FROM transactions"
-        params = ()
-        
-        if petugas_filter:
-            query += " WHERE petugas = ?"
-            params = (petugas_filter,)
-            
-        df = pd.read_sql_query(query, conn, params=params)
-        # Rename columns to match legacy CSV format for compatibility if needed, 
-        # or just map them properly in the dashboard.
-        
-        # Mapping back to friendly names for display
-        mapper = {
-            'timestamp': 'Timestamp', 'tanggal': 'Tanggal', 'nasabah': 'Nasabah',
-            'petugas': 'Petugas', 'lokasi': 'Lokasi',
-            'burnable': 'Burnable', 'paper': 'Paper', 'cloth': 'Cloth',
-            'cans': 'Cans', 'electronics': 'Electronics', 'pet_bottles': 'PET_Bottles',
-            'plastic_marks': 'Plastic_Marks', 'white_trays': 'White_Trays',
-            'glass_bottles': 'Glass_Bottles', 'metal_small': 'Metal_Small',
-            'hazardous': 'Hazardous',
-            'total_kg': 'Total_KG',
-            'total_paid': 'Total_Bayar_Nasabah',
-            'total_revenue': 'Est_Pendapatan_Bank',
-            'profit': 'Est_Profit'
+        row = conn.execute(
+            "SELECT id, nama, saldo, total_kg, jumlah_transaksi, last_transaction_at FROM nasabah WHERE nama_key = ?",
+            (unit_store.nasabah_key(nama),)
+        ).fetchone()
+    finally:
+        conn.close()
+    if row:
+        return {
+            "id": row[0],
+            "nama": row[1],
+            "saldo": row[2],
+            "total_kg": row[3],
+            "jumlah_transaksi": row[4],
+            "last_transaction_at": row[5]
         }
-        df.rename(columns=mapper, inplace=True)
-        return df
+    return None
+
+# Typo-tolerant matches are ranked on at most this many trigrams of the
+# query: the rarest ones in the unit that don't overlap each other, so every
+# part of the query counts and common trigrams ("rt ", "bu ") with long
+# posting lists stay out of the ranking. Trigrams are also dropped once their
+# posting lists would add up to more than FUZZY_MAX_POSTINGS rows.
+FUZZY_MAX_TRIGRAMS = 6
+FUZZY_MAX_POSTINGS = 10_000
+
+# In-process cache of per-trigram customer counts: the FTS vocabulary walks a
+# trigram's whole posting list to count it, and the counts only steer ranking
+TRIGRAM_DOCS_TTL_SECONDS = 300
+TRIGRAM_DOCS_CACHE_SIZE = 50_000
+_trigram_docs = OrderedDict()  # (partition path, trigram) -> (loaded at, customers)
+_trigram_docs_lock = threading.Lock()
+
+def _fts_phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+def _trigram_doc_counts(conn, lokasi, trigrams):
+    """Customers of the unit containing each trigram (0 when none)."""
+    now = time.monotonic()
+    path = unit_store.partition_path(lokasi)
+    counts, missing = {}, []
+    with _trigram_docs_lock:
+        for trigram in trigrams:
+            hit = _trigram_docs.get((path, trigram))
+            if hit is not None and now - hit[0] < TRIGRAM_DOCS_TTL_SECONDS:
+                counts[trigram] = hit[1]
+            else:
+                missing.append(trigram)
+    if not missing:
+        return counts
+    found = dict(conn.execute(
+        f"SELECT term, doc FROM nasabah_fts_vocab WHERE term IN ({','.join('?' * len(missing))})", missing
+    ).fetchall())
+    with _trigram_docs_lock:
+        for trigram in missing:
+            counts[trigram] = found.get(trigram, 0)
+            # Unseen trigrams are not cached, so a new customer is found right away
+            if counts[trigram]:
+                _trigram_docs[(path, trigram)] = (now, counts[trigram])
+                _trigram_docs.move_to_end((path, trigram))
+        while len(_trigram_docs) > TRIGRAM_DOCS_CACHE_SIZE:
+            _trigram_docs.popitem(last=False)
+    return counts
+
+def _fuzzy_matches(conn, lokasi, key, columns, limit):
+    """Customers sharing the most distinctive trigrams with `key`."""
+    counts = _trigram_doc_counts(conn, lokasi, {key[i:i + 3] for i in range(len(key) - 2)})
+    picked, postings = [], 0
+    for count, i in sorted((counts[key[i:i + 3]], i) for i in range(len(key) - 2) if counts[key[i:i + 3]]):
+        if picked and (len(picked) == FUZZY_MAX_TRIGRAMS or postings + count > FUZZY_MAX_POSTINGS):
+            break
+        if all(abs(i - j) >= 3 for j in picked):
+            picked.append(i)
+            postings += count
+    useful = sorted({key[i:i + 3] for i in picked})
+    if not useful:
+        return []
+    postings = " UNION ALL ".join(["SELECT rowid FROM nasabah_fts WHERE nasabah_fts MATCH ?"] * len(useful))
+    return conn.execute(
+        f"SELECT {columns} FROM (SELECT rowid, COUNT(*) AS hits FROM ({postings}) "
+        f"GROUP BY rowid ORDER BY hits DESC LIMIT ?) m JOIN nasabah n ON n.id = m.rowid ORDER BY m.hits DESC",
+        [_fts_phrase(t) for t in useful] + [limit]
+    ).fetchall()
+
+def search_nasabah(lokasi, query, limit=10):
+    """Autocomplete customers of one unit by name or RT/RW tag.
+
+    Substring hits come first, then typo-tolerant matches ranked by how many
+    trigrams of the query they share. Queries shorter than a trigram match
+    the start of any word of the name.
+    """
+    key = unit_store.nasabah_key(query)
+    if not key:
+        return []
+    columns = "n.id, n.nama, n.rt_rw, n.saldo"
+    conn = unit_store.get_unit_connection(lokasi)
+    try:
+        if len(key) < 3:
+            rows = conn.execute(
+                f"SELECT {columns} FROM nasabah n WHERE n.nama_key LIKE ? OR n.nama_key LIKE ? ORDER BY n.nama_key LIMIT ?",
+                (f"{key}%", f"% {key}%", limit)
+            ).fetchall()
+        else:
+            try:
+                rows = conn.execute(
+                    f"SELECT {columns} FROM nasabah_fts JOIN nasabah n ON n.id = nasabah_fts.rowid "
+                    f"WHERE nasabah_fts MATCH ? ORDER BY rank LIMIT ?", (_fts_phrase(key), limit)
+                ).fetchall()
+                if len(rows) < limit:
+                    seen = {r[0] for r in rows}
+                    rows += [r for r in _fuzzy_matches(conn, lokasi, key, columns, limit) if r[0] not in seen][:limit - len(rows)]
+            except sqlite3.OperationalError:
+                # No FTS5 in this SQLite build
+                rows = conn.execute(
+                    f"SELECT {columns} FROM nasabah n WHERE n.nama_key LIKE ? ORDER BY n.nama_key LIMIT ?",
+                    (f"%{key}%", limit)
+                ).fetchall()
+    finally:
+        conn.close()
+    return [{"id": r[0], "nama": r[1], "rt_rw": r[2], "saldo": r[3]} for r in rows]
+
+def get_nasabah_ledger(lokasi, nasabah_id, limit=10):
+    """Most recent ledger entries of a customer."""
+    conn = unit_store.get_unit_connection(lokasi)
+    try:
+        return pd.read_sql_query(
+            "SELECT timestamp AS Waktu, jenis AS Jenis, amount AS Jumlah, saldo_after AS Saldo "
+            "FROM nasabah_ledger WHERE nasabah_id = ? ORDER BY id DESC LIMIT ?",
+            conn, params=(nasabah_id, limit)
+        )
+    finally:
+        conn.close()
+
+def _compact_dtypes(df):
+    """Convert a loaded transaction frame to compact dtypes (in place)."""
+    for col in DATE_COLUMNS:
+        if col in df:
+            df[col] = pd.to_datetime(df[col], errors='coerce', format='ISO8601')
+    for col in CATEGORICAL_COLUMNS:
+        if col in df:
+            df[col] = df[col].astype('category')
+    for col in [*CATEGORY_COLUMNS.values(), 'Total_KG']:
+        if col in df:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(WEIGHT_DTYPE)
+    for col in MONEY_COLUMNS:
+        if col in df:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).round().astype(MONEY_DTYPE)
+    if 'Nasabah_ID' in df:
+        df['Nasabah_ID'] = pd.to_numeric(df['Nasabah_ID'], errors='coerce').astype('Int32')
+    return df
+
+def get_all_transactions(petugas_filter=None):
+    """Fetch transactions of all units (hot and archived) as a Pandas DataFrame, optionally filtered by petugas.
+
+    Columns carry their display names (aliased in SQL/Arrow, no rename copy)
+    and compact dtypes; `Tanggal` and `Timestamp` are already datetimes.
+    """
+    try:
+        df = archive_service.read_transactions(petugas=petugas_filter, aliases=TRANSACTION_COLUMNS)
+        return _compact_dtypes(df)
     except Exception as e:
         print(f"Error reading transactions: {e}")
         return pd.DataFrame()
-    finally:
-        conn.close()
+
+def memory_report(df):
+    """Deep memory usage per column of a DataFrame, largest first."""
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'Kolom': usage.index,
+        'Tipe': [str(df[c].dtype) for c in usage.index],
+        'Memori (KB)': usage.values / 1024,
+    })
+    return report.sort_values('Memori (KB)', ascending=False, ignore_index=True)
+
+def _petugas_clause(petugas_filter):
+    if petugas_filter:
+        return " WHERE petugas = ?", (petugas_filter,)
+    return "", ()
+
+def get_category_totals(petugas_filter=None):
+    """Total weight per category plus payouts across all units (display names as index)."""
+    where, params = _petugas_clause(petugas_filter)
+    sums = ", ".join(f"COALESCE(SUM({col}), 0) AS {name}" for col, name in CATEGORY_COLUMNS.items())
+    query = (f"SELECT COUNT(*) AS Jumlah_Transaksi, {sums}, "
+             f"COALESCE(SUM(total_paid), 0) AS Total_Bayar_Nasabah FROM transactions{where}")
+    merged = analytics_engine.query(query, params)
+    if merged is not None:
+        # The DuckDB view already spans hot and archived rows
+        return merged.iloc[0]
+    totals = unit_store.aggregate(query, params)
+
+    # Archived months: read only the summed columns
+    cold = archive_service.read_archive(columns=[*CATEGORY_COLUMNS, 'total_paid'], petugas=petugas_filter)
+    if not cold.empty:
+        cold_totals = cold.sum().rename({**CATEGORY_COLUMNS, 'total_paid': 'Total_Bayar_Nasabah'})
+        cold_totals['Jumlah_Transaksi'] = len(cold)
+        totals = totals.add(cold_totals, fill_value=0)[totals.index]
+    return totals
+
+def get_daily_totals(petugas_filter=None):
+    """Total collected weight per day across all units."""
+    where, params = _petugas_clause(petugas_filter)
+    weight = " + ".join(f"COALESCE({col}, 0)" for col in CATEGORY_COLUMNS)
+    query = f"SELECT tanggal AS Tanggal, SUM({weight}) AS \"Berat (kg)\" FROM transactions{where} GROUP BY tanggal"
+    merged = analytics_engine.query(query, params)
+    if merged is not None:
+        df, cold = merged, pd.DataFrame()
+    else:
+        df = unit_store.aggregate(query, params, group_by='Tanggal')
+        cold = archive_service.read_archive(columns=['tanggal', *CATEGORY_COLUMNS], petugas=petugas_filter)
+    if not cold.empty:
+        cold_daily = pd.DataFrame({
+            'Tanggal': cold['tanggal'],
+            'Berat (kg)': cold[list(CATEGORY_COLUMNS)].fillna(0).sum(axis=1),
+        }).groupby('Tanggal', as_index=False).sum()
+        df = pd.concat([df, cold_daily], ignore_index=True) if not df.empty else cold_daily
+
+    if not df.empty:
+        df['Tanggal'] = pd.to_datetime(df['Tanggal'])
+        df = df.groupby('Tanggal', as_index=False).sum().sort_values('Tanggal', ignore_index=True)
+    return df
@@ -1,8 +1,34 @@
+import base64
 import hashlib
+import hmac
+import os
+import threading
+import time
 import streamlit as st
 import re
 from modules import auth_db
 
+# Extra admin emails (comma separated), for deployments without a role editor
+ADMIN_EMAILS_ENV = "BANK_SAMPAH_ADMINS"
+
+# Signed session tokens: "<session id>.<issued unix time>.<HMAC-SHA256>" kept
+# in the URL (?s=...), so a browser refresh or reconnect restores the login
+# without re-running the password check. The session id points at a row in
+# users.db (auth_db.auth_sessions): logout revokes that row, which holds across
+# restarts and worker processes, and every session ends SESSION_MAX_SECONDS
+# after login however often its token is renewed. The key comes from
+# BANK_SAMPAH_SECRET or is generated once into SECRET_FILE.
+# The token is a bearer credential: anyone given the page URL (a shared link,
+# browser history on a shared laptop) is logged in until logout or expiry.
+SECRET_ENV = "BANK_SAMPAH_SECRET"
+SECRET_FILE = "data/session_secret"
+TOKEN_PARAM = "s"
+TOKEN_TTL_SECONDS = 12 * 3600  # one long shift without activity
+SESSION_MAX_SECONDS = 24 * 3600  # hard cap, sliding renewal included
+
+_secret = None
+_secret_lock = threading.Lock()
+
 # Initialize DB on first load
 auth_db.init_db()
 
@@ -19,17 +45,89 @@ def is_valid_email(email):
     pattern = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
     return re.match(pattern, email) is not None
 
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+def _get_secret():
+    global _secret
+    with _secret_lock:
+        if _secret is None:
+            env = os.environ.get(SECRET_ENV)
+            if env:
+                _secret = env.encode()
+            else:
+                os.makedirs(os.path.dirname(SECRET_FILE) or ".", exist_ok=True)
+                try:
+                    fd = os.open(SECRET_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                    with os.fdopen(fd, "w") as f:
+                        f.write(_b64(os.urandom(32)))
+                except FileExistsError:
+                    pass
+                with open(SECRET_FILE) as f:
+                    _secret = f.read().strip().encode()
+        return _secret
+
+def _sign(body):
+    return _b64(hmac.new(_get_secret(), body.encode(), hashlib.sha256).digest())
+
+def issue_token(session_id, issued=None):
+    """Signed token for the login session `session_id`."""
+    body = f"{session_id}.{int(time.time() if issued is None else issued)}"
+    return f"{body}.{_sign(body)}"
+
+def verify_token(token):
+    """(email, issued, session id) of a valid, unexpired token of a live session, else None."""
+    try:
+        session_id, issued_part, signature = token.split(".")
+        body = f"{session_id}.{issued_part}"
+        if not hmac.compare_digest(signature, _sign(body)):
+            return None
+        issued = int(issued_part)
+    except (AttributeError, ValueError):
+        return None
+    if not 0 <= time.time() - issued <= TOKEN_TTL_SECONDS:
+        return None
+    # Signature and age are checked first so forged tokens never reach the database
+    email = auth_db.get_auth_session(session_id)
+    if email is None:
+        return None
+    return email, issued, session_id
+
+def _start_session(profile, session_id):
+    st.session_state['logged_in'] = True
+    st.session_state['auth_session'] = session_id
+    st.session_state['user_info'] = {
+        "name": profile['name'],
+        "email": profile['email'],
+        "role": profile['role']
+    }
+
+def restore_session():
+    """Log the session in from the token in the URL; True when logged in."""
+    if st.session_state.get('logged_in'):
+        return True
+    token = st.query_params.get(TOKEN_PARAM)
+    if not token:
+        return False
+    verified = verify_token(token)
+    profile = auth_db.get_user_profile(verified[0]) if verified else None
+    if profile is None:
+        del st.query_params[TOKEN_PARAM]
+        return False
+    _start_session(profile, verified[2])
+    if time.time() - verified[1] > TOKEN_TTL_SECONDS / 2:
+        # Sliding expiry: a tab that keeps coming back stays signed in (up to SESSION_MAX_SECONDS)
+        st.query_params[TOKEN_PARAM] = issue_token(verified[2])
+    return True
+
 def login(email, password):
     """Attempt to log in a user."""
     user = auth_db.get_user_by_email(email)
     
     if user and verify_password(user['password_hash'], password):
-        st.session_state['logged_in'] = True
-        st.session_state['user_info'] = {
-            "name": user['name'],
-            "email": user['email'],
-            "role": user['role']
-        }
+        session_id = auth_db.create_auth_session(user['email'], SESSION_MAX_SECONDS)
+        _start_session(auth_db.remember_profile(user['email'], user), session_id)
+        st.query_params[TOKEN_PARAM] = issue_token(session_id)
         return True
     return False
 
@@ -54,5 +152,19 @@ def register(email, password, name):
 
 def logout():
     """Log out the current user."""
+    session_id = st.session_state.get('auth_session')
+    if session_id:
+        auth_db.revoke_auth_session(session_id)
+    st.session_state['auth_session'] = None
+    if TOKEN_PARAM in st.query_params:
+        del st.query_params[TOKEN_PARAM]
     st.session_state['logged_in'] = False
     st.session_state['user_info'] = {}
+
+def is_admin(user_info=None):
+    """Whether the logged-in user may open the admin/monitoring pages."""
+    user_info = user_info if user_info is not None else st.session_state.get('user_info', {})
+    if user_info.get('role') == 'admin':
+        return True
+    admins = {e.strip().lower() for e in os.environ.get(ADMIN_EMAILS_ENV, "").split(",") if e.strip()}
+    return (user_info.get('email') or '').lower() in admins
@@ -0,0 +1,104 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Process-wide cache of prebuilt plotly figures.
+# Building a figure (px/go construction + validation) dominates chart-heavy
+# reruns; identical inputs now reuse the figure built by any earlier rerun or
+# session. Builders must be module-level pure functions of their arguments,
+# and callers must not mutate the returned figure.
+MAX_ENTRIES = 256
+WEBGL_THRESHOLD = 1000  # Scatter traces above this many points render with WebGL
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+def _update_hash(h, obj):
+    if isinstance(obj, pd.DataFrame):
+        h.update(b"df")
+        h.update(repr((list(obj.columns), [str(t) for t in obj.dtypes])).encode())
+        try:
+            h.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+        except TypeError:
+            # Unhashable cells (lists, dicts): fall back to the text form
+            h.update(obj.to_json().encode())
+    elif isinstance(obj, pd.Series):
+        h.update(b"series")
+        h.update(repr((obj.name, str(obj.dtype))).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(b"nd")
+        h.update(repr((obj.dtype.str, obj.shape)).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"seq%d" % len(obj))
+        for item in obj:
+            _update_hash(h, item)
+    elif isinstance(obj, dict):
+        h.update(b"map%d" % len(obj))
+        for k in sorted(obj, key=repr):
+            _update_hash(h, k)
+            _update_hash(h, obj[k])
+    else:
+        h.update(repr(obj).encode())
+
+def figure_key(builder, args, kwargs):
+    """Hash of the builder identity and every input it receives."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{builder.__module__}.{builder.__qualname__}".encode())
+    _update_hash(h, args)
+    _update_hash(h, kwargs)
+    return h.hexdigest()
+
+def use_webgl(fig, threshold=WEBGL_THRESHOLD):
+    """Swap large Scatter traces for Scattergl (in place)."""
+    new_data = []
+    changed = False
+    for trace in fig.data:
+        if trace.type == "scatter" and trace.x is not None and len(trace.x) > threshold:
+            spec = trace.to_plotly_json()
+            spec.pop("type", None)
+            # WebGL lines do not support spline smoothing
+            if spec.get("line", {}).get("shape") == "spline":
+                spec["line"]["shape"] = "linear"
+            # Drop scatter-only properties (e.g. orientation, stackgroup)
+            new_data.append(go.Scattergl(spec, skip_invalid=True))
+            changed = True
+        else:
+            new_data.append(trace)
+    if changed:
+        fig.data = ()
+        fig.add_traces(new_data)
+    return fig
+
+def figure(builder, *args, **kwargs):
+    """Return the figure `builder(*args, **kwargs)`, building it only on a cache miss."""
+    key = figure_key(builder, args, kwargs)
+    with _lock:
+        fig = _cache.get(key)
+        if fig is not None:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return fig
+        _stats["misses"] += 1
+
+    fig = use_webgl(builder(*args, **kwargs))
+
+    with _lock:
+        _cache[key] = fig
+        while len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return fig
+
+def stats():
+    """Hit/miss counters and current size of the figure cache."""
+    with _lock:
+        return {**_stats, "entries": len(_cache)}
+
+def clear():
+    with _lock:
+        _cache.clear()
@@ -1,31 +1,36 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from modules import chart_cache
+
+def composition_pie(comp_data):
+    return px.pie(comp_data, values='Berat (kg)', names='Kategori', color_discrete_sequence=px.colors.sequential.Greens_r, hole=0.4)
+
+def daily_trend_line(daily_trend):
+    fig = px.line(daily_trend, x='Tanggal', y='Berat (kg)', markers=True, line_shape='spline')
+    fig.update_traces(line_color='#2E7d32')
+    return fig
 
 def show():
     st.title("Dashboard Sirkular Ekonomi")
     st.markdown("Monitoring Ekosistem Bank Sampah")
 
-    import os
-    from modules import auth_db
+    from modules import auth_db, replica
+    st.caption(replica.staleness_caption())
 
-    # Load Real Data if available
+    # Aggregates are computed inside each unit partition and merged,
+    # instead of loading every transaction row into the page
     # Filter by Current Logged In User
     current_user_name = st.session_state.get('user_info', {}).get('name')
-    df = auth_db.get_all_transactions(petugas_filter=current_user_name)
+    totals = auth_db.get_category_totals(petugas_filter=current_user_name)
     
-    if not df.empty:
-        # df['Tanggal'] already handled by get_all_transactions or needs to be ensured as datetime
-        df['Tanggal'] = pd.to_datetime(df['Tanggal'])
-        
+    if totals.get('Jumlah_Transaksi', 0) > 0:
         # Calculate Metrics
-        total_organic = df['Burnable'].sum() # Burnable is largely organic/compostable
+        total_organic = totals['Burnable'] # Burnable is largely organic/compostable
         
         # Precision Materials (Recyclables)
         recyclable_cols = ['Paper', 'Cloth', 'Cans', 'Electronics', 'PET_Bottles', 'Plastic_Marks', 'White_Trays', 'Glass_Bottles', 'Metal_Small', 'Hazardous']
-        total_precision = df[recyclable_cols].sum().sum()
-        
-        total_waste = total_organic + total_precision
+        total_precision = totals[recyclable_cols].sum()
         
         total_waste = total_organic + total_precision
         
@@ -36,14 +41,11 @@ def show():
         # Calculate Current Inventory Value based on LATEST Sell Prices (Market-to-Market)
         current_market_value = 0
         for category, rates in prices_config.items():
-            if category in df.columns:
-                current_market_value += df[category].sum() * rates['sell']
+            if category in totals.index:
+                current_market_value += totals[category] * rates['sell']
         
         # Cost is Historical (Cash Out)
-        if 'Total_Bayar_Nasabah' in df.columns:
-            total_cost = df['Total_Bayar_Nasabah'].sum()
-        else:
-            total_cost = 0 # Assume 0 if legacy data
+        total_cost = totals.get('Total_Bayar_Nasabah', 0)
             
         total_revenue = current_market_value
         total_profit = total_revenue - total_cost
@@ -70,24 +72,22 @@ def show():
         with c1:
             st.subheader("Komposisi Sampah (Live)")
             # Sum each column for composition
-            comp_data = df[['Burnable'] + recyclable_cols].sum().reset_index()
+            comp_data = totals[['Burnable'] + recyclable_cols].reset_index()
             comp_data.columns = ['Kategori', 'Berat (kg)']
             comp_data = comp_data[comp_data['Berat (kg)'] > 0] # Hide zeros
             
             if not comp_data.empty:
-                fig = px.pie(comp_data, values='Berat (kg)', names='Kategori', color_discrete_sequence=px.colors.sequential.Greens_r, hole=0.4)
+                fig = chart_cache.figure(composition_pie, comp_data)
                 st.plotly_chart(fig, use_container_width=True)
             else:
                 st.info("Belum ada data komposisi.")
 
         with c2:
             st.subheader("Tren Pengumpulan Harian")
-            daily_trend = df.groupby('Tanggal')[['Burnable'] + recyclable_cols].sum().sum(axis=1).reset_index()
-            daily_trend.columns = ['Tanggal', 'Berat (kg)']
+            daily_trend = auth_db.get_daily_totals(petugas_filter=current_user_name)
             
             if not daily_trend.empty:
-                fig2 = px.line(daily_trend, x='Tanggal', y='Berat (kg)', markers=True, line_shape='spline')
-                fig2.update_traces(line_color='#2E7d32')
+                fig2 = chart_cache.figure(daily_trend_line, daily_trend)
                 st.plotly_chart(fig2, use_container_width=True)
             else:
                 st.info("Belum ada data tren harian.")
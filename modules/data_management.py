@@ -2,21 +2,66 @@ import streamlit as st
 import pandas as pd
 import os
 import json
+import importlib.util
+import plotly.express as px
+from modules import archive_service, auth_service, chart_cache, job_runner, report_service  # report_service registers the export jobs
+
+MONTH_LABELS = ['Jan', 'Feb', 'Mar', 'Apr', 'Mei', 'Jun', 'Jul', 'Agu', 'Sep', 'Okt', 'Nov', 'Des']
+
+def report_job(kind, label, params, owner):
+    """Submit button plus polled status/download for one background report job.
+
+    `owner` (the user's email) is the only one who can download the result.
+    """
+    jobs = st.session_state.setdefault('report_jobs', {})
+    if st.button(label, key=f"submit_{kind}"):
+        jobs[kind] = job_runner.submit(kind, params, owner=owner)
+
+    job = job_runner.get_job(jobs.get(kind))
+    if job is None:
+        return
+    polling = job['status'] in ('queued', 'running')
+
+    @st.fragment(run_every=1.0 if polling else None)
+    def job_status():
+        job = job_runner.get_job(jobs[kind])
+        if job['status'] in ('queued', 'running'):
+            st.progress(job['progress'] or 0.0, text=job['message'] or "Menunggu antrian...")
+        elif job['status'] == 'done':
+            data, file_name, mime = job_runner.get_result(job['id'], owner)
+            st.download_button(label=f"📥 Unduh {file_name}", data=data, file_name=file_name, mime=mime, key=f"download_{kind}")
+        else:
+            st.error(f"Gagal membuat laporan: {job['error']}")
+        if polling and job['status'] not in ('queued', 'running'):
+            # Full rerun stops the polling
+            st.rerun()
+
+    job_status()
+
+def yoy_chart(yoy):
+    """Monthly collected weight, one line per year."""
+    fig = px.line(yoy.assign(Tahun=yoy['Tahun'].astype(str)), x='Bulan', y='Total_KG', color='Tahun',
+                  markers=True, title="Perbandingan Volume Bulanan (Year-over-Year)",
+                  labels={'Total_KG': 'Total (kg)'})
+    fig.update_xaxes(tickmode='array', tickvals=list(range(1, 13)), ticktext=MONTH_LABELS)
+    return fig
 
 def show():
     st.title("📂 Manajemen Data & Laporan")
     st.markdown("### *Pusat Data Logistik & Transparansi*")
     st.markdown("Unduh data transaksi dan konfigurasi sistem untuk keperluan audit atau backup.")
 
-    tab1, tab2 = st.tabs(["📊 Laporan Transaksi (Logbook)", "⚙️ Konfigurasi Harga"])
+    tab1, tab2, tab3 = st.tabs(["📊 Laporan Transaksi (Logbook)", "⚙️ Konfigurasi Harga", "🗄️ Arsip & Tahunan"])
 
     # --- TAB 1: Transaction Data (CSV) ---
     with tab1:
         st.subheader("Rekap Transaksi Harian")
         
-        from modules import auth_db
+        from modules import auth_db, replica
+        st.caption(replica.staleness_caption())
         # Filter by Current Logged In User
         current_user_name = st.session_state.get('user_info', {}).get('name')
+        current_user_email = st.session_state.get('user_info', {}).get('email')
         df = auth_db.get_all_transactions(petugas_filter=current_user_name)
         
         if not df.empty:
@@ -53,6 +98,12 @@ def show():
                 with st.expander("🔍 Lihat Detail Lengkap (Semua Jenis Sampah)"):
                     st.dataframe(df, use_container_width=True)
 
+                with st.expander("🧠 Penggunaan Memori Data"):
+                    report = auth_db.memory_report(df)
+                    st.caption(f"Total {report['Memori (KB)'].sum() / 1024:,.2f} MB untuk {len(df):,} transaksi.")
+                    st.dataframe(report, use_container_width=True, hide_index=True,
+                                 column_config={"Memori (KB)": st.column_config.NumberColumn(format="%.1f")})
+
                 # Metrics Summary
                 st.markdown("---")
                 c1, c2, c3 = st.columns(3)
@@ -66,61 +117,18 @@ def show():
                     total_paid = df['Total_Bayar_Nasabah'].sum()
                     with c3: st.metric("Uang Beredar (Nasabah)", f"Rp {total_paid:,.0f}")
 
-                st.download_button(
-                    label="📥 Unduh Laporan (.csv)",
-                    data=df.to_csv(index=False).encode('utf-8'),
-                    file_name='Laporan_Bank_Sampah.csv',
-                    mime='text/csv',
-                    type="primary"
-                )
-
-                # --- PDF Export Logic ---
-                try:
-                    from fpdf import FPDF
-                    
-                    def create_pdf(dataframe):
-                        pdf = FPDF()
-                        pdf.add_page()
-                        pdf.set_font("Arial", size=12)
-                        
-                        # Title
-                        pdf.set_font("Arial", style="B", size=16)
-                        pdf.cell(200, 10, txt="Laporan Transaksi Bank Sampah", ln=True, align='C')
-                        pdf.ln(10)
-                        
-                        # Table Header
-                        pdf.set_font("Arial", style="B", size=10)
-                        cols = ["Tanggal", "Nasabah", "Total KG", "Rp Dibayar"]
-                        col_widths = [40, 60, 30, 40]
-                        
-                        for i, col in enumerate(cols):
-                            pdf.cell(col_widths[i], 10, col, 1, 0, 'C')
-                        pdf.ln()
-                        
-                        # Table Rows
-                        pdf.set_font("Arial", size=10)
-                        for _, row in dataframe.iterrows():
-                            # Safe string conversion and formatting
-                            pdf.cell(col_widths[0], 10, str(row['Tanggal']), 1)
-                            pdf.cell(col_widths[1], 10, str(row['Nama_Nasabah'])[:25], 1) # Truncate long names
-                            pdf.cell(col_widths[2], 10, f"{row['Total_KG']:.1f}", 1, 0, 'R')
-                            pdf.cell(col_widths[3], 10, f"{int(row['Total_Bayar_Nasabah']):,}", 1, 0, 'R')
-                            pdf.ln()
-                            
-                        return pdf.output(dest='S').encode('latin-1', 'replace')
-
-                    pdf_bytes = create_pdf(df)
-                    
-                    st.download_button(
-                        label="📄 Unduh Laporan (.pdf)",
-                        data=pdf_bytes,
-                        file_name='Laporan_Bank_Sampah.pdf',
-                        mime='application/pdf'
-                    )
-                except ImportError:
-                    st.warning("Library 'fpdf' belum terinstall. PDF tidak tersedia.")
-                except Exception as e:
-                    st.error(f"Gagal membuat PDF: {e}")
+                # --- Exports run as background jobs (no blocking rerun) ---
+                st.markdown("#### 📤 Ekspor Laporan")
+                st.caption("Laporan dibuat di latar belakang. Anda bisa berpindah menu dan kembali untuk mengunduh.")
+                report_params = {'petugas': current_user_name}
+                ex1, ex2 = st.columns(2)
+                with ex1:
+                    report_job("export_csv", "📥 Buat Laporan (.csv)", report_params, current_user_email)
+                with ex2:
+                    if importlib.util.find_spec("fpdf") is not None:
+                        report_job("report_pdf", "📄 Buat Laporan (.pdf)", report_params, current_user_email)
+                    else:
+                        st.warning("Library 'fpdf' belum terinstall. PDF tidak tersedia.")
 
             except Exception as e:
                 st.error(f"Gagal memuat data CSV: {e}")
@@ -147,3 +155,35 @@ def show():
             )
         else:
             st.info("Menggunakan konfigurasi default (Belum ada file custom).")
+
+    # --- TAB 3: Cold archive & year-over-year ---
+    with tab3:
+        st.subheader("Perbandingan Tahunan")
+        yoy = archive_service.yearly_comparison(petugas=current_user_name)
+        if not yoy.empty:
+            st.plotly_chart(chart_cache.figure(yoy_chart, yoy), use_container_width=True)
+            pivot = yoy.pivot_table(index='Bulan', columns='Tahun', values='Total_KG', fill_value=0)
+            pivot.index = [MONTH_LABELS[m - 1] for m in pivot.index]
+            st.dataframe(pivot, use_container_width=True)
+        else:
+            st.info("Belum ada data untuk perbandingan tahunan.")
+
+        st.markdown("---")
+        st.subheader("Arsip Transaksi (Parquet)")
+        if not archive_service.available():
+            st.warning("Library 'pyarrow' belum terinstall. Arsip tidak tersedia.")
+        else:
+            st.caption("Transaksi lama dipindahkan ke file Parquet bulanan terkompresi, "
+                       "sehingga database aktif tetap kecil. Data arsip tetap ikut dalam laporan.")
+            if auth_service.is_admin():
+                horizon = st.number_input("Arsipkan transaksi lebih tua dari (hari)", min_value=30,
+                                          value=archive_service.ARCHIVE_HORIZON_DAYS, step=30)
+                report_job("archive_transactions", "🗄️ Jalankan Pengarsipan",
+                           {'horizon_days': int(horizon), 'requested_by': current_user_email}, current_user_email)
+            else:
+                st.info("Pengarsipan hanya dapat dijalankan oleh admin.")
+
+            summary = archive_service.archive_summary()
+            if not summary.empty:
+                st.dataframe(summary, use_container_width=True, hide_index=True,
+                             column_config={"Ukuran (KB)": st.column_config.NumberColumn(format="%.1f")})
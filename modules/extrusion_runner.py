@@ -0,0 +1,194 @@
+import collections
+import itertools
+import threading
+import time
+import uuid
+import numpy as np
+
+# --- Extrusion Line Constants ---
+TARGET_DIAMETER = 1.75      # mm
+DIAMETER_TOLERANCE = 0.05   # ±0.05 mm
+MAX_SPEED_RPM = 50
+MAX_OUTPUT_KG_H = 1.2       # Output at full motor speed
+YIELD = 0.95                # Yield loss during extrusion ~5%
+OPTIMAL_TEMP = 255          # °C, best melt flow for rPET
+AMBIENT_TEMP = 30
+HEATING_TAU_MIN = 8         # First-order heating time constant (minutes)
+READY_BAND = 5              # Line runs once nozzle is within ±5°C of target
+JAM_PROBABILITY = 0.005     # Chance per minute of a filament break / jam
+JAM_MINUTES = (5, 10)
+MAX_KEPT_RUNS = 20
+MAX_INPUT_KG = 25           # One hopper load
+MAX_RUN_MINUTES = 24 * 60   # Simulated minutes; longer runs are refused or cut off
+LOG_SAMPLES = 600           # Most recent samples kept per run for the charts
+
+_runs = {}
+_runs_lock = threading.Lock()
+
+
+class OEETracker:
+    """Incremental OEE (Availability x Performance x Quality) over a sample stream."""
+
+    def __init__(self, minutes_per_sample=1.0):
+        self.minutes_per_sample = minutes_per_sample
+        self.planned_min = 0.0
+        self.running_min = 0.0
+        self.output_kg = 0.0
+        self.samples_running = 0
+        self.samples_in_spec = 0
+
+    def update(self, sample):
+        """Fold one sample into the running counters."""
+        self.planned_min += self.minutes_per_sample
+        if sample["state"] != "running":
+            return
+        self.running_min += self.minutes_per_sample
+        self.output_kg += sample["output_kg"]
+        self.samples_running += 1
+        if abs(sample["diameter"] - TARGET_DIAMETER) <= DIAMETER_TOLERANCE:
+            self.samples_in_spec += 1
+
+    def snapshot(self):
+        """Current availability, performance, quality and OEE in percent."""
+        availability = self.running_min / self.planned_min if self.planned_min else 0.0
+        ideal_kg = MAX_OUTPUT_KG_H * self.running_min / 60
+        performance = self.output_kg / ideal_kg if ideal_kg else 0.0
+        quality = self.samples_in_spec / self.samples_running if self.samples_running else 0.0
+        return {
+            "availability": availability * 100,
+            "performance": performance * 100,
+            "quality": quality * 100,
+            "oee": availability * performance * quality * 100,
+        }
+
+
+class ExtrusionRun:
+    """One simulated extrusion run executing on a background thread."""
+
+    def __init__(self, target_temp, motor_speed, input_qty, seconds_per_sample=0.05, seed=None):
+        # A stopped motor or empty hopper would never reach the target output
+        if motor_speed <= 0:
+            raise ValueError("Kecepatan motor harus lebih dari 0 RPM")
+        if input_qty <= 0:
+            raise ValueError("Input flakes harus lebih dari 0 kg")
+        if input_qty > MAX_INPUT_KG:
+            raise ValueError(f"Input flakes maksimal {MAX_INPUT_KG} kg per run")
+        minutes = input_qty * YIELD / (MAX_OUTPUT_KG_H * (motor_speed / MAX_SPEED_RPM) / 60)
+        if minutes > MAX_RUN_MINUTES:
+            raise ValueError(f"Run butuh ±{minutes / 60:.0f} jam simulasi (maks. {MAX_RUN_MINUTES // 60} jam). "
+                             "Naikkan kecepatan motor atau kurangi input.")
+        self.id = uuid.uuid4().hex[:8]
+        self.target_temp = target_temp
+        self.motor_speed = motor_speed
+        self.input_qty = input_qty
+        self.target_output_kg = input_qty * YIELD
+        self.seconds_per_sample = seconds_per_sample
+        self.status = "queued"
+        self.log = collections.deque(maxlen=LOG_SAMPLES)
+        self.oee = OEETracker()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._rng = np.random.default_rng(seed)
+
+    def _samples(self):
+        """Generate one sample per simulated minute until the input is used up."""
+        rng = self._rng
+        temp = float(AMBIENT_TEMP)
+        rate_kg_min = MAX_OUTPUT_KG_H * (self.motor_speed / MAX_SPEED_RPM) / 60
+        produced = 0.0
+        jam_left = 0
+        minute = 0
+        # Jams and slow heating can stretch a run; stop at MAX_RUN_MINUTES either way
+        while produced < self.target_output_kg and minute < MAX_RUN_MINUTES:
+            minute += 1
+            temp += (self.target_temp - temp) / HEATING_TAU_MIN + rng.normal(0, 0.5)
+            # Cold melt is viscous: loads the motor and widens the diameter spread
+            deviation = abs(temp - OPTIMAL_TEMP)
+            motor_load = (self.motor_speed / MAX_SPEED_RPM) * 100 + max(0.0, OPTIMAL_TEMP - temp) * 0.5 + rng.normal(0, 2)
+
+            if jam_left == 0 and rng.random() < JAM_PROBABILITY:
+                jam_left = int(rng.integers(*JAM_MINUTES))
+
+            if abs(temp - self.target_temp) > READY_BAND:
+                state = "heating"
+            elif jam_left > 0:
+                state = "jam"
+                jam_left -= 1
+            else:
+                state = "running"
+
+            if state == "running":
+                output = min(rate_kg_min * rng.uniform(0.95, 1.02), self.target_output_kg - produced)
+                diameter = TARGET_DIAMETER + rng.normal(0, 0.015 + 0.0015 * deviation)
+            else:
+                output = 0.0
+                diameter = 0.0
+            produced += output
+
+            yield {
+                "minute": minute,
+                "state": state,
+                "temperature": temp,
+                "diameter": diameter,
+                "motor_load": min(100.0, max(0.0, motor_load)),
+                "output_kg": output,
+                "produced_kg": produced,
+            }
+
+    def run(self):
+        """Thread body: append samples to the run log and update OEE incrementally."""
+        self.status = "running"
+        self.started_at = time.time()
+        produced = 0.0
+        for sample in self._samples():
+            if self._stop.is_set():
+                break
+            with self._lock:
+                self.log.append(sample)
+                self.oee.update(sample)
+            produced = sample["produced_kg"]
+            time.sleep(self.seconds_per_sample)
+        self.status = "done" if produced >= self.target_output_kg else "stopped"
+        self.finished_at = time.time()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def is_active(self):
+        return self.status in ("queued", "running")
+
+    def snapshot(self, tail=LOG_SAMPLES):
+        """Thread-safe copy of the current run state with the last `tail` log samples."""
+        with self._lock:
+            log = list(itertools.islice(self.log, max(0, len(self.log) - tail), None))
+            oee = self.oee.snapshot()
+        produced = log[-1]["produced_kg"] if log else 0.0
+        return {
+            "id": self.id,
+            "status": self.status,
+            "progress": min(1.0, produced / self.target_output_kg) if self.target_output_kg else 1.0,
+            "produced_kg": produced,
+            "log": log,
+            "oee": oee,
+        }
+
+
+def start_run(target_temp, motor_speed, input_qty, **kwargs):
+    """Start an extrusion run in the background and return its id."""
+    run = ExtrusionRun(target_temp, motor_speed, input_qty, **kwargs)
+    with _runs_lock:
+        _runs[run.id] = run
+        # Keep only the most recent runs in memory
+        for old_id in list(_runs)[:-MAX_KEPT_RUNS]:
+            if not _runs[old_id].is_active:
+                del _runs[old_id]
+    threading.Thread(target=run.run, name=f"extrusion-{run.id}", daemon=True).start()
+    return run.id
+
+
+def get_run(run_id):
+    with _runs_lock:
+        return _runs.get(run_id)
@@ -4,6 +4,22 @@ import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, timedelta
+from modules import chart_cache, process_models
+
+def sensor_gauge(title, value, axis_range, bar_color, steps, reference=None, threshold=None):
+    gauge = {
+        'axis': {'range': axis_range},
+        'bar': {'color': bar_color},
+        'steps': [{'range': r, 'color': c} for r, c in steps],
+    }
+    if threshold is not None:
+        gauge['threshold'] = {'line': {'color': threshold[1], 'width': 4}, 'thickness': 0.75, 'value': threshold[0]}
+    return go.Figure(go.Indicator(
+        mode = "gauge+number+delta" if reference is not None else "gauge+number",
+        value = value,
+        delta = {'reference': reference} if reference is not None else None,
+        title = {'text': title},
+        gauge = gauge))
 
 def show():
     st.title("🏭 Real-Time Fermentation Command Center")
@@ -52,26 +68,25 @@ def show():
     delta = current_time - start_datetime
     days_running = delta.days
     hours_running = delta.seconds // 3600
-    total_days_target = 21 # 3 Weeks Fermentation Standard
+    total_days_target = process_models.COMPOST_DAYS # 3 Weeks Fermentation Standard
+    maturity = process_models.compost_maturity(days_running, total_days_target)
     
     # 1. Batch Progress
-    progress_pct = min(100, max(0, (days_running / total_days_target) * 100))
+    progress_pct = maturity['progress_pct']
     progress_label = f"Day {days_running}" if days_running >= 0 else "Pending"
     
-    # 2. C/N Ratio Simulation (Decomposes from 30:1 down to ~15:1 usually)
-    # y = mx + c -> Start 30, Target 15 at day 21
-    cn_start = 30
-    cn_current = max(10, cn_start - (days_running * (15/21)))
+    # 2. C/N Ratio Simulation (Decomposes from 30:1 down to ~15:1 at day 21)
+    cn_start = process_models.CN_START
+    cn_current = maturity['cn_current']
     cn_display = f"{cn_current:.1f}:1"
     
     # 3. Quality Score Simulation (Increases as it matures, sensitive to temp stability)
-    # Base score increases with time, maxing at 98. Add some simulated fluctuation.
+    # Base score increases with time, maxing at ~95. Add some simulated fluctuation.
     if days_running < 0:
         quality_score = 0
     else:
-        base_quality = 50 + (progress_pct * 0.45) # Max ~95 from progress
         live_fluctuation = np.random.uniform(-0.5, 1.5) # Sensor noise
-        quality_score = min(99.9, base_quality + live_fluctuation)
+        quality_score = min(99.9, maturity['base_quality'] + live_fluctuation)
         
     quality_delta = np.random.uniform(-0.5, 0.8) # Week over week change
 
@@ -109,8 +124,9 @@ def show():
         """, unsafe_allow_html=True)
 
     with kpi4:
-         estimated_yield = input_waste_kg * 0.4 # Yield 40% (1000kg -> 400kg)
-         polybag_count = int(estimated_yield / 0.1) # 100gr per polybag
+         batch_output = process_models.compost(input_waste_kg) # Yield 40% (1000kg -> 400kg)
+         estimated_yield = batch_output['output_solid_kg']
+         polybag_count = int(batch_output['polybag_count']) # 100gr per polybag
          st.markdown(f"""
         <div class="metric-card">
             <h4 style="margin:0">Estimasi Output</h4>
@@ -154,53 +170,31 @@ def show():
     
     with g1:
         # Temperature Gauge
-        fig_temp = go.Figure(go.Indicator(
-            mode = "gauge+number+delta",
-            value = target_temp + np.random.uniform(-2, 2), # Simulate reading
-            delta = {'reference': 60},
-            title = {'text': "Suhu Inti (°C)"},
-            gauge = {
-                'axis': {'range': [None, 90]},
-                'bar': {'color': "#d32f2f"},
-                'steps': [
-                    {'range': [0, 50], 'color': "#FFEBEE"},
-                    {'range': [50, 70], 'color': "#C8E6C9"}, # Ideal
-                    {'range': [70, 90], 'color': "#FFEBEE"}],
-                'threshold': {'line': {'color': "green", 'width': 4}, 'thickness': 0.75, 'value': target_temp}
-            }))
+        fig_temp = chart_cache.figure(
+            sensor_gauge, "Suhu Inti (°C)",
+            round(target_temp + np.random.uniform(-2, 2), 1), # Simulate reading
+            [None, 90], "#d32f2f",
+            [([0, 50], "#FFEBEE"), ([50, 70], "#C8E6C9"), ([70, 90], "#FFEBEE")], # 50-70: Ideal
+            reference=60, threshold=(target_temp, "green"))
         st.plotly_chart(fig_temp, use_container_width=True)
 
     with g2:
         # Moisture Gauge
-        fig_moist = go.Figure(go.Indicator(
-            mode = "gauge+number+delta",
-            value = target_moisture + np.random.uniform(-5, 5),
-            delta = {'reference': 50},
-            title = {'text': "Kelembaban (%)"},
-            gauge = {
-                'axis': {'range': [None, 100]},
-                'bar': {'color': "#0288D1"},
-                'steps': [
-                    {'range': [0, 40], 'color': "#E3F2FD"},
-                    {'range': [40, 60], 'color': "#E1F5FE"}, # Ideal
-                    {'range': [60, 100], 'color': "#E3F2FD"}],
-                'threshold': {'line': {'color': "blue", 'width': 4}, 'thickness': 0.75, 'value': target_moisture}
-            }))
+        fig_moist = chart_cache.figure(
+            sensor_gauge, "Kelembaban (%)",
+            round(target_moisture + np.random.uniform(-5, 5), 1),
+            [None, 100], "#0288D1",
+            [([0, 40], "#E3F2FD"), ([40, 60], "#E1F5FE"), ([60, 100], "#E3F2FD")], # 40-60: Ideal
+            reference=50, threshold=(target_moisture, "blue"))
         st.plotly_chart(fig_moist, use_container_width=True)
 
     with g3:
         # Oxygen/Aeration Gauge (Simulated)
-        fig_o2 = go.Figure(go.Indicator(
-            mode = "gauge+number",
-            value = np.random.uniform(10, 15),
-            title = {'text': "Kadar Oksigen (%)"},
-            gauge = {
-                'axis': {'range': [0, 21]},
-                'bar': {'color': "#7CB342"},
-                'steps': [
-                    {'range': [0, 5], 'color': "#FFEBEE"}, # Anaerobic danger
-                    {'range': [5, 21], 'color': "#F1F8E9"}]
-            }))
+        fig_o2 = chart_cache.figure(
+            sensor_gauge, "Kadar Oksigen (%)",
+            round(np.random.uniform(10, 15), 1),
+            [0, 21], "#7CB342",
+            [([0, 5], "#FFEBEE"), ([5, 21], "#F1F8E9")]) # 0-5: Anaerobic danger
         st.plotly_chart(fig_o2, use_container_width=True)
 
     # --- 3. Production Analytics ---
@@ -322,31 +316,23 @@ def show():
             ratio_liquid = st.slider("Rasio Konversi POC (%)", 0, 50, 10, help="% Input jadi Pupuk Cair")
 
     # --- Calculations ---
-    # Output Calculation
-    output_solid_kg = estimated_yield # Defined earlier (approx 40% of input)
-    output_liquid_l = (input_waste_kg * (ratio_liquid/100)) # 10% input becomes POC
-    
-    # Cost Calculation
+    # Batch economics: 40% solid output, ratio_liquid % of input becomes POC,
+    # OPEX from the editor plus depreciation over 4 batches per month
     total_capex = capex_machine + capex_infra
-    monthly_depreciation = total_capex / depreciation_months
-    batch_depreciation = monthly_depreciation / 4 # Assume 4 batches per month
-    
-    # OPEX is now dynamic from editor
-    total_cogs = total_opex + batch_depreciation # Total Cost per Batch
-    
-    # Unit Cost (HPP) - Weighted
-    hpp_per_kg = total_cogs / (output_solid_kg + output_liquid_l) if (output_solid_kg + output_liquid_l) > 0 else 0
-    
-    # Revenue Calculation
-    rev_solid = output_solid_kg * price_solid
-    rev_liquid = output_liquid_l * price_liquid
-    total_revenue = rev_solid + rev_liquid
-    
-    gross_profit = total_revenue - total_opex
-    net_profit = total_revenue - total_cogs
-    
-    margin_pct = (net_profit / total_revenue) * 100 if total_revenue > 0 else 0
-    roi_pct = (net_profit / total_cogs) * 100 if total_cogs > 0 else 0
+    economics = process_models.compost(input_waste_kg, price_solid, price_liquid, ratio_liquid,
+                                       total_opex, total_capex, depreciation_months)
+    output_solid_kg = economics['output_solid_kg']
+    output_liquid_l = economics['output_liquid_l']
+    batch_depreciation = economics['batch_depreciation']
+    total_cogs = economics['total_cogs'] # Total Cost per Batch
+    hpp_per_kg = economics['hpp_per_kg'] # Unit Cost (HPP) - Weighted
+    rev_solid = economics['rev_solid']
+    rev_liquid = economics['rev_liquid']
+    total_revenue = economics['total_revenue']
+    gross_profit = economics['gross_profit']
+    net_profit = economics['net_profit']
+    margin_pct = economics['margin_pct']
+    roi_pct = economics['roi_pct']
     
     # --- Visualization ---
     tab_overview, tab_structure, tab_bep = st.tabs(["📊 Profit Sheet", "🍰 Struktur Biaya", "📉 Break-Even Analysis"])
@@ -0,0 +1,247 @@
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# In-process background jobs (reports, exports, rebuilds).
+# Job state and results live in SQLite so any rerun or session can poll them.
+# Several processes may share the database (Streamlit workers, check_db.py,
+# benchmarks): each job records the pid of the process running it, which
+# refreshes a heartbeat while it has unfinished jobs. Only jobs whose owner is
+# gone (dead pid, or no heartbeat for STALE_AFTER_SECONDS) are failed.
+JOBS_DB = "data/jobs.db"
+MAX_WORKERS = 2
+RESULT_RETENTION_DAYS = 7
+HEARTBEAT_SECONDS = 15
+STALE_AFTER_SECONDS = 4 * HEARTBEAT_SECONDS
+
+_handlers = {}
+_executor = None
+_heartbeat = None
+_submit_lock = threading.Lock()
+_initialized = False
+
+def register_job(kind, func):
+    """Register a handler: func(params, progress) -> (data_bytes, file_name, mime).
+
+    `progress(fraction, message="")` reports completion between 0 and 1.
+    """
+    _handlers[kind] = func
+
+def get_connection():
+    os.makedirs(os.path.dirname(JOBS_DB) or ".", exist_ok=True)
+    return sqlite3.connect(JOBS_DB, check_same_thread=False, timeout=30)
+
+def init_jobs_db():
+    """Create the job table and fail jobs whose owning process is gone."""
+    global _initialized
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute("PRAGMA journal_mode=WAL")
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            job_key TEXT NOT NULL,
+            params TEXT,
+            owner TEXT,
+            status TEXT NOT NULL,
+            progress REAL DEFAULT 0,
+            message TEXT,
+            result BLOB,
+            result_name TEXT,
+            result_mime TEXT,
+            error TEXT,
+            created_at TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP,
+            worker_pid INTEGER,
+            heartbeat_at REAL
+        )
+    ''')
+    columns = {row[1] for row in c.execute("PRAGMA table_info(jobs)")}
+    if 'worker_pid' not in columns:
+        c.execute("ALTER TABLE jobs ADD COLUMN worker_pid INTEGER")
+        c.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_key_status ON jobs (job_key, status)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_owner ON jobs (owner, created_at)")
+    _fail_orphans(conn)
+    cutoff = datetime.datetime.now() - datetime.timedelta(days=RESULT_RETENTION_DAYS)
+    c.execute("DELETE FROM jobs WHERE finished_at < ?", (cutoff,))
+    conn.commit()
+    conn.close()
+    _initialized = True
+
+def _process_alive(pid):
+    """False only when `pid` certainly no longer exists on this host."""
+    if os.name == "nt":
+        return True  # signal 0 is CTRL_C_EVENT on Windows; rely on the heartbeat
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # exists but belongs to another user
+    return True
+
+def _fail_orphans(conn):
+    """Fail unfinished jobs whose owning process has died or stopped heartbeating."""
+    stale_before = time.time() - STALE_AFTER_SECONDS
+    rows = conn.execute("SELECT id, worker_pid, heartbeat_at FROM jobs WHERE status IN ('queued', 'running')").fetchall()
+    orphans = [
+        (job_id,) for job_id, pid, beat in rows
+        if pid is None or beat is None or beat < stale_before or not _process_alive(pid)
+    ]
+    if orphans:
+        conn.executemany("UPDATE jobs SET status = 'failed', error = 'Dihentikan karena proses aplikasi berhenti', "
+                         "finished_at = ? WHERE id = ?", [(datetime.datetime.now(), job_id) for (job_id,) in orphans])
+        conn.commit()
+
+def _beat():
+    """Heartbeat loop: refresh this process's unfinished jobs, exit when there are none."""
+    global _heartbeat
+    while True:
+        # Under the submit lock so a job queued right now cannot miss the heartbeat
+        with _submit_lock:
+            conn = get_connection()
+            try:
+                pending = conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE worker_pid = ? AND status IN ('queued', 'running')",
+                                       (time.time(), os.getpid())).rowcount
+                conn.commit()
+            finally:
+                conn.close()
+            if not pending:
+                _heartbeat = None
+                return
+        time.sleep(HEARTBEAT_SECONDS)
+
+def _ensure_heartbeat():
+    # Caller holds _submit_lock
+    global _heartbeat
+    if _heartbeat is None:
+        _heartbeat = threading.Thread(target=_beat, name="job-runner-heartbeat", daemon=True)
+        _heartbeat.start()
+
+def _ensure_initialized():
+    if not _initialized:
+        init_jobs_db()
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="job-runner")
+    return _executor
+
+def job_key(kind, params):
+    """Identity of a job: identical kind and parameters from one owner share one in-flight run."""
+    payload = json.dumps({"kind": kind, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+def submit(kind, params=None, owner=None):
+    """Queue a job and return its id; an identical queued/running job of the same owner is reused."""
+    if kind not in _handlers:
+        raise ValueError(f"Unknown job kind: {kind}")
+    _ensure_initialized()
+    params = params or {}
+    key = job_key(kind, params)
+
+    with _submit_lock:
+        conn = get_connection()
+        try:
+            _fail_orphans(conn)
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE job_key = ? AND owner IS ? AND status IN ('queued', 'running') "
+                "ORDER BY created_at DESC LIMIT 1", (key, owner)
+            ).fetchone()
+            if row:
+                return row[0]
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, kind, job_key, params, owner, status, created_at, worker_pid, heartbeat_at) "
+                "VALUES (?, ?, ?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, kind, key, json.dumps(params, default=str), owner, datetime.datetime.now(),
+                 os.getpid(), time.time())
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        _ensure_heartbeat()
+
+    _get_executor().submit(_run, job_id, kind, params)
+    return job_id
+
+def _update(job_id, **fields):
+    conn = get_connection()
+    try:
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+def _run(job_id, kind, params):
+    _update(job_id, status="running", started_at=datetime.datetime.now())
+
+    def progress(fraction, message=""):
+        _update(job_id, progress=max(0.0, min(1.0, float(fraction))), message=message)
+
+    try:
+        data, file_name, mime = _handlers[kind](params, progress)
+        _update(job_id, status="done", progress=1.0, result=sqlite3.Binary(data),
+                result_name=file_name, result_mime=mime, finished_at=datetime.datetime.now())
+    except Exception as e:
+        traceback.print_exc()
+        _update(job_id, status="failed", error=str(e), finished_at=datetime.datetime.now())
+
+_STATUS_COLUMNS = "id, kind, owner, status, progress, message, result_name, result_mime, error, created_at, started_at, finished_at"
+
+def _row_to_dict(row):
+    keys = [k.strip() for k in _STATUS_COLUMNS.split(",")]
+    return dict(zip(keys, row))
+
+def get_job(job_id):
+    """Status, progress and result metadata of a job (without the result payload)."""
+    if not job_id:
+        return None
+    _ensure_initialized()
+    conn = get_connection()
+    try:
+        _fail_orphans(conn)
+        row = conn.execute(f"SELECT {_STATUS_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    return _row_to_dict(row) if row else None
+
+def get_result(job_id, owner):
+    """Return (data_bytes, file_name, mime) of a finished job submitted by `owner`, or None."""
+    _ensure_initialized()
+    conn = get_connection()
+    try:
+        row = conn.execute(
+            "SELECT result, result_name, result_mime FROM jobs WHERE id = ? AND owner IS ? AND status = 'done'",
+            (job_id, owner)
+        ).fetchone()
+    finally:
+        conn.close()
+    if not row:
+        return None
+    return bytes(row[0]), row[1], row[2]
+
+def list_jobs(owner=None, limit=20):
+    """Most recent jobs, optionally only those submitted by `owner`."""
+    _ensure_initialized()
+    conn = get_connection()
+    try:
+        if owner:
+            rows = conn.execute(f"SELECT {_STATUS_COLUMNS} FROM jobs WHERE owner = ? ORDER BY created_at DESC LIMIT ?", (owner, limit)).fetchall()
+        else:
+            rows = conn.execute(f"SELECT {_STATUS_COLUMNS} FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+    finally:
+        conn.close()
+    return [_row_to_dict(r) for r in rows]
@@ -1,27 +1,9 @@
 import streamlit as st
-from modules import auth_service
+from modules import auth_service, static_assets
 import time
 
 def show():
-    # Centralized Clean Layout
-    st.markdown("""
-    <style>
-        .login-container {
-            padding: 30px;
-            border-radius: 15px;
-            background-color: white;
-            box-shadow: 0 4px 15px rgba(0,0,0,0.1);
-            margin-top: 50px;
-        }
-        .stTabs [data-baseweb="tab-list"] {
-            gap: 10px;
-        }
-        .stTabs [data-baseweb="tab"] {
-            flex-grow: 1;
-        }
-    </style>
-    """, unsafe_allow_html=True)
-
+    # Centralized Clean Layout (styles live in static/app.css)
     col1, col2, col3 = st.columns([1, 1.5, 1])
     
     with col2:
@@ -29,7 +11,7 @@ def show():
             st.markdown('<div class="login-container">', unsafe_allow_html=True)
             
             # Header
-            st.image("https://img.icons8.com/color/144/000000/recycle-sign.png", width=80)
+            static_assets.logo(width=80)
             st.markdown("<h2 style='text-align: center; color: #2E7d32; margin-bottom: 0;'>AgriSensa Access</h2>", unsafe_allow_html=True)
             st.markdown("<p style='text-align: center; color: #666; font-size: 0.9em;'>Bank Sampah Terpadu & Ecosystem</p>", unsafe_allow_html=True)
             st.markdown("---")
@@ -3,6 +3,7 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
+from modules import chart_cache, maggot_forecast, process_models
 
 def create_gauge(title, value, max_val, suffix=""):
     fig = go.Figure(go.Indicator(
@@ -22,6 +23,43 @@ def create_gauge(title, value, max_val, suffix=""):
     fig.update_layout(height=150, margin=dict(l=10, r=10, t=30, b=10))
     return fig
 
+def mass_balance_sankey(values):
+    # Sankey Diagram for Mass Balance
+    labels = ["Organic Waste Input", "Maggot Biomass", "Kasgot (Fertilizer)", "Water Vapor/Metabolism"]
+    fig = go.Figure(data=[go.Sankey(
+        node = dict(
+          pad = 15,
+          thickness = 20,
+          line = dict(color = "black", width = 0.5),
+          label = labels,
+          color = ["#2E7d32", "#FF9800", "#795548", "#B0BEC5"]
+        ),
+        link = dict(
+          source = [0, 0, 0],
+          target = [1, 2, 3],
+          value = values
+        ))])
+    fig.update_layout(title_text="Mass Balance (Harian)", height=300)
+    return fig
+
+def feed_demand_chart(forecast, supply_kg):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=forecast["Hari"], y=forecast["Kebutuhan Pakan (kg)"], name="Kebutuhan Pakan", line=dict(color="#795548")))
+    fig.add_hline(y=supply_kg, line_dash="dash", annotation_text="Suplai Sampah Organik")
+    fig.update_layout(xaxis_title="Hari ke-", yaxis_title="kg/hari", height=300)
+    return fig
+
+def output_chart(forecast):
+    fig = px.line(forecast, x="Hari", y=["Panen Maggot (kg)", "Kasgot (kg)", "Stok Prepupa (kg)"],
+                  color_discrete_sequence=["#FF9800", "#795548", "#B0BEC5"])
+    fig.update_layout(yaxis_title="kg", legend_title_text="", height=300)
+    return fig
+
+def revenue_chart(revenue_cum):
+    fig = px.line(revenue_cum, x="Hari", y=["Jual Segar", "Jual Kering"], color_discrete_sequence=["#2E7d32", "#F9A825"])
+    fig.update_layout(yaxis_title="Pendapatan Kumulatif (Rp)", legend_title_text="", height=300)
+    return fig
+
 def show():
     st.title("🦗 Bioconversion Center (Maggot BSF)")
     st.markdown("### *Integrated Waste-to-Protein System*")
@@ -32,6 +70,9 @@ def show():
         st.header("⚙️ Cultivation Input")
         waste_input_daily = st.number_input("Input Sampah Organik (kg/hari)", min_value=10, value=50, step=10)
         gram_telur = st.number_input("Input Telur BSF (gram)", min_value=1.0, value=5.0, step=1.0)
+        egg_interval = st.slider("Interval Tebar Telur (hari)", 1, 14, 7, help="Jadwal pembelian/penetasan batch telur baru.")
+        hatch_days = st.slider("Lama Penetasan (hari)", 3, 4, maggot_forecast.HATCH_DAYS)
+        harvest_day = st.slider("Umur Panen (hari)", 18, 21, maggot_forecast.HARVEST_DAY)
         
         st.markdown("---")
         st.header("🧮 Pricing Simulation")
@@ -44,18 +85,15 @@ def show():
     
     col_metrics, col_visual = st.columns([1, 2])
     
-    # Bioconversion Parameters
-    bioconversion_rate = 0.20 # 20% waste becomes Maggot biomass
-    residue_rate = 0.30       # 30% waste becomes Kasgot (Residue)
-    reduction_rate = 0.50     # 50% waste reduced (Water loss/Metabolism)
-    
-    # Calculation
-    est_maggot_biomass = waste_input_daily * bioconversion_rate
-    est_kasgot = waste_input_daily * residue_rate
+    # Bioconversion: 20% of the waste becomes maggot biomass, 30% kasgot, 50% is lost as water/metabolism
+    daily = process_models.maggot(waste_input_daily, price_fresh, price_dried, price_kasgot)
+    est_maggot_biomass = daily['est_maggot_biomass']
+    est_kasgot = daily['est_kasgot']
+    reduction_rate = process_models.MAGGOT_REDUCTION
     
     # FCR (Feed Conversion Ratio)
     # How much feed needed for 1kg biomass. E.g. 5kg waste -> 1kg maggot = FCR 5.
-    fcr = waste_input_daily / est_maggot_biomass if est_maggot_biomass > 0 else 0
+    fcr = daily['fcr']
     
     with col_metrics:
         st.metric("Waste Reduction Index", f"{reduction_rate*100:.0f}%", "Volume Berkurang")
@@ -63,26 +101,8 @@ def show():
         st.metric("Survival Rate (Est)", "85%", "Kepadatan Optimal")
 
     with col_visual:
-        # Sankey Diagram for Mass Balance
-        labels = ["Organic Waste Input", "Maggot Biomass", "Kasgot (Fertilizer)", "Water Vapor/Metabolism"]
-        source = [0, 0, 0]
-        target = [1, 2, 3]
-        value = [est_maggot_biomass, est_kasgot, waste_input_daily * reduction_rate]
-        
-        fig = go.Figure(data=[go.Sankey(
-            node = dict(
-              pad = 15,
-              thickness = 20,
-              line = dict(color = "black", width = 0.5),
-              label = labels,
-              color = ["#2E7d32", "#FF9800", "#795548", "#B0BEC5"]
-            ),
-            link = dict(
-              source = source,
-              target = target,
-              value = value
-            ))])
-        fig.update_layout(title_text="Mass Balance (Harian)", height=300)
+        value = [est_maggot_biomass, est_kasgot, daily['waste_reduced']]
+        fig = chart_cache.figure(mass_balance_sankey, value)
         st.plotly_chart(fig, use_container_width=True)
 
     st.markdown("---")
@@ -92,24 +112,56 @@ def show():
     
     c1, c2, c3, c4 = st.columns(4)
     with c1:
-        st.info("**Fase Penetasan**\n3-4 Hari")
+        st.info(f"**Fase Penetasan**\n{hatch_days} Hari")
     with c2:
-        st.warning("**Fase Biokonversi**\n14-18 Hari (Makan Aktif)")
+        st.warning(f"**Fase Biokonversi**\n{harvest_day - hatch_days} Hari (Makan Aktif)")
     with c3:
-        st.success("**Panen Maggot**\nHari ke-18 sd 21")
+        st.success(f"**Panen Maggot**\nHari ke-{harvest_day}")
     with c4:
         st.error("**Fase Prepupa**\nStop Makan (Indukan)")
+
+    # Cohort simulation: overlapping egg batches over 1 year
+    egg_schedule = maggot_forecast.build_egg_schedule(gram_telur, egg_interval, horizon_days=365)
+    forecast = maggot_forecast.simulate_cohorts(
+        egg_schedule, hatch_days=hatch_days, harvest_day=harvest_day,
+        price_fresh=price_fresh, price_dried=price_dried, price_kasgot=price_kasgot
+    )
+    # Steady state starts once the first batch has been harvested
+    steady = forecast[forecast["Hari"] > harvest_day]
+    avg_feed = steady["Kebutuhan Pakan (kg)"].mean()
+    deficit_days = int((forecast["Kebutuhan Pakan (kg)"] > waste_input_daily).sum())
+    recommended_eggs = maggot_forecast.eggs_for_daily_feed(waste_input_daily) * egg_interval
+
+    f1, f2, f3, f4 = st.columns(4)
+    f1.metric("Rata-rata Kebutuhan Pakan", f"{avg_feed:,.1f} kg/hari", f"Suplai: {waste_input_daily} kg/hari", delta_color="off")
+    f2.metric("Hari Kekurangan Pakan", f"{deficit_days} hari", "dalam 365 hari", delta_color="inverse")
+    f3.metric("Total Panen Maggot (1 Tahun)", f"{forecast['Panen Maggot (kg)'].sum():,.0f} kg")
+    f4.metric("Rekomendasi Telur per Batch", f"{recommended_eggs:,.1f} gram", f"Setiap {egg_interval} hari", delta_color="off")
+
+    tab_feed, tab_output, tab_revenue = st.tabs(["🍂 Kebutuhan Pakan", "📦 Panen & Kasgot", "💵 Pendapatan"])
+    with tab_feed:
+        fig_feed = chart_cache.figure(feed_demand_chart, forecast[["Hari", "Kebutuhan Pakan (kg)"]], waste_input_daily)
+        st.plotly_chart(fig_feed, use_container_width=True)
+    with tab_output:
+        fig_out = chart_cache.figure(output_chart, forecast[["Hari", "Panen Maggot (kg)", "Kasgot (kg)", "Stok Prepupa (kg)"]])
+        st.plotly_chart(fig_out, use_container_width=True)
+    with tab_revenue:
+        revenue_cum = forecast[["Hari"]].assign(**{
+            "Jual Segar": forecast["Pendapatan Segar (Rp)"].cumsum(),
+            "Jual Kering": forecast["Pendapatan Kering (Rp)"].cumsum(),
+        })
+        fig_rev = chart_cache.figure(revenue_chart, revenue_cum)
+        st.plotly_chart(fig_rev, use_container_width=True)
+
+    with st.expander("📋 Tabel Forecast Harian"):
+        st.dataframe(forecast, use_container_width=True, hide_index=True)
         
     # --- 3. Economic Potential ---
     st.subheader("💰 Potensi Ekonomi (Harian)")
     
-    revenue_fresh = est_maggot_biomass * price_fresh
     # Dry maggot usually 30% weight of fresh
-    revenue_dry = (est_maggot_biomass * 0.3) * price_dried 
-    revenue_kasgot = est_kasgot * price_kasgot
-    
-    total_rev_fresh_market = revenue_fresh + revenue_kasgot
-    total_rev_dry_market = revenue_dry + revenue_kasgot
+    total_rev_fresh_market = daily['total_rev_fresh_market']
+    total_rev_dry_market = daily['total_rev_dry_market']
     
     ce1, ce2 = st.columns(2)
     
@@ -127,7 +179,7 @@ def show():
         <div class="metric-card">
             <h4>Skenario B: Jual Kering (Dried)</h4>
             <h2>Rp {total_rev_dry_market:,.0f}</h2>
-            <p>Dried Maggot: {(est_maggot_biomass*0.3):.1f} kg + Kasgot: {est_kasgot:.1f} kg</p>
+            <p>Dried Maggot: {daily['dried_kg']:.1f} kg + Kasgot: {est_kasgot:.1f} kg</p>
         </div>
         """, unsafe_allow_html=True)
     
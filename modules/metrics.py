@@ -0,0 +1,313 @@
+import bisect
+import collections
+import contextlib
+import datetime
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import pandas as pd
+
+# In-process metrics registry (histograms and counters) for page renders,
+# SQL queries and price loading. Exported as a Prometheus text file that a
+# node_exporter textfile collector (or a human) can read.
+METRICS_FILE = "data/metrics.prom"
+SLOW_QUERY_LOG = "data/slow_queries.jsonl"
+FLUSH_INTERVAL_SECONDS = 10
+SLOW_QUERY_SECONDS = 0.1
+RECENT_SLOW_QUERIES = 200
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+HELP = {
+    "page_render_seconds": "Time to run a page's show()",
+    "sql_query_seconds": "Time to execute a SQL statement and fetch its rows",
+    "sql_rows_total": "Rows returned or changed per SQL statement",
+    "price_load_seconds": "Time to load the price configuration",
+    "replica_refresh_seconds": "Time to copy a unit partition into its read replica",
+    "metrics_flush_errors_total": "Failed writes of the Prometheus exposition file",
+    "analytics_sync_seconds": "Time to bring the DuckDB mirror of a unit up to date",
+    "analytics_queries_total": "Queries answered by the DuckDB analytics mirror",
+    "analytics_fallbacks_total": "DuckDB analytics failures answered by the SQLite path instead",
+}
+
+_lock = threading.Lock()
+_write_lock = threading.Lock()
+_histograms = {}
+_counters = collections.Counter()
+_slow_queries = collections.deque(maxlen=RECENT_SLOW_QUERIES)
+_last_flush = 0.0
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count", "max")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = BUCKETS[i - 1] if i else 0.0
+                upper = min(BUCKETS[i], self.max)
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.max
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+def observe(name, value, **labels):
+    """Record one value (seconds) in the histogram `name` with `labels`."""
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = Histogram()
+        hist.observe(value)
+
+def inc(name, amount=1, **labels):
+    with _lock:
+        _counters[_key(name, labels)] += amount
+
+@contextlib.contextmanager
+def timer(name, **labels):
+    """Time a block into histogram `name`; also records blocks left by an exception (e.g. st.rerun)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+def timed(name, **labels):
+    """Decorator form of timer()."""
+    def decorate(func):
+        def wrapper(*args, **kwargs):
+            with timer(name, **labels):
+                return func(*args, **kwargs)
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func
+        return wrapper
+    return decorate
+
+# --- SQL instrumentation ---
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+def fingerprint(sql):
+    """SQL text with literals and IN-lists collapsed, so equal statements share one series."""
+    text = " ".join(sql.split())
+    text = _LITERALS.sub("?", text)
+    text = _IN_LISTS.sub("(...)", text)
+    return text[:200]
+
+def record_query(sql, duration, rows):
+    fp = fingerprint(sql)
+    observe("sql_query_seconds", duration, query=fp)
+    if rows > 0:
+        inc("sql_rows_total", rows, query=fp)
+    if duration >= SLOW_QUERY_SECONDS:
+        entry = {"timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+                 "query": fp, "rows": rows, "seconds": round(duration, 4)}
+        with _lock:
+            _slow_queries.append(entry)
+        try:
+            os.makedirs(os.path.dirname(SLOW_QUERY_LOG) or ".", exist_ok=True)
+            with open(SLOW_QUERY_LOG, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError:
+            pass
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that records each statement's execute + fetch time and row count."""
+
+    _pending = None
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending:
+            sql, duration, rows = pending
+            if rows == 0 and self.rowcount > 0:
+                rows = self.rowcount  # INSERT/UPDATE/DELETE
+            record_query(sql, duration, rows)
+
+    def _timed(self, method, sql, *args):
+        self._finish()
+        start = time.perf_counter()
+        try:
+            return method(sql, *args)
+        finally:
+            self._pending = [sql, time.perf_counter() - start, 0]
+
+    def execute(self, sql, parameters=()):
+        return self._timed(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(super().executemany, sql, seq_of_parameters)
+
+    def _fetch(self, method, *args):
+        start = time.perf_counter()
+        result = method(*args)
+        if self._pending:
+            self._pending[1] += time.perf_counter() - start
+            if isinstance(result, list):
+                self._pending[2] += len(result)
+            elif result is not None:
+                self._pending[2] += 1
+        return result
+
+    def fetchone(self):
+        row = self._fetch(super().fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._fetch(super().fetchmany, size if size is not None else self.arraysize)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._fetch(super().fetchall)
+        self._finish()
+        return rows
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass  # interpreter shutdown
+
+class TimedConnection(sqlite3.Connection):
+    """sqlite3 connection whose cursors (including conn.execute) are TimedCursors.
+
+    Use as `sqlite3.connect(path, factory=TimedConnection)`.
+    """
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    # The C implementations of these shortcuts bypass cursor()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+# --- Reporting & export ---
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    parts = []
+    for k, v in labels:
+        v = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+def render_prometheus():
+    """All metrics in the Prometheus text exposition format."""
+    with _lock:
+        histograms = [(k, list(h.counts), h.sum, h.count) for k, h in _histograms.items()]
+        counters = list(_counters.items())
+    lines = []
+    for metric in sorted({name for (name, _), *_ in histograms}):
+        lines.append(f"# HELP {metric} {HELP.get(metric, metric)}")
+        lines.append(f"# TYPE {metric} histogram")
+        for (name, labels), counts, total, count in histograms:
+            if name != metric:
+                continue
+            cumulative = 0
+            for bound, n in zip(BUCKETS, counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{metric}_bucket{_label_text(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{metric}_sum{_label_text(labels)} {total:.6f}")
+            lines.append(f"{metric}_count{_label_text(labels)} {count}")
+    for metric in sorted({name for (name, _), _ in counters}):
+        lines.append(f"# HELP {metric} {HELP.get(metric, metric)}")
+        lines.append(f"# TYPE {metric} counter")
+        for (name, labels), value in counters:
+            if name == metric:
+                lines.append(f"{metric}{_label_text(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+def write_prometheus(path=None):
+    """Write the exposition file atomically."""
+    global _last_flush
+    path = path or METRICS_FILE
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    # Sessions flush concurrently: one writer at a time, each with its own temp file
+    with _write_lock:
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(render_prometheus())
+            os.replace(tmp, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+            raise
+        _last_flush = time.monotonic()
+
+def maybe_flush():
+    """Write the exposition file at most every FLUSH_INTERVAL_SECONDS.
+
+    Runs after the page has rendered, so a failed write is counted instead of raised.
+    """
+    if time.monotonic() - _last_flush >= FLUSH_INTERVAL_SECONDS:
+        try:
+            write_prometheus()
+        except OSError as e:
+            inc("metrics_flush_errors_total")
+            print(f"Error writing metrics file: {e}")
+
+def summary(name):
+    """Count, mean, p50, p95 and max per label set of histogram `name` (seconds), slowest p95 first."""
+    with _lock:
+        rows = [
+            {**dict(labels), "count": h.count, "mean": h.sum / h.count if h.count else 0.0,
+             "p50": h.quantile(0.5), "p95": h.quantile(0.95), "max": h.max, "total": h.sum}
+            for (metric, labels), h in _histograms.items() if metric == name
+        ]
+    if not rows:
+        return pd.DataFrame(columns=["count", "mean", "p50", "p95", "max", "total"])
+    return pd.DataFrame(rows).sort_values("p95", ascending=False, ignore_index=True)
+
+def counter_value(name, **labels):
+    with _lock:
+        return _counters.get(_key(name, labels), 0)
+
+def slow_queries():
+    """Most recent statements slower than SLOW_QUERY_SECONDS in this process, newest first."""
+    with _lock:
+        return list(reversed(_slow_queries))
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+        _slow_queries.clear()
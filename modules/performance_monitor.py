@@ -0,0 +1,125 @@
+import streamlit as st
+from modules import chart_cache, metrics, profiler, session_memory
+
+SECONDS_COLUMNS = ["mean", "p50", "p95", "max", "total"]
+
+def _ms(df):
+    """Histogram summary with durations in milliseconds for display."""
+    df = df.copy()
+    df[SECONDS_COLUMNS] = df[SECONDS_COLUMNS] * 1000
+    return df
+
+def _ms_config():
+    return {c: st.column_config.NumberColumn(f"{c} (ms)", format="%.1f") for c in SECONDS_COLUMNS}
+
+def profiling_panel():
+    """Per-user profiling toggle and viewer for the stored profiles."""
+    st.caption(f"Setiap rerun pengguna yang diprofil menyimpan cProfile (dan opsional snapshot tracemalloc) "
+               f"ke `{profiler.PROFILE_DIR}`; hanya {profiler.MAX_PROFILES} profil terbaru yang disimpan. "
+               f"Bisa juga diaktifkan dengan env `{profiler.ENV_VAR}`.")
+    c1, c2, c3 = st.columns([3, 1, 1])
+    with c1:
+        email = st.text_input("Email pengguna", value=st.session_state.get('user_info', {}).get('email', ''))
+    with c2:
+        memory = st.checkbox("Lacak memori", help="tracemalloc memperlambat render; gunakan seperlunya.")
+    with c3:
+        if st.button("▶️ Aktifkan", disabled=not email):
+            profiler.enable(email, memory)
+            st.rerun()
+
+    for target, traced in profiler.targets().items():
+        t1, t2 = st.columns([4, 1])
+        t1.markdown(f"🔬 **{target}**" + (" · memori" if traced else ""))
+        if t2.button("⏹️ Matikan", key=f"stop_profile_{target}"):
+            profiler.disable(target)
+            st.rerun()
+
+    profiles = profiler.list_profiles()
+    if profiles.empty:
+        st.info("Belum ada profil tersimpan.")
+        return
+    labels = {row.stem: f"{row.timestamp} · {row.page} · {row.user or '-'} · {row.seconds * 1000:.0f} ms"
+              for row in profiles.itertuples()}
+    stem = st.selectbox("Profil", list(labels), format_func=labels.get)
+    st.markdown("**Fungsi dengan waktu kumulatif terbesar**")
+    st.dataframe(profiler.top_functions(stem), use_container_width=True, hide_index=True,
+                 column_config={c: st.column_config.NumberColumn(format="%.1f") for c in ["Total (ms)", "Kumulatif (ms)"]})
+    if profiles.set_index("stem").loc[stem, "memory"]:
+        peak = profiles.set_index("stem").loc[stem, "peak_bytes"]
+        st.markdown(f"**Alokasi terbesar** (puncak {peak / 1024 / 1024:,.1f} MB)")
+        st.dataframe(profiler.top_allocations(stem), use_container_width=True, hide_index=True,
+                     column_config={"Ukuran (KB)": st.column_config.NumberColumn(format="%.1f")})
+
+def session_panel():
+    """Server-wide view of the sessions holding the most session-state memory."""
+    st.caption(f"Memori session state per sesi setelah rerun terakhirnya; sesi di atas "
+               f"{session_memory.SESSION_BUDGET_BYTES / 1024 / 1024:.0f} MB ditandai.")
+    sessions = session_memory.top_sessions()
+    if sessions.empty:
+        st.info("Belum ada sesi yang tercatat.")
+        return
+    st.dataframe(sessions, use_container_width=True, hide_index=True,
+                 column_config={"Memori (MB)": st.column_config.NumberColumn(format="%.2f"),
+                                "Idle (menit)": st.column_config.NumberColumn(format="%.1f")})
+    session_id = st.selectbox("Rincian sesi", sessions["Sesi"], format_func=lambda s: f"{s} · {sessions.set_index('Sesi').loc[s, 'Pengguna']}")
+    keys = session_memory.session_keys(session_id)
+    st.dataframe(
+        [{"Key": k, "Ukuran (KB)": v / 1024} for k, v in keys.items()],
+        use_container_width=True, hide_index=True,
+        column_config={"Ukuran (KB)": st.column_config.NumberColumn(format="%.1f")}
+    )
+
+def show():
+    st.title("⏱️ Monitoring Performa")
+    st.markdown("*Waktu render halaman, query SQL, dan cache grafik sejak proses server dimulai.*")
+
+    pages = metrics.summary("page_render_seconds")
+    queries = metrics.summary("sql_query_seconds")
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Render Halaman", f"{int(pages['count'].sum()):,}" if not pages.empty else "0")
+    c2.metric("Query SQL", f"{int(queries['count'].sum()):,}" if not queries.empty else "0")
+    cache = chart_cache.stats()
+    lookups = cache['hits'] + cache['misses']
+    c3.metric("Hit Rate Cache Grafik", f"{cache['hits'] / lookups:.0%}" if lookups else "-")
+    prices = metrics.summary("price_load_seconds")
+    c4.metric("Load Harga (p95)", f"{prices['p95'].iloc[0] * 1000:.1f} ms" if not prices.empty else "-")
+
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["🐢 Halaman Terlambat", "🗄️ Query Terlambat", "📜 Log Query Lambat", "🔬 Profiling", "🧠 Memori Sesi"])
+
+    with tab1:
+        if pages.empty:
+            st.info("Belum ada halaman yang dirender.")
+        else:
+            st.dataframe(_ms(pages), use_container_width=True, hide_index=True, column_config=_ms_config())
+
+    with tab2:
+        if queries.empty:
+            st.info("Belum ada query yang tercatat.")
+        else:
+            queries['rows'] = [metrics.counter_value("sql_rows_total", query=q) for q in queries['query']]
+            st.dataframe(_ms(queries).head(50), use_container_width=True, hide_index=True, column_config=_ms_config())
+
+    with tab3:
+        st.caption(f"Query di atas {metrics.SLOW_QUERY_SECONDS * 1000:.0f} ms (juga ditulis ke `{metrics.SLOW_QUERY_LOG}`).")
+        slow = metrics.slow_queries()
+        if slow:
+            st.dataframe(slow, use_container_width=True, hide_index=True)
+        else:
+            st.success("Tidak ada query lambat.")
+
+    with tab4:
+        profiling_panel()
+
+    with tab5:
+        session_panel()
+
+    st.markdown("---")
+    st.caption(f"Ekspor Prometheus: `{metrics.METRICS_FILE}` (diperbarui tiap {metrics.FLUSH_INTERVAL_SECONDS} detik).")
+    b1, b2 = st.columns(2)
+    with b1:
+        st.download_button("📥 Unduh metrics.prom", metrics.render_prometheus(), file_name="metrics.prom", mime="text/plain")
+    with b2:
+        if st.button("🔄 Reset Statistik"):
+            metrics.reset()
+            st.rerun()
@@ -0,0 +1,227 @@
+import datetime
+import numpy as np
+import pandas as pd
+from modules import maggot_forecast, process_models, rollup_service
+
+# Plant-wide allocation of the day's organic and residual-plastic intake over
+# composting, BSF maggot bioconversion, pyrolysis and selling raw, solved as a
+# linear program:  maximize c.x  subject to  A.x <= b, x >= 0.
+# Yields follow the process pages (compost 40% solid + POC, maggot 20%
+# biomass + 30% kasgot, pyrolysis 60% oil / 20% gas / 20% char). Every
+# constraint has b >= 0, so the origin is feasible and a single-phase dense
+# tableau simplex solves the model in well under a millisecond.
+ORGANIC = ["Burnable"]                          # Transaction categories fed to the organic lines
+RESIDUAL_PLASTIC = ["Plastic_Marks", "White_Trays"]  # Low-value plastics fit for pyrolysis
+
+COMPOST_SOLID = process_models.COMPOST_YIELD    # kg compost per kg organic
+COMPOST_POC = 0.10                              # L liquid fertilizer per kg organic (page default 10%)
+MAGGOT_BIOMASS = maggot_forecast.BIOCONVERSION_RATE
+MAGGOT_KASGOT = maggot_forecast.RESIDUE_RATE
+MAGGOT_DRY = maggot_forecast.DRY_RATIO
+PYRO_OIL = process_models.PYRO_OIL              # kg per kg plastic at the optimal temperature
+PYRO_GAS = process_models.PYRO_GAS
+PYRO_CHAR = process_models.PYRO_CHAR
+OIL_DENSITY = process_models.OIL_DENSITY        # kg per litre
+
+DEFAULT_PRICES = {  # Rp per unit of product
+    'kompos': 2500, 'poc': 15000, 'maggot_segar': 6000, 'maggot_kering': 45000,
+    'kasgot': 1000, 'minyak': 12000, 'arang': 2000,
+}
+DEFAULT_COSTS = {  # Rp per kg of input processed
+    'kompos': 1100, 'maggot': 250, 'pengeringan': 500, 'pirolisis': 2000,
+}
+DEFAULT_CAPACITY = {  # kg per day
+    'kompos': 1000, 'maggot': 300, 'pengeringan': 40, 'pirolisis': 200,
+}
+
+# Decision variables (kg/day)
+VARIABLES = ['kompos', 'maggot', 'organik_mentah', 'maggot_segar', 'maggot_kering', 'pirolisis', 'plastik_mentah']
+LABELS = {
+    'kompos': "Pengomposan", 'maggot': "Biokonversi Maggot", 'organik_mentah': "Jual Organik Mentah",
+    'maggot_segar': "Maggot Dijual Segar", 'maggot_kering': "Maggot Dikeringkan",
+    'pirolisis': "Pirolisis", 'plastik_mentah': "Jual Plastik Mentah",
+}
+
+
+class Unbounded(Exception):
+    """The objective can grow without limit (a missing capacity or supply row)."""
+
+
+def simplex(c, A, b, max_iter=500):
+    """Maximize c.x subject to A.x <= b, x >= 0, for b >= 0.
+
+    Dense tableau with Dantzig pricing and Bland's rule once a degenerate
+    pivot repeats. Returns (x, objective, shadow prices of the rows).
+    """
+    c, A, b = (np.asarray(v, dtype=np.float64) for v in (c, A, b))
+    m, n = A.shape
+    if np.any(b < 0):
+        raise ValueError("simplex needs b >= 0")
+    tableau = np.zeros((m + 1, n + m + 1))
+    tableau[:m, :n] = A
+    tableau[:m, n:n + m] = np.eye(m)
+    tableau[:m, -1] = b
+    tableau[-1, :n] = -c
+    basis = np.arange(n, n + m)
+    eps = 1e-9
+    bland = False
+    for _ in range(max_iter):
+        costs = tableau[-1, :-1]
+        if bland:
+            entering = np.flatnonzero(costs < -eps)
+            if not len(entering):
+                break
+            col = entering[0]
+        else:
+            col = int(costs.argmin())
+            if costs[col] >= -eps:
+                break
+        column = tableau[:m, col]
+        positive = column > eps
+        if not positive.any():
+            raise Unbounded(f"variable {col} is unbounded")
+        ratios = np.full(m, np.inf)
+        ratios[positive] = tableau[:m, -1][positive] / column[positive]
+        best = ratios.min()
+        ties = np.flatnonzero(ratios <= best + eps)
+        row = ties[np.argmin(basis[ties])] if bland else ties[0]
+        if best <= eps:
+            bland = True  # Degenerate pivot: switch to Bland's rule to rule out cycling
+        tableau[row] /= tableau[row, col]
+        others = np.arange(m + 1) != row
+        tableau[others] -= np.outer(tableau[others, col], tableau[row])
+        basis[row] = col
+    else:
+        raise RuntimeError("simplex did not converge")
+    x = np.zeros(n + m)
+    x[basis] = tableau[:m, -1]
+    return x[:n], float(tableau[-1, -1]), tableau[-1, n:n + m].copy()
+
+
+def unit_values(prices=None, costs=None):
+    """Net value (Rp) per kg of each decision variable."""
+    p = {**DEFAULT_PRICES, **(prices or {})}
+    k = {**DEFAULT_COSTS, **(costs or {})}
+    raw = p.get('organik_mentah', 0.0), p.get('plastik_mentah', 0.0)
+    return np.array([
+        COMPOST_SOLID * p['kompos'] + COMPOST_POC * p['poc'] - k['kompos'],
+        MAGGOT_KASGOT * p['kasgot'] - k['maggot'],  # biomass is valued by its outlet below
+        raw[0],
+        p['maggot_segar'],
+        MAGGOT_DRY * p['maggot_kering'] - k['pengeringan'],
+        PYRO_OIL / OIL_DENSITY * p['minyak'] + PYRO_CHAR * p['arang'] - k['pirolisis'],
+        raw[1],
+    ])
+
+
+def build_model(organic_kg, plastic_kg, capacity=None, prices=None, costs=None):
+    """Objective vector, constraint matrix, limits and row names of the allocation LP."""
+    cap = {**DEFAULT_CAPACITY, **(capacity or {})}
+    #        kompos maggot org_raw segar kering pyro plast_raw
+    rows = [
+        ("Pasokan organik",          [1, 1, 1, 0, 0, 0, 0], organic_kg),
+        ("Pasokan plastik residu",   [0, 0, 0, 0, 0, 1, 1], plastic_kg),
+        ("Kapasitas kompos",         [1, 0, 0, 0, 0, 0, 0], cap['kompos']),
+        ("Kapasitas biopond maggot", [0, 1, 0, 0, 0, 0, 0], cap['maggot']),
+        ("Kapasitas pengering",      [0, 0, 0, 0, 1, 0, 0], cap['pengeringan']),
+        ("Kapasitas reaktor",        [0, 0, 0, 0, 0, 1, 0], cap['pirolisis']),
+        ("Panen maggot",             [0, -MAGGOT_BIOMASS, 0, 1, 1, 0, 0], 0.0),
+    ]
+    A = np.array([r[1] for r in rows], dtype=np.float64)
+    b = np.array([max(float(r[2]), 0.0) for r in rows])
+    return unit_values(prices, costs), A, b, [r[0] for r in rows]
+
+
+def optimize(organic_kg, plastic_kg, capacity=None, prices=None, costs=None):
+    """Revenue-maximizing split of the day's intake.
+
+    Returns a dict with the allocation per variable (kg), the net value, the
+    shadow price of every constraint (Rp per extra kg of that limit) and the
+    leftover intake that no line can take.
+    """
+    c, A, b, names = build_model(organic_kg, plastic_kg, capacity, prices, costs)
+    x, value, duals = simplex(c, A, b)
+    x[np.abs(x) < 1e-9] = 0.0
+    allocation = dict(zip(VARIABLES, x))
+    return {
+        'allocation': allocation,
+        'value': value,
+        'shadow': pd.Series(duals, index=names),
+        'sisa_organik': max(organic_kg - allocation['kompos'] - allocation['maggot'] - allocation['organik_mentah'], 0.0),
+        'sisa_plastik': max(plastic_kg - allocation['pirolisis'] - allocation['plastik_mentah'], 0.0),
+    }
+
+
+def mass_flows(organic_kg, plastic_kg, allocation):
+    """(source, target, kg) links of the plant-wide mass balance for a Sankey diagram."""
+    a = allocation
+    biomass = MAGGOT_BIOMASS * a['maggot']
+    flows = [
+        ("Organik Masuk", "Pengomposan", a['kompos']),
+        ("Organik Masuk", "Biokonversi Maggot", a['maggot']),
+        ("Organik Masuk", "Jual Mentah", a['organik_mentah']),
+        ("Organik Masuk", "Residu / TPA", organic_kg - a['kompos'] - a['maggot'] - a['organik_mentah']),
+        ("Plastik Residu Masuk", "Pirolisis", a['pirolisis']),
+        ("Plastik Residu Masuk", "Jual Mentah", a['plastik_mentah']),
+        ("Plastik Residu Masuk", "Residu / TPA", plastic_kg - a['pirolisis'] - a['plastik_mentah']),
+        ("Pengomposan", "Kompos Padat", COMPOST_SOLID * a['kompos']),
+        ("Pengomposan", "Pupuk Cair (POC)", COMPOST_POC * a['kompos']),
+        ("Pengomposan", "Susut (Air & CO2)", (1 - COMPOST_SOLID - COMPOST_POC) * a['kompos']),
+        ("Biokonversi Maggot", "Maggot Segar", a['maggot_segar']),
+        ("Biokonversi Maggot", "Pengering", a['maggot_kering']),
+        ("Biokonversi Maggot", "Maggot Belum Terjual", biomass - a['maggot_segar'] - a['maggot_kering']),
+        ("Biokonversi Maggot", "Kasgot", MAGGOT_KASGOT * a['maggot']),
+        ("Biokonversi Maggot", "Susut (Air & CO2)", (1 - MAGGOT_BIOMASS - MAGGOT_KASGOT) * a['maggot']),
+        ("Pengering", "Maggot Kering", MAGGOT_DRY * a['maggot_kering']),
+        ("Pengering", "Susut (Air & CO2)", (1 - MAGGOT_DRY) * a['maggot_kering']),
+        ("Pirolisis", "Minyak Pirolisis", PYRO_OIL * a['pirolisis']),
+        ("Pirolisis", "Gas (Bahan Bakar Reaktor)", PYRO_GAS * a['pirolisis']),
+        ("Pirolisis", "Arang", PYRO_CHAR * a['pirolisis']),
+    ]
+    return [(s, t, float(v)) for s, t, v in flows if v > 1e-6]
+
+
+def products(allocation, prices=None):
+    """Daily product quantities and their revenue at `prices`."""
+    p = {**DEFAULT_PRICES, **(prices or {})}
+    a = allocation
+    rows = [
+        ("Kompos Padat", "kg", COMPOST_SOLID * a['kompos'], p['kompos']),
+        ("Pupuk Cair (POC)", "L", COMPOST_POC * a['kompos'], p['poc']),
+        ("Maggot Segar", "kg", a['maggot_segar'], p['maggot_segar']),
+        ("Maggot Kering", "kg", MAGGOT_DRY * a['maggot_kering'], p['maggot_kering']),
+        ("Kasgot", "kg", MAGGOT_KASGOT * a['maggot'], p['kasgot']),
+        ("Minyak Pirolisis", "L", PYRO_OIL / OIL_DENSITY * a['pirolisis'], p['minyak']),
+        ("Arang", "kg", PYRO_CHAR * a['pirolisis'], p['arang']),
+        ("Organik Mentah", "kg", a['organik_mentah'], p.get('organik_mentah', 0.0)),
+        ("Plastik Residu Mentah", "kg", a['plastik_mentah'], p.get('plastik_mentah', 0.0)),
+    ]
+    df = pd.DataFrame(rows, columns=['Produk', 'Satuan', 'Jumlah', 'Harga'])
+    df['Pendapatan'] = df['Jumlah'] * df['Harga']
+    return df[df['Jumlah'] > 1e-6].reset_index(drop=True)
+
+
+def raw_prices(price_list):
+    """Sell prices (Rp/kg) of the intake when it leaves the plant unprocessed."""
+    sell = lambda names: float(np.mean([price_list.get(n, {}).get('sell', 0) for n in names]))
+    return {'organik_mentah': sell(ORGANIC), 'plastik_mentah': sell(RESIDUAL_PLASTIC)}
+
+
+def daily_intake(day=None, window_days=1, units=None):
+    """Organic and residual-plastic kg per day from the category rollups, and the last day used.
+
+    Averages the `window_days` days ending at `day`; without a day, ending at
+    the latest day with deposits in the past month.
+    """
+    window = max(int(window_days), 1)
+    end = pd.Timestamp(day or datetime.date.today())
+    lookback = window if day else window + 30
+    df = rollup_service.load((end - pd.Timedelta(days=lookback - 1)).date(), end.date(), units)
+    if df.empty:
+        return 0.0, 0.0, None
+    if day is None:
+        end = df['Tanggal'].max()
+    df = df[(df['Tanggal'] > end - pd.Timedelta(days=window)) & (df['Tanggal'] <= end)]
+    organic = float(df[ORGANIC].to_numpy().sum()) / window
+    plastic = float(df[RESIDUAL_PLASTIC].to_numpy().sum()) / window
+    return organic, plastic, end.date()
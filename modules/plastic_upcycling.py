@@ -1,10 +1,12 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import time
 import numpy as np
+from modules import chart_cache, extrusion_runner, process_models
 from modules.price_service import load_prices
 
+CHART_SAMPLES = 300  # Run-log minutes shown in the live diameter chart
+
 def create_gauge(title, value, min_val, max_val, suffix="", color="green"):
     fig = go.Figure(go.Indicator(
         mode = "gauge+number",
@@ -36,69 +38,123 @@ def show():
     st.sidebar.markdown("### 🎛️ Parameter Ekstrusi")
     target_temp = st.sidebar.slider("Suhu Ekstruder (°C)", 200, 270, 255)
     motor_speed = st.sidebar.slider("Kecepatan Motor (RPM)", 0, 50, 25)
-    input_qty = st.sidebar.number_input("Input Flakes PET (kg)", min_value=0.0, value=1.0, step=0.1)
+    input_qty = st.sidebar.number_input("Input Flakes PET (kg)", min_value=0.0, max_value=float(extrusion_runner.MAX_INPUT_KG),
+                                        value=1.0, step=0.1)
     
     start_process = st.sidebar.button("▶️ Jalankan Produksi")
     
-    # 1. IoT Monitoring Dashboard
-    st.subheader("🖥️ IoT Monitoring Dashboard (Live Simulation)")
-    
-    # Simulated metrics
-    current_temp = target_temp + np.random.uniform(-2, 2)
-    diameter = 1.75 + np.random.uniform(-0.03, 0.03) # Target 1.75mm
-    motor_load = (motor_speed / 50) * 100 + np.random.uniform(-5, 5)
+    if start_process:
+        if motor_speed == 0 or input_qty <= 0:
+            st.sidebar.warning("Atur kecepatan motor dan input flakes terlebih dahulu.")
+        else:
+            try:
+                st.session_state['extrusion_run_id'] = extrusion_runner.start_run(target_temp, motor_speed, input_qty)
+                st.toast("🚀 Proses Ekstrusi Dimulai...")
+            except ValueError as e:
+                st.sidebar.warning(str(e))
+
+    run = extrusion_runner.get_run(st.session_state.get('extrusion_run_id'))
     
-    c1, c2, c3 = st.columns(3)
-    with c1:
-        st.plotly_chart(create_gauge("Suhu Nozzle", current_temp, 0, 300, "°C", "#FF5722"), use_container_width=True)
-        st.caption(f"Target: {target_temp}°C")
-    with c2:
-        color_diam = "#4CAF50" if 1.70 <= diameter <= 1.80 else "#F44336"
-        st.plotly_chart(create_gauge("Diameter Filamen", diameter, 1.5, 2.0, " mm", color_diam), use_container_width=True)
-        st.caption("Target: 1.75mm ±0.05")
-    with c3:
-        st.plotly_chart(create_gauge("Motor Load", motor_load, 0, 100, "%", "#2196F3"), use_container_width=True)
-        st.caption(f"Speed: {motor_speed} RPM")
+    poll_every = 1.0 if run is not None and run.is_active else None
 
-    st.markdown("---")
+    # 1. IoT Monitoring Dashboard
+    # Fragments poll the background run every second instead of sleeping
+    @st.fragment(run_every=poll_every)
+    def live_gauges():
+        current = run.snapshot(tail=1) if run is not None else None
+        last = current['log'][-1] if current and current['log'] else None
 
-    # 2. Process Flow & OEE
-    col_proc, col_eco = st.columns([2, 1])
-    
-    with col_proc:
-        st.subheader("⚙️ Alur Proses Manufaktur")
+        st.subheader("🖥️ IoT Monitoring Dashboard (Live Simulation)")
         
-        # Simple Process Steps visualization
-        steps = ["Washing", "Drying", "Shredding", "Extrusion", "Cooling", "Spooling"]
-        # Simulate active step based on random or state (just static active for now)
-        st.info("Status: ✅ System Ready | 🟢 Heater Active | 🟢 Puller Synced")
+        if last is not None:
+            current_temp = last['temperature']
+            diameter = last['diameter'] if last['state'] == "running" else extrusion_runner.TARGET_DIAMETER
+            motor_load = last['motor_load']
+        else:
+            # Idle preview: simulated readings at the current set points
+            current_temp = target_temp + np.random.uniform(-2, 2)
+            diameter = 1.75 + np.random.uniform(-0.03, 0.03) # Target 1.75mm
+            motor_load = (motor_speed / 50) * 100 + np.random.uniform(-5, 5)
         
-        # OEE Calculation
-        # Quality: % of time diameter is within tolerance (simulated 95%)
-        # Performance: Actual Speed / Max Speed
-        # Availability: Uptime (simulated 98%)
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            st.plotly_chart(chart_cache.figure(create_gauge, "Suhu Nozzle", round(current_temp, 1), 0, 300, "°C", "#FF5722"), use_container_width=True)
+            st.caption(f"Target: {target_temp}°C")
+        with c2:
+            color_diam = "#4CAF50" if 1.70 <= diameter <= 1.80 else "#F44336"
+            st.plotly_chart(chart_cache.figure(create_gauge, "Diameter Filamen", round(diameter, 3), 1.5, 2.0, " mm", color_diam), use_container_width=True)
+            st.caption("Target: 1.75mm ±0.05")
+        with c3:
+            st.plotly_chart(chart_cache.figure(create_gauge, "Motor Load", round(motor_load, 1), 0, 100, "%", "#2196F3"), use_container_width=True)
+            st.caption(f"Speed: {motor_speed} RPM")
+
+    @st.fragment(run_every=poll_every)
+    def live_process():
+        st.subheader("⚙️ Alur Proses Manufaktur")
         
-        quality = 95.0
-        performance = (motor_speed / 50) * 100
-        availability = 98.0
-        oee = (quality/100) * (performance/100) * (availability/100) * 100
+        if run is None:
+            st.info("Status: ✅ System Ready | Tekan '▶️ Jalankan Produksi' untuk memulai run ekstrusi.")
+            return
+
+        current = run.snapshot(tail=CHART_SAMPLES)
+        last = current['log'][-1] if current['log'] else None
+        state_label = {
+            "heating": "🟠 Pemanasan Zona 1-3",
+            "jam": "🔴 Filamen Putus / Jam",
+            "running": "🟢 Ekstrusi Berjalan",
+        }
+        step_label = state_label[last['state']] if last else "⏳ Menunggu"
+        st.info(f"Run `{current['id']}` | Status: **{current['status']}** | {step_label}")
+        st.progress(current['progress'], text=f"Filamen keluar: {current['produced_kg']:.2f} kg")
         
-        st.markdown(f"### 📊 Overall Equipment Effectiveness (OEE): **{oee:.1f}%**")
+        # OEE Calculation (incremental over the run log)
+        # Availability: Running time / planned time (heating & jams are downtime)
+        # Performance: Actual output / output at max speed while running
+        # Quality: % of diameter samples within 1.75 ± 0.05 mm
+        oee = current['oee']
+        st.markdown(f"### 📊 Overall Equipment Effectiveness (OEE): **{oee['oee']:.1f}%**")
         c_oee1, c_oee2, c_oee3 = st.columns(3)
-        c_oee1.metric("Availability", f"{availability}%")
-        c_oee2.metric("Performance", f"{performance:.0f}%")
-        c_oee3.metric("Quality", f"{quality}%")
+        c_oee1.metric("Availability", f"{oee['availability']:.1f}%")
+        c_oee2.metric("Performance", f"{oee['performance']:.0f}%")
+        c_oee3.metric("Quality", f"{oee['quality']:.1f}%")
+
+        log_df = pd.DataFrame(current['log'])
+        if not log_df.empty:
+            running_df = log_df[log_df['state'] == "running"]
+            fig_log = go.Figure()
+            fig_log.add_trace(go.Scatter(x=running_df['minute'], y=running_df['diameter'], mode='markers', name='Diameter', marker=dict(size=4, color="#4CAF50")))
+            fig_log.add_hrect(y0=extrusion_runner.TARGET_DIAMETER - extrusion_runner.DIAMETER_TOLERANCE,
+                              y1=extrusion_runner.TARGET_DIAMETER + extrusion_runner.DIAMETER_TOLERANCE,
+                              fillcolor="green", opacity=0.1, line_width=0)
+            fig_log.update_layout(title=f"Run Log: Diameter Filamen ({CHART_SAMPLES} menit terakhir)", xaxis_title="Menit ke-", yaxis_title="mm", height=250, margin=dict(l=10, r=10, t=40, b=10))
+            st.plotly_chart(fig_log, use_container_width=True)
+
+        if not run.is_active and st.session_state.get('extrusion_finished') != current['id']:
+            st.session_state['extrusion_finished'] = current['id']
+            st.toast(f"✅ Filamen Keluar: {current['produced_kg']:.2f} kg")
+            # Full rerun stops the polling fragments
+            st.rerun()
+
+    live_gauges()
+
+    st.markdown("---")
+
+    # 2. Process Flow & OEE
+    col_proc, col_eco = st.columns([2, 1])
+    
+    with col_proc:
+        live_process()
 
     with col_eco:
         st.subheader("💰 Nilai Ekonomi")
         
-        raw_value = input_qty * pet_price_raw
         # Yield loss during extrusion ~5%
-        output_qty = input_qty * 0.95
-        filament_value_total = output_qty * filament_price
-        
-        added_value = filament_value_total - raw_value
-        margin_pct = (added_value / raw_value * 100) if raw_value > 0 else 0
+        economics = process_models.upcycling(input_qty, pet_price_raw, filament_price)
+        raw_value = economics['raw_value']
+        output_qty = economics['output_qty']
+        filament_value_total = economics['filament_value_total']
+        added_value = economics['added_value']
+        margin_pct = economics['margin_pct']
         
         st.markdown("""
         <div style="background-color: #e8f5e9; padding: 15px; border-radius: 10px; border: 1px solid #c8e6c9;">
@@ -114,11 +170,3 @@ def show():
             st.write(f"Satu botol PET (~10g) berharga Rp {pet_price_raw/100:,.0f} sebagai sampah.")
             st.write(f"Setelah diubah menjadi filamen, nilainya menjadi Rp {filament_price/100:,.0f}.")
             st.write("**Upcycling menaikkan nilai ekonomi hingga 30x lipat.**")
-
-    if start_process:
-        st.toast("🚀 Proses Ekstrusi Dimulai...")
-        time.sleep(1)
-        st.toast("🌡️ Pemanasan Zona 1-3 Complete")
-        time.sleep(1)
-        st.toast("✅ Filamen Keluar: Diameter Stabil 1.75mm")
-        st.balloons()
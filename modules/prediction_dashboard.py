@@ -1,10 +1,76 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
+from modules import chart_cache, scenario_compare, unit_store, volume_forecast
 from modules.price_service import load_prices
 
+HISTORY_DAYS = 120  # days of history drawn before the forecast
+
+def forecast_chart(history, forecast, series, unit_label):
+    """Recent daily history, the forecast and its prediction interval band."""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=forecast['Tanggal'], y=forecast['Atas'], line=dict(width=0),
+                             hoverinfo='skip', showlegend=False))
+    fig.add_trace(go.Scatter(x=forecast['Tanggal'], y=forecast['Bawah'], line=dict(width=0), fill='tonexty',
+                             fillcolor='rgba(46,125,50,0.2)', name=f"Interval {volume_forecast.INTERVAL_LEVEL:.0%}"))
+    fig.add_trace(go.Scatter(x=history.index, y=history.values, name="Aktual", line=dict(color='#616161')))
+    fig.add_trace(go.Scatter(x=forecast['Tanggal'], y=forecast['Prediksi'], name="Prediksi",
+                             line=dict(color='#2E7d32', dash='dash')))
+    fig.update_layout(title=f"{series} per Hari", yaxis_title=unit_label, hovermode='x unified')
+    return fig
+
+def forecast_section():
+    """Volume and revenue forecast from the daily history of all deposits."""
+    prices = load_prices()
+    c1, c2 = st.columns([2, 1])
+    with c1:
+        units = unit_store.list_units()
+        scope = st.selectbox("Cakupan", ["Semua Unit", *units])
+    with c2:
+        horizon = st.radio("Horizon", volume_forecast.HORIZONS, format_func=lambda d: f"{d} hari", horizontal=True)
+
+    state = volume_forecast.get_fit(None if scope == "Semua Unit" else [scope], prices)
+    if state is None:
+        st.info(f"Prediksi membutuhkan riwayat minimal {volume_forecast.MIN_DAYS} hari transaksi.")
+        return
+    history = pd.DataFrame(state['history'], columns=state['columns'],
+                           index=pd.date_range(state['start'], periods=state['days'], freq='D'))
+    totals = volume_forecast.horizon_totals(state, horizon).set_index('Seri')
+    past = history.tail(horizon).sum()
+
+    def metric(col, label, series, fmt):
+        row = totals.loc[series]
+        delta = row['Prediksi'] / past[series] - 1 if past[series] else None
+        col.metric(label, fmt(row['Prediksi']), f"{delta:+.1%} vs {horizon} hari terakhir" if delta is not None else None)
+        col.caption(f"Interval {volume_forecast.INTERVAL_LEVEL:.0%}: {fmt(row['Bawah'])} – {fmt(row['Atas'])}")
+
+    m1, m2 = st.columns(2)
+    metric(m1, f"Prediksi Volume {horizon} Hari", volume_forecast.TOTAL, lambda v: f"{v:,.0f} kg")
+    metric(m2, f"Prediksi Pendapatan {horizon} Hari", volume_forecast.REVENUE, lambda v: f"Rp {v:,.0f}")
+
+    series = st.selectbox("Seri", state['columns'], index=state['columns'].index(volume_forecast.TOTAL))
+    forecast = volume_forecast.forecast_frame(state, horizon)
+    forecast = forecast[forecast['Seri'] == series]
+    unit_label = "Rupiah" if series == volume_forecast.REVENUE else "kg"
+    st.plotly_chart(chart_cache.figure(forecast_chart, history[series].tail(HISTORY_DAYS), forecast, series, unit_label),
+                    use_container_width=True)
+
+    st.markdown(f"**Prediksi per Kategori ({horizon} hari)**")
+    st.dataframe(totals.drop(index=volume_forecast.REVENUE).reset_index(), use_container_width=True, hide_index=True,
+                 column_config={c: st.column_config.NumberColumn(f"{c} (kg)", format="%.1f") for c in ['Prediksi', 'Bawah', 'Atas']})
+    st.caption(f"Holt-Winters aditif (tren teredam, musiman mingguan) per kategori, dilatih pada {state['days']:,} hari "
+               f"hingga kemarin; pendapatan memakai harga jual saat ini. Model diperbarui otomatis saat ada transaksi baru.")
+
 def show():
     st.title("💸 Simulasi Live & Prediksi")
+    tab_forecast, tab_sim = st.tabs(["📈 Prediksi Volume & Pendapatan", "💸 Simulasi Profit"])
+    with tab_forecast:
+        forecast_section()
+    with tab_sim:
+        simulator_section()
+
+def simulator_section():
     st.markdown("### *Interactive Profit Simulator*")
     st.caption("Ubah angka 'Berat' di tabel untuk melihat potensi keuntungan secara real-time.")
 
@@ -103,6 +169,15 @@ def show():
         else:
             st.info("Belum ada data input.")
             
+    # Save to the shared scenario list (compared in 'Kalkulator Nilai Ekonomi')
+    scenario_compare.save_form(
+        dict(zip(edited_df['Kategori'], edited_df['Berat (kg)'])),
+        dict(zip(edited_df['Kategori'], edited_df['Harga Beli (Rp)'])),
+        dict(zip(edited_df['Kategori'], edited_df['Harga Jual (Rp)'])),
+        "prediction", key="prediction_scenario",
+    )
+    st.caption("Skenario tersimpan dapat dibandingkan di menu **Kalkulator Nilai Ekonomi**.")
+
     # Reset Button
     if st.button("🔄 Reset Simulasi"):
         del st.session_state['prediction_sim_data']
@@ -1,5 +1,7 @@
+import datetime
 import json
 import os
+from modules import metrics
 
 # Definition of default prices
 default_pricing = {
@@ -17,6 +19,7 @@ default_pricing = {
     "Filament_rPET": {"buy": 0, "sell": 150000}   # Manufactured Product
 }
 
+@metrics.timed("price_load_seconds")
 def load_prices():
     file_path = "data/waste_prices.json"
     if os.path.exists(file_path):
@@ -32,3 +35,55 @@ def save_prices(prices):
     os.makedirs("data", exist_ok=True)
     with open("data/waste_prices.json", "w") as f:
         json.dump(prices, f, indent=4)
+    record_history(prices)
+
+# Every saved price list is kept in users.db, so saved scenarios can be
+# re-priced against the prices of any earlier date.
+HISTORY_DDL = """
+    CREATE TABLE IF NOT EXISTS price_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        effective_at TEXT NOT NULL,
+        prices TEXT NOT NULL
+    )
+"""
+
+def _history_connection():
+    from modules import auth_db  # users.db location (patched in tests)
+    conn = auth_db.get_connection()
+    conn.execute(HISTORY_DDL)
+    return conn
+
+def record_history(prices, effective_at=None):
+    """Append `prices` to the price history unless they equal the latest entry."""
+    payload = json.dumps(prices, sort_keys=True)
+    conn = _history_connection()
+    try:
+        with conn:
+            latest = conn.execute("SELECT prices FROM price_history ORDER BY effective_at DESC, id DESC LIMIT 1").fetchone()
+            if latest is not None and latest[0] == payload:
+                return False
+            stamp = effective_at or datetime.datetime.now()
+            conn.execute("INSERT INTO price_history (effective_at, prices) VALUES (?, ?)",
+                         (stamp.isoformat(timespec='seconds'), payload))
+        return True
+    finally:
+        conn.close()
+
+def price_history():
+    """[(effective_at, prices)] oldest first; starts from the current prices when nothing was saved yet."""
+    conn = _history_connection()
+    try:
+        rows = conn.execute("SELECT effective_at, prices FROM price_history ORDER BY effective_at, id").fetchall()
+    finally:
+        conn.close()
+    if not rows:
+        record_history(load_prices())
+        return price_history()
+    return [(datetime.datetime.fromisoformat(stamp), json.loads(prices)) for stamp, prices in rows]
+
+def prices_at(when):
+    """Price list in effect at `when` (the oldest known list for earlier dates)."""
+    history = price_history()
+    when = datetime.datetime.combine(when, datetime.time.max) if type(when) is datetime.date else when
+    effective = [prices for stamp, prices in history if stamp <= when]
+    return effective[-1] if effective else history[0][1]
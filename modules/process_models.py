@@ -0,0 +1,176 @@
+import inspect
+import numpy as np
+import pandas as pd
+from modules import maggot_forecast
+
+# Yield and economics models of the transformation processes, free of
+# Streamlit. Every function takes scalars or NumPy arrays for any parameter
+# and broadcasts them, so one call evaluates one scenario (scalar results)
+# or thousands (array results). The process pages call these for their
+# single scenario; sweep() and evaluate() batch them for planners and
+# notebooks. Parameter defaults are the page defaults.
+
+# --- Compost (fertilizer_processing) ---
+COMPOST_YIELD = 0.40          # kg solid compost per kg organic input
+POLYBAG_KG = 0.1              # 100 g compost per polybag
+COMPOST_DAYS = 21             # Fermentation standard (3 weeks)
+CN_START, CN_TARGET, CN_FLOOR = 30, 15, 10
+
+# --- BSF maggot (maggot_cultivation) ---
+MAGGOT_REDUCTION = 0.50       # Water loss / metabolism share of the feed
+
+# --- Pyrolysis ---
+PYRO_OIL, PYRO_GAS, PYRO_CHAR = 0.60, 0.20, 0.20   # Mass yields at the optimal temperature
+OIL_DENSITY = 0.85            # kg per litre
+PYRO_OPTIMAL_C = (350, 450)   # Below: incomplete cracking, above: over-cracking to gas
+PYRO_EFFICIENCY = (0.7, 1.0, 0.6)
+
+# --- PET filament (plastic_upcycling) ---
+EXTRUSION_YIELD = 0.95        # ~5% loss during extrusion
+
+
+def _ratio(num, den, scale=1.0):
+    """num / den * scale, 0 where den <= 0."""
+    num, den = np.broadcast_arrays(np.asarray(num, dtype=np.float64), np.asarray(den, dtype=np.float64))
+    return np.divide(num, den, out=np.zeros(num.shape), where=den > 0) * scale
+
+
+def _scalars(result):
+    """Unwrap 0-d arrays so single scenarios come back as plain numbers."""
+    return {k: (v[()] if isinstance(v, np.ndarray) and v.ndim == 0 else v) for k, v in result.items()}
+
+
+def pyrolysis(input_plastic_kg, target_temp=400, price_oil=12000, price_char=2000, op_cost_per_kg=2000):
+    """Oil/gas/char yields and economics of one reactor cycle."""
+    input_plastic_kg = np.asarray(input_plastic_kg, dtype=np.float64)
+    temp = np.asarray(target_temp, dtype=np.float64)
+    low, ok, high = PYRO_EFFICIENCY
+    efficiency = np.where(temp < PYRO_OPTIMAL_C[0], low, np.where(temp > PYRO_OPTIMAL_C[1], high, ok))
+    yield_oil_pct = PYRO_OIL * efficiency
+    yield_gas_pct = PYRO_GAS + PYRO_OIL * (1 - efficiency)
+    output_oil_liters = input_plastic_kg * yield_oil_pct / OIL_DENSITY
+    output_gas_kg = input_plastic_kg * yield_gas_pct
+    output_char_kg = input_plastic_kg * PYRO_CHAR
+    revenue_oil = output_oil_liters * price_oil
+    revenue_char = output_char_kg * price_char
+    total_revenue = revenue_oil + revenue_char
+    op_cost = input_plastic_kg * op_cost_per_kg
+    profit = total_revenue - op_cost
+    return _scalars({
+        'yield_oil_pct': yield_oil_pct, 'yield_gas_pct': yield_gas_pct,
+        'output_oil_liters': output_oil_liters, 'output_gas_kg': output_gas_kg, 'output_char_kg': output_char_kg,
+        'revenue_oil': revenue_oil, 'revenue_char': revenue_char, 'total_revenue': total_revenue,
+        'op_cost': op_cost, 'profit': profit, 'roi': _ratio(profit, op_cost, 100),
+    })
+
+
+def maggot(waste_input_daily, price_fresh=6000, price_dried=45000, price_kasgot=1000,
+           bioconversion_rate=maggot_forecast.BIOCONVERSION_RATE, residue_rate=maggot_forecast.RESIDUE_RATE,
+           dry_ratio=maggot_forecast.DRY_RATIO):
+    """Daily BSF mass balance and revenue when selling the harvest fresh or dried."""
+    waste = np.asarray(waste_input_daily, dtype=np.float64)
+    est_maggot_biomass = waste * bioconversion_rate
+    est_kasgot = waste * residue_rate
+    dried_kg = est_maggot_biomass * dry_ratio
+    revenue_fresh = est_maggot_biomass * price_fresh
+    revenue_dry = dried_kg * price_dried
+    revenue_kasgot = est_kasgot * price_kasgot
+    return _scalars({
+        'est_maggot_biomass': est_maggot_biomass, 'est_kasgot': est_kasgot,
+        'waste_reduced': waste * MAGGOT_REDUCTION, 'fcr': _ratio(waste, est_maggot_biomass),
+        'dried_kg': dried_kg, 'revenue_fresh': revenue_fresh, 'revenue_dry': revenue_dry,
+        'revenue_kasgot': revenue_kasgot,
+        'total_rev_fresh_market': revenue_fresh + revenue_kasgot,
+        'total_rev_dry_market': revenue_dry + revenue_kasgot,
+    })
+
+
+def compost(input_waste_kg, price_solid=2500, price_liquid=15000, ratio_liquid=10, total_opex=1_100_000,
+            capex=40_000_000, depreciation_months=60, batches_per_month=4):
+    """Output, unit cost (HPP) and profit of one compost batch; `ratio_liquid` is % of input turned into POC."""
+    input_waste_kg = np.asarray(input_waste_kg, dtype=np.float64)
+    output_solid_kg = input_waste_kg * COMPOST_YIELD
+    output_liquid_l = input_waste_kg * np.asarray(ratio_liquid, dtype=np.float64) / 100
+    batch_depreciation = _ratio(capex, depreciation_months) / batches_per_month
+    total_cogs = total_opex + batch_depreciation
+    rev_solid = output_solid_kg * price_solid
+    rev_liquid = output_liquid_l * price_liquid
+    total_revenue = rev_solid + rev_liquid
+    net_profit = total_revenue - total_cogs
+    return _scalars({
+        'output_solid_kg': output_solid_kg, 'output_liquid_l': output_liquid_l,
+        'polybag_count': np.floor(output_solid_kg / POLYBAG_KG),
+        'batch_depreciation': batch_depreciation, 'total_cogs': total_cogs,
+        'hpp_per_kg': _ratio(total_cogs, output_solid_kg + output_liquid_l),
+        'rev_solid': rev_solid, 'rev_liquid': rev_liquid, 'total_revenue': total_revenue,
+        'gross_profit': total_revenue - total_opex, 'net_profit': net_profit,
+        'margin_pct': _ratio(net_profit, total_revenue, 100), 'roi_pct': _ratio(net_profit, total_cogs, 100),
+    })
+
+
+def compost_maturity(days_running, total_days=COMPOST_DAYS):
+    """Batch progress (%), C/N ratio and base quality score after `days_running` days."""
+    days = np.asarray(days_running, dtype=np.float64)
+    progress_pct = np.clip(days / total_days * 100, 0, 100)
+    cn_current = np.maximum(CN_FLOOR, CN_START - days * (CN_START - CN_TARGET) / total_days)
+    base_quality = np.where(days < 0, 0.0, 50 + progress_pct * 0.45)
+    return _scalars({'progress_pct': progress_pct, 'cn_current': cn_current, 'base_quality': base_quality})
+
+
+def upcycling(input_qty, pet_price_raw=5500, filament_price=150000, extrusion_yield=EXTRUSION_YIELD):
+    """Value added by turning PET flakes into 3D-printing filament."""
+    input_qty = np.asarray(input_qty, dtype=np.float64)
+    raw_value = input_qty * pet_price_raw
+    output_qty = input_qty * extrusion_yield
+    filament_value_total = output_qty * filament_price
+    added_value = filament_value_total - raw_value
+    return _scalars({
+        'raw_value': raw_value, 'output_qty': output_qty, 'filament_value_total': filament_value_total,
+        'added_value': added_value, 'margin_pct': _ratio(added_value, raw_value, 100),
+    })
+
+
+MODELS = {
+    'pyrolysis': pyrolysis,
+    'maggot': maggot,
+    'compost': compost,
+    'compost_maturity': compost_maturity,
+    'upcycling': upcycling,
+}
+
+
+def parameters(model):
+    """Parameter names of a model with their defaults (None when required)."""
+    func = MODELS[model] if isinstance(model, str) else model
+    return {name: (None if p.default is inspect.Parameter.empty else p.default)
+            for name, p in inspect.signature(func).parameters.items()}
+
+
+def evaluate(model, scenarios):
+    """Evaluate `model` on a batch of scenarios in one vectorized call.
+
+    `scenarios` is a DataFrame or a dict of equal-length arrays, one entry
+    per parameter; omitted parameters take their defaults. Returns one row
+    per scenario with the inputs followed by every output.
+    """
+    func = MODELS[model] if isinstance(model, str) else model
+    if isinstance(scenarios, pd.DataFrame):
+        scenarios = {c: scenarios[c].to_numpy() for c in scenarios.columns}
+    unknown = set(scenarios) - set(parameters(func))
+    if unknown:
+        raise ValueError(f"unknown parameters for {func.__name__}: {', '.join(sorted(unknown))}")
+    inputs = {k: np.asarray(v) for k, v in scenarios.items()}
+    outputs = func(**inputs)
+    n = np.broadcast_shapes(*(np.shape(v) for v in (*inputs.values(), *outputs.values())))
+    return pd.DataFrame({k: np.broadcast_to(v, n) for k, v in {**inputs, **outputs}.items()})
+
+
+def sweep(model, **grid):
+    """Evaluate every combination of the values given per parameter.
+
+    e.g. sweep('pyrolysis', input_plastic_kg=np.arange(50, 1001, 50), target_temp=range(300, 501, 10))
+    evaluates 20 x 21 scenarios at once.
+    """
+    axes = {k: np.atleast_1d(np.asarray(v)) for k, v in grid.items()}
+    mesh = np.meshgrid(*axes.values(), indexing='ij') if axes else []
+    return evaluate(model, {k: m.ravel() for k, m in zip(axes, mesh)})
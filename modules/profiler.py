@@ -0,0 +1,169 @@
+import contextlib
+import datetime
+import glob
+import json
+import os
+import re
+import threading
+import time
+import tracemalloc
+import cProfile
+import pstats
+import pandas as pd
+
+# Per-rerun profiling of page renders for selected users.
+# Enabled for everyone with BANK_SAMPAH_PROFILE=1, for some users with
+# BANK_SAMPAH_PROFILE=a@x.com,b@y.com, or from the admin monitoring page.
+# Each profiled rerun writes <stem>.pstats (+ <stem>.tracemalloc when memory
+# tracing is on) and <stem>.json metadata; only the newest MAX_PROFILES are kept.
+PROFILE_DIR = "data/profiles"
+MAX_PROFILES = 50
+ENV_VAR = "BANK_SAMPAH_PROFILE"
+MEMORY_ENV_VAR = "BANK_SAMPAH_PROFILE_MEMORY"
+TRACEMALLOC_FRAMES = 5
+
+_lock = threading.Lock()
+_targets = {}  # email -> trace memory too (set from the admin page)
+# tracemalloc is process-global: concurrent memory-profiled renders share one
+# trace. The first one in starts it (and resets the peak), the last one out
+# stops it, so no session stops tracing underneath another.
+_memory_lock = threading.Lock()
+_memory_users = 0
+_started_tracing = False
+
+def enable(email, memory=False):
+    with _lock:
+        _targets[email.strip().lower()] = memory
+
+def disable(email):
+    with _lock:
+        _targets.pop(email.strip().lower(), None)
+
+def targets():
+    """Users profiled via the admin page: {email: memory}."""
+    with _lock:
+        return dict(_targets)
+
+def settings_for(email):
+    """(profile, trace_memory) for a user, from the env var or the admin toggle."""
+    email = (email or "").strip().lower()
+    memory_env = os.environ.get(MEMORY_ENV_VAR) == "1"
+    env = os.environ.get(ENV_VAR, "").strip()
+    if env == "1" or (email and email in {e.strip().lower() for e in env.split(",")}):
+        return True, memory_env
+    with _lock:
+        if email in _targets:
+            return True, _targets[email] or memory_env
+    return False, False
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", str(text).lower()).strip("-")[:40] or "anon"
+
+def _acquire_tracing():
+    global _memory_users, _started_tracing
+    with _memory_lock:
+        if _memory_users == 0:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+                _started_tracing = True
+            tracemalloc.reset_peak()  # only when alone, never under a running session
+        _memory_users += 1
+
+def _release_tracing():
+    """(snapshot, peak) of the shared trace, stopping it when this was the last user."""
+    global _memory_users, _started_tracing
+    with _memory_lock:
+        snapshot = peak = None
+        if tracemalloc.is_tracing():
+            # Process-wide: allocations of concurrent sessions are included
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ])
+            peak = tracemalloc.get_traced_memory()[1]
+        _memory_users -= 1
+        if _memory_users == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+        return snapshot, peak
+
+def _rotate():
+    stems = sorted({p.rsplit(".", 1)[0] for p in glob.glob(os.path.join(PROFILE_DIR, "*.json"))})
+    for stem in stems[:-MAX_PROFILES]:
+        for path in glob.glob(stem + ".*"):
+            os.remove(path)
+
+@contextlib.contextmanager
+def profile_render(page, email=None):
+    """Profile the enclosed page render if profiling is on for `email`."""
+    enabled, memory = settings_for(email)
+    if not enabled:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    if memory:
+        _acquire_tracing()
+    start = time.perf_counter()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is active on this thread; run unprofiled
+        profiler = None
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        duration = time.perf_counter() - start
+        snapshot, peak = _release_tracing() if memory else (None, None)
+        if profiler is not None:
+            _write(page, email, duration, profiler, snapshot, peak)
+
+def _write(page, email, duration, profiler, snapshot, peak):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    now = datetime.datetime.now()
+    stem = os.path.join(PROFILE_DIR, f"{now:%Y%m%d-%H%M%S-%f}_{_slug(email)}_{_slug(page)}")
+    profiler.dump_stats(stem + ".pstats")
+    if snapshot is not None:
+        snapshot.dump(stem + ".tracemalloc")
+    with open(stem + ".json", "w") as f:
+        json.dump({"timestamp": now.isoformat(timespec="seconds"), "page": page, "user": email,
+                   "seconds": round(duration, 4), "peak_bytes": peak}, f)
+    with _lock:
+        _rotate()
+
+def list_profiles():
+    """Metadata of the stored profiles, newest first (with a 'stem' column)."""
+    rows = []
+    for path in glob.glob(os.path.join(PROFILE_DIR, "*.json")):
+        try:
+            with open(path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        meta["stem"] = path[:-len(".json")]
+        meta["memory"] = os.path.exists(meta["stem"] + ".tracemalloc")
+        rows.append(meta)
+    if not rows:
+        return pd.DataFrame(columns=["timestamp", "page", "user", "seconds", "peak_bytes", "stem", "memory"])
+    return pd.DataFrame(rows).sort_values("stem", ascending=False, ignore_index=True)
+
+def top_functions(stem, limit=25):
+    """Functions of a profile with the largest cumulative time."""
+    stats = pstats.Stats(stem + ".pstats").stats
+    rows = [
+        {"Fungsi": f"{name} ({os.path.basename(filename)}:{line})", "Panggilan": nc,
+         "Total (ms)": tt * 1000, "Kumulatif (ms)": ct * 1000}
+        for (filename, line, name), (cc, nc, tt, ct, callers) in stats.items()
+    ]
+    return pd.DataFrame(rows).sort_values("Kumulatif (ms)", ascending=False, ignore_index=True).head(limit)
+
+def top_allocations(stem, limit=25):
+    """Source lines holding the most memory at the end of the profiled render."""
+    snapshot = tracemalloc.Snapshot.load(stem + ".tracemalloc")
+    rows = [
+        {"Lokasi": str(stat.traceback[0]), "Ukuran (KB)": stat.size / 1024, "Jumlah Blok": stat.count}
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+    return pd.DataFrame(rows, columns=["Lokasi", "Ukuran (KB)", "Jumlah Blok"])
@@ -3,6 +3,7 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import time
+from modules import process_models
 
 def show():
     st.title("🛢️ Waste-to-Energy: Pyrolysis Center")
@@ -24,24 +25,12 @@ def show():
         price_char = st.number_input("Harga Arang/Carbon (Rp/kg)", value=2000)
 
     # --- 1. Simulation Engine ---
-    
-    # Yield Logic based on Temp
-    # Ideal temp for oil is around 400C.
-    # < 350: Low conversion, high wax.
-    # > 450: High gas (Syngas), less oil.
-    
-    efficiency_factor = 1.0
-    if target_temp < 350: efficiency_factor = 0.7 # Incomplete cracking
-    if target_temp > 450: efficiency_factor = 0.6 # Over-cracking to gas
-    
-    # Standard Pyrolysis Yields (polyolefins)
-    yield_oil_pct = 0.60 * efficiency_factor # 60% Oil
-    yield_gas_pct = 0.20 + (0.60 * (1-efficiency_factor)) # Gas increases if efficiency drops (overheat)
-    yield_char_pct = 0.20 # Char residue
-    
-    output_oil_liters = (input_plastic_kg * yield_oil_pct) / 0.85 # Density approx 0.85 kg/L
-    output_gas_kg = input_plastic_kg * yield_gas_pct
-    output_char_kg = input_plastic_kg * yield_char_pct
+    # Yields depend on the reactor temperature (ideal for oil around 400C)
+    model = process_models.pyrolysis(input_plastic_kg, target_temp, price_oil, price_char)
+    yield_oil_pct = model['yield_oil_pct']
+    output_oil_liters = model['output_oil_liters']
+    output_gas_kg = model['output_gas_kg']
+    output_char_kg = model['output_char_kg']
     
     # --- 2. Dashboard UI ---
     
@@ -122,14 +111,10 @@ def show():
     st.markdown("---")
     st.subheader("💰 Nilai Ekonomi")
     
-    revenue_oil = output_oil_liters * price_oil
-    revenue_char = output_char_kg * price_char
-    total_revenue = revenue_oil + revenue_char
-    
-    # Approximate Cost: LPG/Wood for heating (if external) or Electricity
-    # Assume Rp 2000 per kg plastic input for operational cost
-    op_cost = input_plastic_kg * 2000
-    profit = total_revenue - op_cost
+    # Operational cost (heating energy & labour) ~Rp 2000 per kg plastic input
+    total_revenue = model['total_revenue']
+    op_cost = model['op_cost']
+    profit = model['profit']
     
     e1, e2, e3 = st.columns(3)
     
@@ -138,8 +123,7 @@ def show():
     with e2:
         st.metric("Operational Cost", f"Rp {op_cost:,.0f}", "Estimasi Energi & SDM")
     with e3:
-        roi = (profit / op_cost) * 100 if op_cost > 0 else 0
-        st.metric("Net Profit", f"Rp {profit:,.0f}", f"ROI: {roi:.1f}%")
+        st.metric("Net Profit", f"Rp {profit:,.0f}", f"ROI: {model['roi']:.1f}%")
 
     if profit > 0:
         st.balloons()
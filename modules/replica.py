@@ -0,0 +1,151 @@
+import datetime
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from modules import metrics, unit_store
+
+# Read-only snapshots of the unit partitions for dashboards and reports.
+# A snapshot is written with VACUUM INTO inside a single read transaction,
+# so it always finishes (counter saves wait for the copy instead of
+# restarting it, as a paged online backup would), into a temporary file that
+# is swapped in with os.replace, so readers always see a complete file. Snapshots refresh in the background after REFRESH_AFTER_WRITES
+# counter saves or when older than REFRESH_SECONDS; reads routed here never
+# touch the partition the weighing counter writes to.
+#   BANK_SAMPAH_REPLICA=0  -> read the partitions directly
+REPLICA_DIR = "data/replica"
+REFRESH_SECONDS = 300
+REFRESH_AFTER_WRITES = 50
+MAX_STALENESS_SECONDS = 3600  # older snapshots (e.g. after downtime) are not served
+ENABLED = os.environ.get("BANK_SAMPAH_REPLICA", "1") != "0"
+
+_lock = threading.Lock()
+_writes = Counter()
+_refreshing = set()
+_generation = Counter()  # bumped by invalidate(); refreshes started earlier are discarded
+_executor = None
+
+def replica_path(lokasi):
+    return os.path.join(REPLICA_DIR, f"{unit_store.unit_slug(lokasi)}.db")
+
+def snapshot_time(lokasi):
+    """When the snapshot of a unit was taken, or None."""
+    try:
+        return datetime.datetime.fromtimestamp(os.path.getmtime(replica_path(lokasi)))
+    except OSError:
+        return None
+
+def refresh(lokasi):
+    """Copy the partition of `lokasi` into its snapshot; returns the number of pages copied."""
+    os.makedirs(REPLICA_DIR, exist_ok=True)
+    target = replica_path(lokasi)
+    tmp = f"{target}.{threading.get_ident()}.tmp"
+    with _lock:
+        generation = _generation[lokasi]
+    start = time.perf_counter()
+    if os.path.exists(tmp):
+        os.remove(tmp)  # left over by an interrupted refresh; VACUUM INTO needs a new file
+    source = sqlite3.connect(f"file:{os.path.abspath(unit_store.partition_path(lokasi))}?mode=ro",
+                             uri=True, timeout=30)
+    try:
+        source.execute("VACUUM INTO ?", (tmp,))
+    finally:
+        source.close()
+    dest = sqlite3.connect(tmp)
+    try:
+        # The snapshot is never written again: no WAL/-shm files next to it
+        dest.execute("PRAGMA journal_mode=DELETE")
+        pages = dest.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        dest.close()
+    with _lock:
+        if generation != _generation[lokasi]:
+            os.remove(tmp)  # the partition changed under us in a way appends don't cover
+            return 0
+        os.replace(tmp, target)
+    metrics.observe("replica_refresh_seconds", time.perf_counter() - start, unit=lokasi)
+    return pages
+
+def _refresh_in_background(lokasi):
+    try:
+        refresh(lokasi)
+    except Exception as e:
+        print(f"Error refreshing replica of {lokasi}: {e}")
+    finally:
+        with _lock:
+            _refreshing.discard(lokasi)
+
+def request_refresh(lokasi):
+    """Schedule a background refresh unless one is already running for this unit."""
+    global _executor
+    with _lock:
+        if lokasi in _refreshing:
+            return False
+        _refreshing.add(lokasi)
+        _writes[lokasi] = 0
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="replica")
+    _executor.submit(_refresh_in_background, lokasi)
+    return True
+
+def invalidate(lokasi):
+    """Stop serving the snapshot of a unit (after rows were deleted or moved)."""
+    with _lock:
+        _generation[lokasi] += 1
+        try:
+            os.remove(replica_path(lokasi))
+        except FileNotFoundError:
+            pass
+
+def note_write(lokasi):
+    """Count a committed counter write; refresh after REFRESH_AFTER_WRITES of them."""
+    if not ENABLED:
+        return
+    with _lock:
+        _writes[lokasi] += 1
+        due = _writes[lokasi] >= REFRESH_AFTER_WRITES
+    if due:
+        request_refresh(lokasi)
+
+def read_path(lokasi):
+    """File for analytical reads: the snapshot when fresh enough, else the partition."""
+    if ENABLED and os.path.exists(unit_store.partition_path(lokasi)):
+        taken = snapshot_time(lokasi)
+        age = (datetime.datetime.now() - taken).total_seconds() if taken else None
+        if age is None or age > REFRESH_SECONDS:
+            request_refresh(lokasi)
+        if age is not None and age <= MAX_STALENESS_SECONDS:
+            return replica_path(lokasi)
+    return unit_store.partition_path(lokasi)
+
+def read_connection(lokasi):
+    """Connection for analytical reads (see read_path)."""
+    path = read_path(lokasi)
+    if path == replica_path(lokasi):
+        uri = f"file:{os.path.abspath(path)}?mode=ro&immutable=1"
+        return sqlite3.connect(uri, uri=True, check_same_thread=False, factory=metrics.TimedConnection)
+    return unit_store.get_unit_connection(lokasi)
+
+def staleness(units=None):
+    """Age in seconds of the oldest snapshot being served, or None when reads go to the partitions."""
+    if not ENABLED:
+        return None
+    ages = []
+    for lokasi in unit_store.list_units() if units is None else units:
+        taken = snapshot_time(lokasi)
+        if taken is None:
+            return None
+        ages.append((datetime.datetime.now() - taken).total_seconds())
+    ages = [a for a in ages if a <= MAX_STALENESS_SECONDS]
+    return max(ages) if ages else None
+
+def staleness_caption():
+    """UI text describing how current the report data is."""
+    age = staleness()
+    if age is None:
+        return "🟢 Data langsung dari database utama."
+    taken = datetime.datetime.now() - datetime.timedelta(seconds=age)
+    return (f"🕒 Data snapshot per {taken:%H:%M} ({age / 60:.0f} menit lalu); "
+            f"diperbarui tiap {REFRESH_SECONDS // 60} menit atau setelah {REFRESH_AFTER_WRITES} transaksi.")
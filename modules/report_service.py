@@ -0,0 +1,81 @@
+import pandas as pd
+from modules import auth_db, auth_service, archive_service, job_runner, rollup_service, unit_store
+
+# Report & export builders executed by the background job runner.
+# Each returns (data_bytes, file_name, mime).
+
+def build_csv(params, progress):
+    """Full transaction logbook as CSV."""
+    progress(0.1, "Membaca transaksi")
+    df = auth_db.get_all_transactions(petugas_filter=params.get('petugas'))
+    progress(0.6, "Menulis CSV")
+    return df.to_csv(index=False).encode('utf-8'), 'Laporan_Bank_Sampah.csv', 'text/csv'
+
+def build_pdf(params, progress):
+    """Transaction summary table as PDF (requires the optional 'fpdf' library)."""
+    from fpdf import FPDF
+
+    progress(0.05, "Membaca transaksi")
+    dataframe = auth_db.get_all_transactions(petugas_filter=params.get('petugas'))
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+
+    # Title
+    pdf.set_font("Arial", style="B", size=16)
+    pdf.cell(200, 10, txt="Laporan Transaksi Bank Sampah", ln=True, align='C')
+    pdf.ln(10)
+
+    # Table Header
+    pdf.set_font("Arial", style="B", size=10)
+    cols = ["Tanggal", "Nasabah", "Total KG", "Rp Dibayar"]
+    col_widths = [40, 60, 30, 40]
+
+    for i, col in enumerate(cols):
+        pdf.cell(col_widths[i], 10, col, 1, 0, 'C')
+    pdf.ln()
+
+    # Table Rows
+    pdf.set_font("Arial", size=10)
+    n_rows = max(1, len(dataframe))
+    for i, row in enumerate(dataframe.itertuples(index=False)):
+        # Safe string conversion and formatting
+        pdf.cell(col_widths[0], 10, f"{row.Tanggal:%d/%m/%Y}" if pd.notna(row.Tanggal) else "-", 1)
+        pdf.cell(col_widths[1], 10, str(row.Nasabah)[:25], 1) # Truncate long names
+        pdf.cell(col_widths[2], 10, f"{row.Total_KG or 0:.1f}", 1, 0, 'R')
+        pdf.cell(col_widths[3], 10, f"{int(row.Total_Bayar_Nasabah or 0):,}", 1, 0, 'R')
+        pdf.ln()
+        if i % 500 == 0:
+            progress(0.05 + 0.9 * i / n_rows, f"Menulis baris {i:,} dari {n_rows:,}")
+
+    return pdf.output(dest='S').encode('latin-1', 'replace'), 'Laporan_Bank_Sampah.pdf', 'application/pdf'
+
+def run_archive(params, progress):
+    """Move cold transactions into the Parquet archive; the result is a per-unit summary CSV.
+
+    Deletes rows from every unit, so it only runs for an admin (`requested_by` email).
+    """
+    requester = auth_db.get_user_profile(params.get('requested_by') or '')
+    if not requester or not auth_service.is_admin(requester):
+        raise PermissionError("Pengarsipan hanya dapat dijalankan oleh admin.")
+    horizon = int(params.get('horizon_days', archive_service.ARCHIVE_HORIZON_DAYS))
+    progress(0.1, f"Mengarsipkan transaksi lebih tua dari {horizon} hari")
+    moved = archive_service.archive_transactions(horizon_days=horizon)
+    summary = pd.DataFrame({'Unit': list(moved), 'Baris Diarsipkan': list(moved.values())})
+    return summary.to_csv(index=False).encode('utf-8'), 'Ringkasan_Arsip.csv', 'text/csv'
+
+def run_rollup_rebuild(params, progress):
+    """Recompute the per-officer daily rollups of every unit from hot and archived rows."""
+    units = unit_store.list_units()
+    rows = []
+    for i, lokasi in enumerate(units):
+        progress(i / len(units), f"Menghitung ulang agregat {lokasi}")
+        folded = rollup_service.refresh(units=[lokasi], rebuild=True)[lokasi]
+        rows.append({'Unit': lokasi, 'Transaksi Dihitung': folded})
+    return pd.DataFrame(rows).to_csv(index=False).encode('utf-8'), 'Ringkasan_Agregat.csv', 'text/csv'
+
+job_runner.register_job("export_csv", build_csv)
+job_runner.register_job("report_pdf", build_pdf)
+job_runner.register_job("archive_transactions", run_archive)
+job_runner.register_job("rollup_rebuild", run_rollup_rebuild)
@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+import pandas as pd
+from modules import unit_store
+
+# Materialized per-officer, per-day totals in each unit partition (table
+# daily_rollup). A refresh folds only the transactions above the watermark
+# (the highest id already counted, kept in unit_meta) into the table, so the
+# admin view reads a few rows per officer and day instead of every
+# transaction. Archived rows stay counted: archive_unit folds before it
+# deletes. A partition without a watermark is rebuilt from its hot rows plus
+# its Parquet archive.
+REFRESH_SECONDS = 60
+WATERMARK_KEY = "rollup_watermark"
+MEASURES = ['transaksi', 'berat_kg', 'dibayar', 'pendapatan', 'profit']
+DISPLAY_NAMES = {
+    'lokasi': 'Unit', 'tanggal': 'Tanggal', 'petugas': 'Petugas', 'transaksi': 'Transaksi',
+    'berat_kg': 'Berat_KG', 'dibayar': 'Dibayar', 'pendapatan': 'Pendapatan', 'profit': 'Profit',
+}
+
+_lock = threading.Lock()
+_last_refresh = {}  # partition path -> monotonic time of its last refresh in this process
+
+def _categories():
+    from modules import auth_db  # auth_db builds on the storage modules
+    return auth_db.CATEGORY_COLUMNS
+
+def _upsert_sql(rows):
+    measures = MEASURES + list(_categories())
+    return (f"INSERT INTO daily_rollup (tanggal, petugas, {', '.join(measures)}) {rows} "
+            "ON CONFLICT (tanggal, petugas) DO UPDATE SET "
+            + ", ".join(f"{m} = {m} + excluded.{m}" for m in measures))
+
+def _fold_sql():
+    categories = list(_categories())
+    weight = " + ".join(f"COALESCE({col}, 0)" for col in categories)
+    return _upsert_sql(
+        f"SELECT tanggal, COALESCE(petugas, ''), COUNT(*), SUM({weight}), SUM(COALESCE(total_paid, 0)), "
+        "SUM(COALESCE(total_revenue, 0)), SUM(COALESCE(profit, 0)), "
+        + ", ".join(f"SUM(COALESCE({col}, 0))" for col in categories)
+        + " FROM transactions WHERE id > ? AND id <= ? AND tanggal IS NOT NULL GROUP BY tanggal, petugas"
+    )
+
+def _ensure_table(conn):
+    """Create the rollup table, recreating it when its columns changed; True when (re)created."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(daily_rollup)")]
+    if columns and set(_categories()) <= set(columns):
+        return False
+    conn.execute("DROP TABLE IF EXISTS daily_rollup")
+    conn.execute(unit_store.ROLLUP_DDL)
+    return True
+
+def _key(lokasi):
+    return os.path.abspath(unit_store.partition_path(lokasi))
+
+def _watermark(conn):
+    row = conn.execute("SELECT value FROM unit_meta WHERE key = ?", (WATERMARK_KEY,)).fetchone()
+    return int(row[0]) if row else None
+
+def _fold_archive(conn, lokasi):
+    """Add the archived rows of a unit to its (emptied) rollup."""
+    from modules import archive_service
+    categories = list(_categories())
+    cold = archive_service.read_archive(columns=['tanggal', 'petugas', *categories, 'total_paid', 'total_revenue', 'profit'],
+                                        units=[lokasi])
+    if cold.empty:
+        return 0
+    cold = cold.dropna(subset=['tanggal'])
+    cold['petugas'] = cold['petugas'].fillna('')
+    cold['berat_kg'] = cold[categories].fillna(0).sum(axis=1)
+    cold[categories] = cold[categories].fillna(0)
+    grouped = cold.groupby(['tanggal', 'petugas']).agg(
+        transaksi=('berat_kg', 'size'), berat_kg=('berat_kg', 'sum'), dibayar=('total_paid', 'sum'),
+        pendapatan=('total_revenue', 'sum'), profit=('profit', 'sum'), **{c: (c, 'sum') for c in categories},
+    ).reset_index()
+    integers = ['transaksi', 'dibayar', 'pendapatan', 'profit']
+    grouped[integers] = grouped[integers].astype('int64')
+    rows = grouped.astype(object).itertuples(index=False, name=None)
+    conn.executemany(_upsert_sql(f"VALUES ({', '.join('?' * len(grouped.columns))})"), list(rows))
+    return len(cold)
+
+def refresh_unit(conn, lokasi, rebuild=False):
+    """Fold new transactions of one partition into its rollup; returns the number of rows folded.
+
+    Holds the partition's write lock for the fold, so concurrent refreshes
+    (other sessions or processes) never count a row twice.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        recreated = _ensure_table(conn)  # partitions created before the rollups (or a column) existed
+        watermark = None if recreated else _watermark(conn)
+        high = conn.execute("SELECT COALESCE(MAX(id), 0) FROM transactions").fetchone()[0]
+        folded = 0
+        if rebuild or watermark is None:
+            conn.execute("DELETE FROM daily_rollup")
+            # Pending archive parts are skipped by read_archive and their rows are still hot
+            folded += _fold_archive(conn, lokasi)
+            watermark = 0
+        if high > watermark:
+            folded += conn.execute("SELECT COUNT(*) FROM transactions WHERE id > ? AND id <= ?", (watermark, high)).fetchone()[0]
+            conn.execute(_fold_sql(), (watermark, high))
+        conn.execute("INSERT OR REPLACE INTO unit_meta (key, value) VALUES (?, ?)", (WATERMARK_KEY, str(high)))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    with _lock:
+        _last_refresh[_key(lokasi)] = time.monotonic()
+    return folded
+
+def refresh(units=None, force=False, rebuild=False):
+    """Refresh the rollups of every unit (skipping units refreshed in the last REFRESH_SECONDS unless `force`)."""
+    units = unit_store.list_units() if units is None else units
+    now = time.monotonic()
+    with _lock:
+        due = [u for u in units if force or rebuild or now - _last_refresh.get(_key(u), float('-inf')) >= REFRESH_SECONDS]
+    folded = unit_store.fan_out(lambda conn, lokasi: refresh_unit(conn, lokasi, rebuild), due)
+    return dict(zip(due, folded))
+
+def load(start=None, end=None, units=None):
+    """Rollup rows of all units (display names), refreshed first when due."""
+    units = unit_store.list_units() if units is None else units
+    refresh(units)
+    query = "SELECT ? AS lokasi, * FROM daily_rollup WHERE 1=1"
+    params = []
+    if start is not None:
+        query += " AND tanggal >= ?"
+        params.append(str(start))
+    if end is not None:
+        query += " AND tanggal <= ?"
+        params.append(str(end))
+    # The rollup tables are tiny, so they are read from the partitions (always current)
+    frames = unit_store.fan_out(lambda conn, lokasi: pd.read_sql_query(query, conn, params=(lokasi, *params)), units)
+    frames = [f for f in frames if not f.empty]
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=[*DISPLAY_NAMES, *_categories()])
+    df = df.rename(columns={**DISPLAY_NAMES, **_categories()})
+    df['Tanggal'] = pd.to_datetime(df['Tanggal'], errors='coerce', format='ISO8601')
+    return df
+
+def version(units=None):
+    """Watermark of every unit's rollup: changes whenever new transactions were folded in."""
+    units = unit_store.list_units() if units is None else units
+    return tuple(unit_store.fan_out(lambda conn, lokasi: _watermark(conn), units))
+
+def last_refresh_age(units=None):
+    """Seconds since the oldest unit rollup was refreshed in this process, or None."""
+    units = unit_store.list_units() if units is None else units
+    with _lock:
+        times = [_last_refresh.get(_key(u)) for u in units]
+    if not times or None in times:
+        return None
+    return time.monotonic() - min(times)
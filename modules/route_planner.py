@@ -0,0 +1,373 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# Capacitated pickup routes from the collection units to partner stops.
+# Stops are served by the nearest unit. Per unit, Clarke-Wright savings build
+# the initial routes, with candidate pairs restricted to each stop's nearest
+# neighbours from a spatial grid, so thousands of stops never need a full
+# distance matrix. 2-opt (within a route) and or-opt (moving chains of up to
+# three stops, also into neighbouring routes) then shorten the routes until
+# no move improves or the time limit is reached.
+UNIT_LOCATIONS = {  # (lat, lon) of each unit's depot
+    "Unit Pusat": (-6.9147, 107.6098),
+    "Unit Satelit 1": (-6.8731, 107.5746),
+    "Unit Satelit 2": (-6.9511, 107.6631),
+}
+ROAD_FACTOR = 1.3        # Road distance / straight-line distance in town
+SPEED_KMH = 25           # Average pickup truck speed including traffic
+SERVICE_MINUTES = 6      # Loading time per stop
+SHIFT_HOURS = 8          # Driving shift per vehicle and day
+NEIGHBORS = 12           # Candidate neighbours per stop for savings and or-opt
+MAX_CHAIN = 3            # Longest chain of stops moved by or-opt
+TIME_LIMIT_S = 2.0       # Budget for the local search per plan
+CACHE_SIZE = 32
+
+_lock = threading.Lock()
+_plans = OrderedDict()
+
+
+def to_km(lat, lon, origin):
+    """Project coordinates onto a local plane (km) around `origin` (lat, lon)."""
+    lat0, lon0 = origin
+    x = (np.asarray(lon, dtype=np.float64) - lon0) * 111.32 * math.cos(math.radians(lat0))
+    y = (np.asarray(lat, dtype=np.float64) - lat0) * 110.57
+    return np.column_stack([x, y])
+
+
+class SpatialGrid:
+    """Uniform grid over planar points for k-nearest-neighbour lookups."""
+
+    def __init__(self, xy, per_cell=4):
+        self.xy = np.asarray(xy, dtype=np.float64)
+        lo, hi = self.xy.min(axis=0), self.xy.max(axis=0)
+        # Sized from the longest axis, not the area: collinear or duplicate
+        # points have no area, and tiny cells would make nearest() scan
+        # millions of empty ones. At most sqrt(n / per_cell) cells per axis.
+        side = float((hi - lo).max()) / math.sqrt(max(len(self.xy), 1) / per_cell)
+        self.cell = max(side, 1e-6)
+        self.origin = lo
+        keys = np.floor((self.xy - lo) / self.cell).astype(np.int64)
+        self.keys = keys
+        self.span = keys.max(axis=0) if len(keys) else np.zeros(2, dtype=np.int64)
+        self.cells = {}
+        order = np.lexsort((keys[:, 1], keys[:, 0]))
+        if len(order):
+            sorted_keys = keys[order]
+            breaks = np.flatnonzero(np.any(np.diff(sorted_keys, axis=0) != 0, axis=1)) + 1
+            for group in np.split(order, breaks):
+                self.cells[tuple(keys[group[0]])] = group
+
+    def nearest(self, i, k):
+        """Indices of the `k` points closest to point `i` (excluding itself), nearest first."""
+        cx, cy = self.keys[i]
+        k = min(k, len(self.xy) - 1)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        ring = 1
+        while True:
+            found = [self.cells[(x, y)]
+                     for x in range(cx - ring, cx + ring + 1) for y in range(cy - ring, cy + ring + 1)
+                     if (x, y) in self.cells]
+            candidates = np.concatenate(found)
+            candidates = candidates[candidates != i]
+            covers_all = cx - ring <= 0 and cy - ring <= 0 and cx + ring >= self.span[0] and cy + ring >= self.span[1]
+            if len(candidates) >= k or covers_all:
+                d = np.hypot(*(self.xy[candidates] - self.xy[i]).T)
+                top = np.argsort(d)[:k]
+                # Points outside the searched square are at least ring * cell away
+                if covers_all or d[top[-1]] <= ring * self.cell:
+                    return candidates[top]
+            ring += 1
+
+
+def _savings(xy, demand, capacity, neighbors):
+    """Clarke-Wright savings routes; node 0 is the depot, routes list stop nodes 1..n."""
+    n = len(xy) - 1
+    d0 = np.hypot(*(xy[1:] - xy[0]).T)
+    i = np.repeat(np.arange(1, n + 1), neighbors.shape[1])
+    j = neighbors.ravel() + 1
+    pairs = np.unique(np.sort(np.column_stack([i, j]), axis=1), axis=0)
+    if len(pairs):
+        saving = d0[pairs[:, 0] - 1] + d0[pairs[:, 1] - 1] - np.hypot(*(xy[pairs[:, 0]] - xy[pairs[:, 1]]).T)
+        order = np.argsort(-saving, kind='stable')
+        pairs = pairs[order[saving[order] > 0]]
+
+    routes = {s: [s] for s in range(1, n + 1)}
+    load = {s: float(demand[s]) for s in range(1, n + 1)}
+    owner = list(range(n + 1))
+    for a, b in pairs.tolist():
+        ra, rb = owner[a], owner[b]
+        if ra == rb or load[ra] + load[rb] > capacity + 1e-9:
+            continue
+        first, second = routes[ra], routes[rb]
+        # Both stops must be route ends; join them as ... a | b ...
+        if first[-1] != a:
+            if first[0] != a:
+                continue
+            first.reverse()
+        if second[0] != b:
+            if second[-1] != b:
+                continue
+            second.reverse()
+        first.extend(second)
+        load[ra] += load.pop(rb)
+        for s in second:
+            owner[s] = ra
+        del routes[rb]
+    return list(routes.values())
+
+
+class _LocalSearch:
+    """2-opt and or-opt over the routes of one depot (node 0)."""
+
+    def __init__(self, xy, demand, capacity, neighbors, routes, deadline):
+        self.xs, self.ys = xy[:, 0].tolist(), xy[:, 1].tolist()
+        self.demand = demand.tolist()
+        self.capacity = capacity
+        self.neighbors = [[], *(neighbors + 1).tolist()]  # per node; the depot has none
+        self.routes = routes
+        self.deadline = deadline
+        self.timed_out = False
+        self.owner = [0] * len(xy)
+        self.pos = [0] * len(xy)
+        self.load = []
+        for r, route in enumerate(routes):
+            self._index(r)
+            self.load.append(sum(self.demand[s] for s in route))
+
+    def d(self, a, b):
+        return math.hypot(self.xs[a] - self.xs[b], self.ys[a] - self.ys[b])
+
+    def _index(self, r):
+        for p, s in enumerate(self.routes[r]):
+            self.owner[s], self.pos[s] = r, p
+
+    def _expired(self):
+        if time.perf_counter() > self.deadline:
+            self.timed_out = True
+        return self.timed_out
+
+    def two_opt(self, r):
+        """Reverse route segments while that shortens route `r`."""
+        tour = [0, *self.routes[r], 0]
+        improved = True
+        changed = False
+        d = self.d
+        while improved:
+            improved = False
+            for i in range(len(tour) - 3):
+                a, b = tour[i], tour[i + 1]
+                dab = d(a, b)
+                for j in range(i + 2, len(tour) - 1):
+                    c, e = tour[j], tour[j + 1]
+                    if d(a, c) + d(b, e) - dab - d(c, e) < -1e-9:
+                        tour[i + 1:j + 1] = tour[i + 1:j + 1][::-1]
+                        improved = changed = True
+                        b, dab = tour[i + 1], d(a, tour[i + 1])
+        if changed:
+            self.routes[r] = tour[1:-1]
+            self._index(r)
+        return changed
+
+    def or_opt(self, s):
+        """Move the chain starting at stop `s` to the cheapest improving spot near it."""
+        d = self.d
+        r = self.owner[s]
+        route = self.routes[r]
+        p = self.pos[s]
+        for length in range(1, MAX_CHAIN + 1):
+            if p + length > len(route):
+                break
+            chain = route[p:p + length]
+            head, tail = chain[0], chain[-1]
+            prev = route[p - 1] if p > 0 else 0
+            nxt = route[p + length] if p + length < len(route) else 0
+            gain = d(prev, head) + d(tail, nxt) - d(prev, nxt)
+            chain_load = sum(self.demand[c] for c in chain)
+            best = None
+            for j in {*self.neighbors[head], *self.neighbors[tail]}:
+                r2 = self.owner[j]
+                if j in chain or (r2 != r and self.load[r2] + chain_load > self.capacity + 1e-9):
+                    continue
+                target = self.routes[r2]
+                q = self.pos[j]
+                for u, v, at in ((target[q - 1] if q > 0 else 0, j, q),
+                                 (j, target[q + 1] if q + 1 < len(target) else 0, q + 1)):
+                    if u in chain or v in chain:
+                        continue
+                    duv = d(u, v)
+                    forward = d(u, head) + d(tail, v) - duv
+                    backward = d(u, tail) + d(head, v) - duv
+                    delta = min(forward, backward) - gain
+                    if delta < -1e-9 and (best is None or delta < best[0]):
+                        best = (delta, r2, at, backward < forward)
+            if best is not None:
+                _, r2, at, reverse = best
+                del route[p:p + length]
+                if r2 == r and at > p:
+                    at -= length
+                self.routes[r2][at:at] = chain[::-1] if reverse else chain
+                if r2 != r:
+                    self.load[r] -= chain_load
+                    self.load[r2] += chain_load
+                    self._index(r)
+                self._index(r2)
+                return True
+        return False
+
+    def run(self):
+        improved = True
+        while improved and not self._expired():
+            improved = False
+            for r in range(len(self.routes)):
+                if self.routes[r]:
+                    improved |= self.two_opt(r)
+                if self._expired():
+                    break
+            for s in range(1, len(self.xs)):
+                if self._expired():
+                    break
+                improved |= self.or_opt(s)
+        return [route for route in self.routes if route]
+
+
+def solve_depot(xy, demand, capacity, time_limit=TIME_LIMIT_S):
+    """Routes (lists of stop indices into `xy[1:]`) for one depot at `xy[0]`, and whether time ran out."""
+    n = len(xy) - 1
+    if n == 0:
+        return [], False
+    grid = SpatialGrid(xy[1:])
+    k = min(NEIGHBORS, n - 1)
+    neighbors = np.array([grid.nearest(i, k) for i in range(n)], dtype=np.int64).reshape(n, k)
+    routes = _savings(xy, demand, capacity, neighbors)
+    search = _LocalSearch(xy, demand, capacity, neighbors, routes, time.perf_counter() + time_limit)
+    routes = search.run()
+    return [[s - 1 for s in route] for route in routes], search.timed_out
+
+
+def route_km(xy, route):
+    """Road kilometres of depot -> stops -> depot, with `route` indexing `xy[1:]`."""
+    path = xy[[0, *(s + 1 for s in route), 0]]
+    return float(np.hypot(*np.diff(path, axis=0).T).sum()) * ROAD_FACTOR
+
+
+def vehicles_needed(hours, shift_hours=SHIFT_HOURS):
+    """Vehicles to drive all routes: first-fit decreasing of route hours into shifts."""
+    shifts = []
+    for h in sorted(hours, reverse=True):
+        for i, used in enumerate(shifts):
+            if used + h <= shift_hours:
+                shifts[i] += h
+                break
+        else:
+            shifts.append(h)
+    return len(shifts)
+
+
+def _plan_key(partners, capacity, depots, time_limit):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(partners[['Lat', 'Lon', 'KG']].to_numpy(dtype=np.float64)).tobytes())
+    h.update(repr((float(capacity), sorted(depots.items()), time_limit, ROAD_FACTOR, SPEED_KMH,
+                   SERVICE_MINUTES, SHIFT_HOURS)).encode())
+    return h.hexdigest()
+
+
+def plan_routes(partners, capacity, depots=None, time_limit=TIME_LIMIT_S):
+    """Daily pickup plan for `partners` (columns Lat, Lon, KG) with vehicles of `capacity` kg.
+
+    Each stop goes to the nearest depot. A stop above the capacity gets full
+    direct trips for the excess and joins the routes with the rest. Returns a
+    dict with the route table, trip count, kilometres, vehicle count and
+    whether the local search hit its time limit; identical inputs reuse the
+    cached plan.
+    """
+    depots = dict(depots or UNIT_LOCATIONS)
+    key = _plan_key(partners, capacity, depots, time_limit)
+    with _lock:
+        if key in _plans:
+            _plans.move_to_end(key)
+            return _plans[key]
+
+    started = time.perf_counter()
+    names = list(depots)
+    origin = np.mean([depots[u] for u in names], axis=0)
+    depot_xy = to_km([depots[u][0] for u in names], [depots[u][1] for u in names], origin)
+    stop_xy = to_km(partners['Lat'], partners['Lon'], origin)
+    kg = partners['KG'].to_numpy(dtype=np.float64)
+    nearest = np.hypot(*(stop_xy[:, None, :] - depot_xy[None, :, :]).transpose(2, 0, 1)).argmin(axis=1)
+
+    rows = []
+    timed_out = False
+    for u, name in enumerate(names):
+        members = np.flatnonzero(nearest == u)
+        if not len(members):
+            continue
+        full_trips = np.floor(kg[members] / capacity - 1e-9).astype(np.int64)
+        rest = kg[members] - full_trips * capacity
+        xy = np.vstack([depot_xy[u:u + 1], stop_xy[members]])
+        for s in np.flatnonzero(full_trips):
+            km = route_km(xy, [s])
+            for _ in range(full_trips[s]):
+                rows.append((name, [int(members[s])], capacity, km))
+        routes, hit = solve_depot(xy, np.concatenate([[0.0], rest]), capacity,
+                                  max(time_limit - (time.perf_counter() - started), 0.0))
+        timed_out |= hit
+        for route in routes:
+            rows.append((name, members[route].tolist(), float(rest[route].sum()), route_km(xy, route)))
+
+    routes = pd.DataFrame(rows, columns=['Unit', 'Mitra', 'Muatan_KG', 'Jarak_KM'])
+    routes['Stop'] = routes['Mitra'].str.len()
+    routes['Durasi_Jam'] = routes['Jarak_KM'] / SPEED_KMH + routes['Stop'] * SERVICE_MINUTES / 60
+    routes.insert(1, 'Rit', routes.groupby('Unit').cumcount() + 1)
+    plan = {
+        'routes': routes,
+        'trips': len(routes),
+        'km': float(routes['Jarak_KM'].sum()),
+        'hours': float(routes['Durasi_Jam'].sum()),
+        'vehicles': sum(vehicles_needed(g) for _, g in routes.groupby('Unit')['Durasi_Jam']),
+        'kg': float(kg.sum()),
+        'timed_out': timed_out,
+        'seconds': time.perf_counter() - started,
+    }
+    with _lock:
+        _plans[key] = plan
+        while len(_plans) > CACHE_SIZE:
+            _plans.popitem(last=False)
+    return plan
+
+
+def synthetic_partners(count, kg_mean, radius_km=8.0, depots=None, seed=42):
+    """Partner stops scattered around the depots, for planning before real coordinates exist."""
+    depots = dict(depots or UNIT_LOCATIONS)
+    rng = np.random.default_rng(seed)
+    count = int(count)
+    home = rng.integers(0, len(depots), count)
+    centers = np.array(list(depots.values()))[home]
+    # Denser near the unit, thinning out towards the service radius
+    r = radius_km * np.sqrt(rng.uniform(0, 1, count)) * rng.uniform(0.4, 1.0, count)
+    angle = rng.uniform(0, 2 * np.pi, count)
+    lat = centers[:, 0] + r * np.sin(angle) / 110.57
+    lon = centers[:, 1] + r * np.cos(angle) / (111.32 * np.cos(np.radians(centers[:, 0])))
+    kg = np.round(kg_mean * rng.gamma(4.0, 0.25, count), 1)
+    return pd.DataFrame({'Nama': [f"Mitra {i + 1}" for i in range(count)], 'Lat': lat, 'Lon': lon, 'KG': kg})
+
+
+def read_partners(file):
+    """Partner table from an uploaded CSV with latitude, longitude and kg columns."""
+    df = pd.read_csv(file)
+    aliases = {'lat': 'Lat', 'latitude': 'Lat', 'lon': 'Lon', 'lng': 'Lon', 'longitude': 'Lon',
+               'kg': 'KG', 'berat': 'KG', 'berat_kg': 'KG', 'nama': 'Nama', 'name': 'Nama'}
+    df = df.rename(columns={c: aliases[c.strip().lower()] for c in df.columns if c.strip().lower() in aliases})
+    missing = {'Lat', 'Lon', 'KG'} - set(df.columns)
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ada: {', '.join(sorted(missing))}")
+    df = df.dropna(subset=['Lat', 'Lon', 'KG'])
+    df = df[df['KG'] > 0].reset_index(drop=True)
+    if 'Nama' not in df.columns:
+        df['Nama'] = [f"Mitra {i + 1}" for i in range(len(df))]
+    return df[['Nama', 'Lat', 'Lon', 'KG']]
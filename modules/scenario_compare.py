@@ -0,0 +1,102 @@
+import datetime
+import streamlit as st
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from modules import auth_service, chart_cache, price_service, scenario_store
+
+def save_form(weights, buy, sell, source, key):
+    """Name input and save button for the scenario currently in the editor."""
+    user = st.session_state.get('user_info', {})
+    c1, c2, c3 = st.columns([3, 1, 1])
+    with c1:
+        name = st.text_input("Nama Skenario", key=f"{key}_name", placeholder="mis. Target Q3 - Plastik Naik")
+    with c2:
+        st.write("")
+        overwrite = st.checkbox("Timpa", key=f"{key}_overwrite", help="Ganti skenario Anda dengan nama yang sama")
+    with c3:
+        st.write("")
+        clicked = st.button("💾 Simpan ke Daftar", key=f"{key}_save", disabled=not sum(weights.values()))
+    if clicked:
+        try:
+            scenario_store.save(name, weights, buy, sell, source, owner=user.get('email'),
+                                created_by=user.get('name'), overwrite=overwrite)
+            st.success(f"Skenario '{name.strip()}' tersimpan.")
+        except ValueError as e:
+            st.error(str(e))
+
+def comparison_chart(result):
+    long = result.melt(id_vars='Skenario', value_vars=['Modal', 'Pendapatan', 'Profit'], var_name='Komponen', value_name='Rp')
+    fig = px.bar(long, x='Skenario', y='Rp', color='Komponen', barmode='group', title="Perbandingan Skenario",
+                 color_discrete_map={'Modal': '#BDBDBD', 'Pendapatan': '#66BB6A', 'Profit': '#1B5E20'})
+    fig.update_layout(height=380)
+    return fig
+
+def history_heatmap(profits, names):
+    fig = go.Figure(go.Heatmap(z=profits.to_numpy(), x=[c.strftime('%d %b %Y %H:%M') for c in profits.columns],
+                               y=names, colorscale='Greens', colorbar=dict(title="Profit (Rp)")))
+    fig.update_layout(title="Profit per Riwayat Harga", height=max(250, 40 * len(names) + 120),
+                      xaxis_title="Harga berlaku sejak")
+    return fig
+
+def show_comparison():
+    """Saved scenarios re-priced side by side."""
+    meta, categories, weights, buy, sell = scenario_store.load()
+    if meta.empty:
+        st.info("Belum ada skenario tersimpan. Isi volume lalu klik 'Simpan ke Daftar'.")
+        return
+
+    # Names are only unique per owner
+    labels = (meta['Skenario'] + " · " + meta['Dibuat Oleh'].fillna("-")).tolist()
+    c1, c2 = st.columns([2, 1])
+    with c1:
+        chosen = st.multiselect("Skenario", list(range(len(meta))), default=list(range(len(meta))),
+                                format_func=lambda i: labels[i])
+    with c2:
+        basis = st.radio("Harga Acuan", ["Harga Saat Ini", "Harga Saat Disimpan", "Harga pada Tanggal"])
+    rows = meta.index.isin(chosen)
+    chosen_labels = [labels[i] for i in np.flatnonzero(rows)]
+    if not rows.any():
+        st.info("Pilih minimal satu skenario.")
+        return
+
+    if basis == "Harga Saat Disimpan":
+        priced = scenario_store.reprice(weights[rows], buy[rows], sell[rows])
+    else:
+        when = None
+        if basis == "Harga pada Tanggal":
+            when = st.date_input("Tanggal Harga", value=datetime.date.today())
+        prices = price_service.load_prices() if when is None else price_service.prices_at(when)
+        priced = scenario_store.reprice(weights[rows], *scenario_store.price_vectors(prices, categories))
+    result = pd.concat([meta[rows].drop(columns='Pemilik').reset_index(drop=True), priced], axis=1)
+    result['Sumber'] = result['Sumber'].map(scenario_store.SOURCES).fillna(result['Sumber'])
+
+    st.dataframe(result, use_container_width=True, hide_index=True, column_config={
+        "Total (kg)": st.column_config.NumberColumn(format="%.1f"),
+        "Modal": st.column_config.NumberColumn(format="Rp %d"),
+        "Pendapatan": st.column_config.NumberColumn(format="Rp %d"),
+        "Profit": st.column_config.NumberColumn(format="Rp %d"),
+        "Margin": st.column_config.NumberColumn(format="percent"),
+    })
+    chart_df = result[['Skenario', 'Modal', 'Pendapatan', 'Profit']].assign(Skenario=chosen_labels)
+    st.plotly_chart(chart_cache.figure(comparison_chart, chart_df), use_container_width=True)
+
+    history = price_service.price_history()
+    if len(history) > 1:
+        with st.expander(f"📈 Profit terhadap {len(history)} riwayat harga"):
+            profits = scenario_store.profit_history(weights[rows], categories, history)
+            st.plotly_chart(chart_cache.figure(history_heatmap, profits, chosen_labels),
+                            use_container_width=True)
+
+    # Only the owner (or an admin) may delete; the store enforces it as well
+    email = st.session_state.get('user_info', {}).get('email') or ""
+    admin = auth_service.is_admin()
+    deletable = [i for i in range(len(meta)) if admin or meta['Pemilik'][i] == email]
+    if deletable:
+        with st.expander("🗑️ Hapus Skenario"):
+            to_delete = st.multiselect("Skenario yang dihapus", deletable, key="scenario_delete",
+                                       format_func=lambda i: labels[i])
+            if st.button("Hapus", disabled=not to_delete):
+                scenario_store.delete([(meta['Pemilik'][i], meta['Skenario'][i]) for i in to_delete], email, admin)
+                st.rerun()
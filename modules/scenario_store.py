@@ -0,0 +1,146 @@
+import datetime
+import json
+import numpy as np
+import pandas as pd
+from modules import auth_db, price_service
+
+# Named sourcing scenarios saved from the economic calculator and the profit
+# simulator. Names are unique per owner (the user's email); saving over an
+# existing name needs overwrite=True and only the owner or an admin may
+# delete a scenario. A scenario is three vectors over its category list (kg, buy and
+# sell price at save time) stored as float32 BLOBs in users.db. Comparisons
+# stack all saved scenarios into one (scenarios x categories) weight matrix,
+# so re-pricing every scenario against one price list, or against every
+# price list in the history, is a single matrix product.
+VECTOR_DTYPE = np.float32
+SOURCES = {"transformation": "Kalkulator Nilai Ekonomi", "prediction": "Simulasi Profit"}
+
+DDL = """
+    CREATE TABLE IF NOT EXISTS scenarios (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        owner TEXT NOT NULL DEFAULT '',
+        name TEXT NOT NULL,
+        source TEXT NOT NULL,
+        created_by TEXT,
+        created_at TEXT NOT NULL,
+        categories TEXT NOT NULL,
+        weights BLOB NOT NULL,
+        buy BLOB NOT NULL,
+        sell BLOB NOT NULL,
+        UNIQUE (owner, name)
+    )
+"""
+
+def _connection():
+    conn = auth_db.get_connection()
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(scenarios)")}
+    if columns and 'owner' not in columns:
+        # Names used to be global: rebuild with the per-owner unique key
+        with conn:
+            conn.execute("ALTER TABLE scenarios RENAME TO scenarios_global")
+            conn.execute(DDL)
+            conn.execute("INSERT INTO scenarios (id, name, source, created_by, created_at, categories, weights, buy, sell) "
+                         "SELECT id, name, source, created_by, created_at, categories, weights, buy, sell FROM scenarios_global")
+            conn.execute("DROP TABLE scenarios_global")
+    conn.execute(DDL)
+    return conn
+
+def _pack(values, categories):
+    return np.array([float(values.get(c, 0) or 0) for c in categories], dtype=VECTOR_DTYPE).tobytes()
+
+def save(name, weights, buy, sell, source="transformation", owner="", created_by=None, overwrite=False):
+    """Store scenario `name` of `owner`; `weights`, `buy` and `sell` map category -> value.
+
+    An existing scenario of the same owner and name is only replaced with `overwrite`.
+    """
+    name = name.strip()
+    if not name:
+        raise ValueError("Nama skenario wajib diisi")
+    owner = owner or ""
+    categories = list(dict.fromkeys([*weights, *sell, *buy]))
+    conn = _connection()
+    try:
+        with conn:
+            if not overwrite and conn.execute("SELECT 1 FROM scenarios WHERE owner = ? AND name = ?", (owner, name)).fetchone():
+                raise ValueError(f"Skenario '{name}' sudah ada. Centang 'Timpa' untuk menggantinya.")
+            conn.execute(
+                """INSERT INTO scenarios (owner, name, source, created_by, created_at, categories, weights, buy, sell)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(owner, name) DO UPDATE SET
+                       source = excluded.source, created_by = excluded.created_by, created_at = excluded.created_at,
+                       categories = excluded.categories, weights = excluded.weights, buy = excluded.buy, sell = excluded.sell""",
+                (owner, name, source, created_by, datetime.datetime.now().isoformat(timespec='seconds'), json.dumps(categories),
+                 _pack(weights, categories), _pack(buy, categories), _pack(sell, categories)),
+            )
+    finally:
+        conn.close()
+
+def delete(keys, requester, admin=False):
+    """Delete scenarios given as (owner, name) pairs; non-admins only delete their own.
+
+    Returns the number of scenarios removed.
+    """
+    keys = [(owner, name) for owner, name in keys if admin or owner == (requester or "")]
+    conn = _connection()
+    try:
+        with conn:
+            return sum(conn.execute("DELETE FROM scenarios WHERE owner = ? AND name = ?", key).rowcount for key in keys)
+    finally:
+        conn.close()
+
+def load(names=None):
+    """Saved scenarios as aligned matrices.
+
+    Returns (meta, categories, weights, buy, sell): `meta` has one row per
+    scenario (with its owner in 'Pemilik'), the three matrices are (scenarios x categories) over the union
+    of every scenario's categories (0 where a scenario lacks one).
+    """
+    conn = _connection()
+    try:
+        rows = conn.execute("SELECT name, source, created_by, created_at, categories, weights, buy, sell, owner "
+                            "FROM scenarios ORDER BY name, owner").fetchall()
+    finally:
+        conn.close()
+    if names is not None:
+        wanted = set(names)
+        rows = [r for r in rows if r[0] in wanted]
+    meta = pd.DataFrame([(*r[:4], r[8]) for r in rows], columns=['Skenario', 'Sumber', 'Dibuat Oleh', 'Disimpan', 'Pemilik'])
+    per_row = [json.loads(r[4]) for r in rows]
+    categories = list(dict.fromkeys(c for cats in per_row for c in cats))
+    index = {c: i for i, c in enumerate(categories)}
+    matrices = [np.zeros((len(rows), len(categories)), dtype=np.float64) for _ in range(3)]
+    for i, (row, cats) in enumerate(zip(rows, per_row)):
+        columns = [index[c] for c in cats]
+        for matrix, blob in zip(matrices, row[5:8]):
+            matrix[i, columns] = np.frombuffer(blob, dtype=VECTOR_DTYPE)
+    meta['Total (kg)'] = matrices[0].sum(axis=1)
+    return meta, categories, *matrices
+
+def price_vectors(prices, categories):
+    """Buy and sell vectors of a price list over `categories` (0 for unknown categories)."""
+    buy = np.array([prices.get(c, {}).get('buy', 0) for c in categories], dtype=np.float64)
+    sell = np.array([prices.get(c, {}).get('sell', 0) for c in categories], dtype=np.float64)
+    return buy, sell
+
+def reprice(weights, buy, sell):
+    """Cost, revenue and profit of every scenario.
+
+    `buy` and `sell` are one price vector (same prices for all scenarios) or
+    matrices shaped like `weights` (each scenario's own prices).
+    """
+    if np.ndim(sell) == 1:
+        revenue, cost = weights @ sell, weights @ buy
+    else:
+        revenue, cost = np.einsum('ij,ij->i', weights, sell), np.einsum('ij,ij->i', weights, buy)
+    profit = revenue - cost
+    margin = np.divide(profit, revenue, out=np.zeros_like(profit), where=revenue > 0)
+    return pd.DataFrame({'Modal': cost, 'Pendapatan': revenue, 'Profit': profit, 'Margin': margin})
+
+def profit_history(weights, categories, history=None):
+    """Profit of every scenario under every price list of the history: (scenarios x snapshots)."""
+    history = price_service.price_history() if history is None else history
+    stamps = [stamp for stamp, _ in history]
+    vectors = [price_vectors(prices, categories) for _, prices in history]
+    buy = np.array([b for b, _ in vectors]).reshape(len(history), len(categories))
+    sell = np.array([s for _, s in vectors]).reshape(len(history), len(categories))
+    return pd.DataFrame(weights @ (sell - buy).T, columns=pd.DatetimeIndex(stamps))
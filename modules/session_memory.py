@@ -0,0 +1,106 @@
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+# Per-session memory accounting for st.session_state.
+# After every rerun the router calls track(): it measures the bytes held by
+# each key of the current session and records the session in a process-wide
+# registry for the admin view. Nothing is evicted: pages keep only small
+# simulator frames in session state (transactions are re-read per rerun), and
+# no key could be dropped without losing what the user typed. The registry
+# holds plain numbers, never a session's state; sessions the runtime has
+# dropped are forgotten.
+SESSION_BUDGET_BYTES = 64 * 1024 * 1024  # flagged in the admin view, not enforced
+
+_lock = threading.Lock()
+_sessions = {}  # session_id -> {"user", "bytes", "keys", "last_seen"}
+
+def sizeof(obj, _seen=None):
+    """Approximate bytes held by `obj`, including pandas/numpy buffers and containers."""
+    _seen = set() if _seen is None else _seen
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(sizeof(k, _seen) + sizeof(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(sizeof(item, _seen) for item in obj)
+    return size
+
+def usage(state):
+    """{key: bytes} of a session state mapping, largest first."""
+    sizes = {key: sizeof(value) for key, value in dict(state).items()}
+    return dict(sorted(sizes.items(), key=lambda kv: kv[1], reverse=True))
+
+def _alive(session_id):
+    """False once the runtime has dropped the session.
+
+    Liveness comes from the runtime's session manager; without a runtime
+    (bare mode, AppTest) entries live until reset().
+    """
+    from streamlit.runtime import Runtime
+    manager = getattr(Runtime.instance(), "_session_mgr", None) if Runtime.exists() else None
+    return manager is None or manager.get_session_info(session_id) is not None
+
+def _forget_dead():
+    with _lock:
+        session_ids = list(_sessions)
+    dead = [session_id for session_id in session_ids if not _alive(session_id)]
+    with _lock:
+        for session_id in dead:
+            _sessions.pop(session_id, None)
+
+def track():
+    """Measure and register the current session (call after a rerun); returns its bytes."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return 0
+    state = ctx.session_state
+    sizes = usage(state.filtered_state)
+    user = (state["user_info"] if "user_info" in state else None) or {}
+    total = sum(sizes.values())
+    with _lock:
+        _sessions[ctx.session_id] = {
+            "user": user.get("email") or user.get("name") or "-",
+            "bytes": total, "keys": sizes, "last_seen": time.monotonic(),
+        }
+    _forget_dead()
+    return total
+
+def top_sessions(limit=20):
+    """Server-wide view: sessions holding the most session-state memory."""
+    _forget_dead()
+    now = time.monotonic()
+    with _lock:
+        rows = [
+            {"Sesi": session_id[:8], "Pengguna": e["user"], "Memori (MB)": e["bytes"] / 1024 / 1024,
+             "Key Terbesar": next(iter(e["keys"]), "-"), "Jumlah Key": len(e["keys"]),
+             "Idle (menit)": (now - e["last_seen"]) / 60, "Di Atas Batas": e["bytes"] > SESSION_BUDGET_BYTES}
+            for session_id, e in _sessions.items()
+        ]
+    columns = ["Sesi", "Pengguna", "Memori (MB)", "Key Terbesar", "Jumlah Key", "Idle (menit)", "Di Atas Batas"]
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    return pd.DataFrame(rows, columns=columns).sort_values("Memori (MB)", ascending=False, ignore_index=True).head(limit)
+
+def session_keys(session_id_prefix):
+    """{key: bytes} recorded for the session whose id starts with `session_id_prefix`."""
+    with _lock:
+        for session_id, e in _sessions.items():
+            if session_id.startswith(session_id_prefix):
+                return dict(e["keys"])
+    return {}
+
+def reset():
+    with _lock:
+        _sessions.clear()
@@ -0,0 +1,64 @@
+import hashlib
+import os
+import re
+import streamlit as st
+
+# Local static assets under ./static, served by Streamlit at /app/static
+# (server.enableStaticServing in .streamlit/config.toml), so field laptops
+# never wait on a remote image host. The stylesheet is read and minified once
+# per process. It is still sent on every rerun as one small element, because
+# Streamlit drops elements that a rerun does not emit again. Image URLs carry a
+# content hash, so a changed file gets a new URL and old copies are never reused.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(ROOT, "static")
+STATIC_URL = "app/static"
+STYLESHEET = "app.css"
+LOGO = "recycle.svg"
+# First existing file wins; the bundled SVG poster is the fallback
+GUIDE_IMAGES = ("static/guide_ref.webp", "static/guide_ref.jpg", "assets/guide_ref.jpg", "static/guide_ref.svg")
+
+_css = None
+_versions = {}
+
+def path(name):
+    return os.path.join(STATIC_DIR, name)
+
+def minify_css(text):
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    text = re.sub(r"\s+", " ", text)
+    return re.sub(r"\s*([{};:,>])\s*", r"\1", text).replace(";}", "}").strip()
+
+def stylesheet():
+    """The app stylesheet as a ready-to-inject <style> tag (read once per process)."""
+    global _css
+    if _css is None:
+        with open(path(STYLESHEET), encoding="utf-8") as f:
+            _css = f"<style>{minify_css(f.read())}</style>"
+    return _css
+
+def inject_css():
+    st.markdown(stylesheet(), unsafe_allow_html=True)
+
+def url(name):
+    """Versioned /app/static URL of `name`."""
+    version = _versions.get(name)
+    if version is None:
+        with open(path(name), "rb") as f:
+            version = _versions[name] = hashlib.sha1(f.read()).hexdigest()[:10]
+    return f"{STATIC_URL}/{name}?v={version}"
+
+def logo(width=80):
+    """Recycle logo: a cached static URL when static serving is on, else the local file."""
+    if st.get_option("server.enableStaticServing"):
+        st.markdown(f'<img class="app-logo" src="{url(LOGO)}" width="{width}" alt="AgriSensa">',
+                    unsafe_allow_html=True)
+    else:
+        st.image(path(LOGO), width=width)
+
+def guide_image():
+    """Path of the 5R guide poster."""
+    for candidate in GUIDE_IMAGES:
+        full = os.path.join(ROOT, candidate)
+        if os.path.exists(full):
+            return full
+    return None
@@ -1,8 +1,21 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from modules import chart_cache, scenario_compare
 from modules.price_service import load_prices
 
+def value_treemap(value_df):
+    fig = px.treemap(
+        value_df,
+        path=['Kategori'],
+        values='Estimasi (Rp)',
+        color='Estimasi (Rp)',
+        color_continuous_scale='Greens',
+        title="Peta Dominasi Nilai (Treemap)"
+    )
+    fig.update_layout(margin=dict(t=30, l=10, r=10, b=10), height=300)
+    return fig
+
 def show():
     st.title("🎯 Simulasi & Prediksi Nilai (Live)")
     st.markdown("Simulasikan potensi pendapatan dengan mengubah **Volume Sampah** atau **Harga Pasar** secara real-time.")
@@ -76,15 +89,7 @@ def show():
 
         if total_omzet > 0:
             # 1. Treemap (Better than Pie for many categories)
-            fig_tree = px.treemap(
-                edited_df[edited_df["Estimasi (Rp)"] > 0],
-                path=['Kategori'],
-                values='Estimasi (Rp)',
-                color='Estimasi (Rp)',
-                color_continuous_scale='Greens',
-                title="Peta Dominasi Nilai (Treemap)"
-            )
-            fig_tree.update_layout(margin=dict(t=30, l=10, r=10, b=10), height=300)
+            fig_tree = chart_cache.figure(value_treemap, edited_df.loc[edited_df["Estimasi (Rp)"] > 0, ['Kategori', 'Estimasi (Rp)']])
             st.plotly_chart(fig_tree, use_container_width=True)
 
             # 2. Bar Chart for Price Sensitivity
@@ -123,3 +128,16 @@ def show():
                 mime='text/csv',
                 type="primary"
             )
+
+    base_prices = load_prices()
+    scenario_compare.save_form(
+        dict(zip(edited_df["Kategori"], edited_df["Berat (kg)"])),
+        {cat: base_prices.get(cat, {}).get('buy', 0) for cat in edited_df["Kategori"]},
+        dict(zip(edited_df["Kategori"], edited_df["Harga (Rp/kg)"])),
+        "transformation", key="transformation_scenario",
+    )
+
+    # 4. Saved scenarios
+    st.markdown("---")
+    st.subheader("📚 Skenario Tersimpan & Perbandingan")
+    scenario_compare.show_comparison()
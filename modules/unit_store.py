@@ -0,0 +1,319 @@
+import os
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from modules import metrics
+
+# Each collection unit (lokasi) writes to its own SQLite file, so units never
+# contend for the same write lock. Cross-unit reads fan out over a thread pool
+# (sqlite3 releases the GIL while a query runs) and merge the partial results.
+PARTITION_DIR = "data/units"
+UNITS = ["Unit Pusat", "Unit Satelit 1", "Unit Satelit 2"]
+DEFAULT_UNIT = UNITS[0]
+CHANGE_LOG_ROWS = 10000  # updated/deleted ids kept for mirrors (see CHANGES_DDL)
+
+_executor = None
+
+TRANSACTIONS_DDL = '''
+    CREATE TABLE IF NOT EXISTS transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TIMESTAMP,
+        tanggal DATE,
+        nasabah TEXT,
+        petugas TEXT,
+        lokasi TEXT,
+
+        -- Waste Categories (Weights)
+        burnable REAL, paper REAL, cloth REAL, cans REAL,
+        electronics REAL, pet_bottles REAL, plastic_marks REAL,
+        white_trays REAL, glass_bottles REAL, metal_small REAL, hazardous REAL,
+
+        -- Financials
+        total_kg REAL,
+        total_paid INTEGER,
+        total_revenue INTEGER,
+        profit INTEGER,
+
+        nasabah_id INTEGER REFERENCES nasabah(id)
+    )
+'''
+
+# Customer master: one row per customer of the unit, holding the running
+# savings balance so a lookup never scans transactions.
+NASABAH_DDL = '''
+    CREATE TABLE IF NOT EXISTS nasabah (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nama TEXT NOT NULL,
+        nama_key TEXT UNIQUE NOT NULL,
+        rt_rw TEXT,
+        saldo INTEGER NOT NULL DEFAULT 0,
+        total_kg REAL NOT NULL DEFAULT 0,
+        jumlah_transaksi INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP,
+        last_transaction_at TIMESTAMP
+    )
+'''
+
+# Trigram full-text index over customer names and RT/RW tags for the
+# autocomplete at the weighing counter, kept in sync by triggers.
+NASABAH_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS nasabah_fts USING fts5("
+    "nama, rt_rw, content='nasabah', content_rowid='id', tokenize='trigram')",
+    # Per-trigram document counts, used to skip trigrams too common to discriminate
+    "CREATE VIRTUAL TABLE IF NOT EXISTS nasabah_fts_vocab USING fts5vocab(nasabah_fts, 'row')",
+    "CREATE TRIGGER IF NOT EXISTS nasabah_fts_ai AFTER INSERT ON nasabah BEGIN "
+    "INSERT INTO nasabah_fts (rowid, nama, rt_rw) VALUES (new.id, new.nama, new.rt_rw); END",
+    "CREATE TRIGGER IF NOT EXISTS nasabah_fts_ad AFTER DELETE ON nasabah BEGIN "
+    "INSERT INTO nasabah_fts (nasabah_fts, rowid, nama, rt_rw) VALUES ('delete', old.id, old.nama, old.rt_rw); END",
+    "CREATE TRIGGER IF NOT EXISTS nasabah_fts_au AFTER UPDATE OF nama, rt_rw ON nasabah BEGIN "
+    "INSERT INTO nasabah_fts (nasabah_fts, rowid, nama, rt_rw) VALUES ('delete', old.id, old.nama, old.rt_rw); "
+    "INSERT INTO nasabah_fts (rowid, nama, rt_rw) VALUES (new.id, new.nama, new.rt_rw); END",
+]
+RT_RW_PATTERN = re.compile(r"\b(RT|RW)\s*[.:]?\s*(\d{1,3})\b", re.IGNORECASE)
+
+# Append-only savings ledger; amount is positive for deposits ('setor') and
+# negative for withdrawals ('tarik').
+LEDGER_DDL = '''
+    CREATE TABLE IF NOT EXISTS nasabah_ledger (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nasabah_id INTEGER NOT NULL REFERENCES nasabah(id),
+        transaction_id INTEGER,
+        timestamp TIMESTAMP,
+        jenis TEXT NOT NULL,
+        amount INTEGER NOT NULL,
+        saldo_after INTEGER NOT NULL
+    )
+'''
+
+# Materialized per-officer, per-day totals (maintained by rollup_service)
+ROLLUP_DDL = '''
+    CREATE TABLE IF NOT EXISTS daily_rollup (
+        tanggal DATE NOT NULL,
+        petugas TEXT NOT NULL,
+        transaksi INTEGER NOT NULL,
+        berat_kg REAL NOT NULL,
+        dibayar INTEGER NOT NULL,
+        pendapatan INTEGER NOT NULL,
+        profit INTEGER NOT NULL,
+
+        -- Weight per waste category
+        burnable REAL NOT NULL DEFAULT 0, paper REAL NOT NULL DEFAULT 0, cloth REAL NOT NULL DEFAULT 0,
+        cans REAL NOT NULL DEFAULT 0, electronics REAL NOT NULL DEFAULT 0, pet_bottles REAL NOT NULL DEFAULT 0,
+        plastic_marks REAL NOT NULL DEFAULT 0, white_trays REAL NOT NULL DEFAULT 0,
+        glass_bottles REAL NOT NULL DEFAULT 0, metal_small REAL NOT NULL DEFAULT 0,
+        hazardous REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (tanggal, petugas)
+    ) WITHOUT ROWID
+'''
+
+CHANGES_DDL = '''
+    CREATE TABLE IF NOT EXISTS transaction_changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        id INTEGER NOT NULL
+    )
+'''
+
+def unit_slug(lokasi):
+    """File-system friendly name for a unit, e.g. 'Unit Satelit 1' -> 'unit_satelit_1'."""
+    return re.sub(r"[^a-z0-9]+", "_", lokasi.lower()).strip("_")
+
+def partition_path(lokasi):
+    return os.path.join(PARTITION_DIR, f"{unit_slug(lokasi)}.db")
+
+def get_unit_connection(lokasi):
+    """Open a connection to the partition of one unit (created on first use)."""
+    path = partition_path(lokasi)
+    is_new = not os.path.exists(path)
+    if is_new:
+        os.makedirs(PARTITION_DIR, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=30, factory=metrics.TimedConnection)
+    if is_new:
+        # Archiving deletes many rows; let check_db.py release the pages incrementally
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        _init_schema(conn, lokasi)
+    return conn
+
+def _init_schema(conn, lokasi):
+    c = conn.cursor()
+    # WAL lets dashboards read while the counter is writing
+    c.execute("PRAGMA journal_mode=WAL")
+    c.execute(TRANSACTIONS_DDL)
+    c.execute(NASABAH_DDL)
+    c.execute(LEDGER_DDL)
+    c.execute(ROLLUP_DDL)
+    columns = {row[1] for row in c.execute("PRAGMA table_info(transactions)")}
+    if 'nasabah_id' not in columns:
+        c.execute("ALTER TABLE transactions ADD COLUMN nasabah_id INTEGER REFERENCES nasabah(id)")
+    if 'rt_rw' not in {row[1] for row in c.execute("PRAGMA table_info(nasabah)")}:
+        c.execute("ALTER TABLE nasabah ADD COLUMN rt_rw TEXT")
+    _init_search_index(c)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_transactions_petugas ON transactions (petugas)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_transactions_tanggal ON transactions (tanggal)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_transactions_nasabah ON transactions (nasabah_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_ledger_nasabah ON nasabah_ledger (nasabah_id, id)")
+    # Remember the display name so partitions added later can be discovered
+    c.execute("CREATE TABLE IF NOT EXISTS unit_meta (key TEXT PRIMARY KEY, value TEXT)")
+    c.execute("INSERT OR IGNORE INTO unit_meta (key, value) VALUES ('lokasi', ?)", (lokasi,))
+    # Ids of updated/deleted transactions, so mirrors (the DuckDB analytics
+    # copy) re-copy just those rows besides the appended ids. Only the last
+    # CHANGE_LOG_ROWS entries are kept; a mirror that fell further behind reloads.
+    c.execute(CHANGES_DDL)
+    c.execute("DROP TRIGGER IF EXISTS transactions_version_update")
+    c.execute("DROP TRIGGER IF EXISTS transactions_version_delete")
+    c.execute("DELETE FROM unit_meta WHERE key = 'version'")
+    c.execute("CREATE TRIGGER IF NOT EXISTS transactions_changes_update AFTER UPDATE ON transactions BEGIN "
+              "INSERT INTO transaction_changes (id) VALUES (OLD.id); "
+              "INSERT INTO transaction_changes (id) SELECT NEW.id WHERE NEW.id != OLD.id; END")
+    c.execute("CREATE TRIGGER IF NOT EXISTS transactions_changes_delete AFTER DELETE ON transactions BEGIN "
+              "INSERT INTO transaction_changes (id) VALUES (OLD.id); END")
+    c.execute("CREATE TRIGGER IF NOT EXISTS transaction_changes_trim AFTER INSERT ON transaction_changes BEGIN "
+              f"DELETE FROM transaction_changes WHERE seq <= NEW.seq - {CHANGE_LOG_ROWS}; END")
+    conn.commit()
+    backfill_nasabah(conn)
+
+def _init_search_index(c):
+    if c.execute("SELECT 1 FROM sqlite_master WHERE name = 'nasabah_fts'").fetchone():
+        return
+    # Tag existing customers before the sync triggers exist; the index is
+    # then built once from the table
+    for nasabah_id, nama in c.execute("SELECT id, nama FROM nasabah WHERE rt_rw IS NULL").fetchall():
+        c.execute("UPDATE nasabah SET rt_rw = ? WHERE id = ?", (rt_rw_tags(nama), nasabah_id))
+    try:
+        for ddl in NASABAH_FTS_DDL:
+            c.execute(ddl)
+    except sqlite3.OperationalError:
+        # SQLite without FTS5/trigram (< 3.34): search falls back to LIKE
+        return
+    c.execute("INSERT INTO nasabah_fts (nasabah_fts) VALUES ('rebuild')")
+
+def rt_rw_tags(nama):
+    """Normalized RT/RW tags found in a name, e.g. 'Bu Siti / rt.5 rw 02' -> 'RT 05 RW 02'."""
+    return " ".join(f"{kind.upper()} {int(num):02d}" for kind, num in RT_RW_PATTERN.findall(str(nama))) or None
+
+def nasabah_key(nama):
+    """Normalized customer name used for matching, e.g. '  bu  Siti ' -> 'bu siti'."""
+    return " ".join(str(nama).split()).casefold()
+
+def upsert_nasabah(cursor, nama, timestamp=None):
+    """Return the id of the customer called `nama`, creating the row if needed.
+
+    Runs on the caller's cursor so it joins the caller's SQL transaction.
+    """
+    key = nasabah_key(nama)
+    cursor.execute("INSERT OR IGNORE INTO nasabah (nama, nama_key, rt_rw, created_at) VALUES (?, ?, ?, ?)",
+                   (" ".join(str(nama).split()), key, rt_rw_tags(nama), timestamp))
+    return cursor.execute("SELECT id FROM nasabah WHERE nama_key = ?", (key,)).fetchone()[0]
+
+def post_ledger(cursor, nasabah_id, jenis, amount, kg=0.0, transaction_id=None, timestamp=None):
+    """Apply one deposit/withdrawal to the running balance and append it to the ledger.
+
+    Runs on the caller's cursor so balance, ledger and transaction row commit together.
+    """
+    saldo = cursor.execute(
+        "UPDATE nasabah SET saldo = saldo + ?, total_kg = total_kg + ?, "
+        "jumlah_transaksi = jumlah_transaksi + ?, last_transaction_at = ? WHERE id = ? RETURNING saldo",
+        (amount, kg, 1 if jenis == 'setor' else 0, timestamp, nasabah_id)
+    ).fetchone()[0]
+    cursor.execute(
+        "INSERT INTO nasabah_ledger (nasabah_id, transaction_id, timestamp, jenis, amount, saldo_after) "
+        "VALUES (?, ?, ?, ?, ?, ?)", (nasabah_id, transaction_id, timestamp, jenis, amount, saldo)
+    )
+    return saldo
+
+def backfill_nasabah(conn):
+    """Link transactions that have no nasabah_id yet and post them to the ledger."""
+    rows = conn.execute(
+        "SELECT id, nasabah, timestamp, total_paid, total_kg FROM transactions "
+        "WHERE nasabah_id IS NULL AND TRIM(COALESCE(nasabah, '')) != '' ORDER BY id"
+    ).fetchall()
+    if not rows:
+        return 0
+    with conn:
+        c = conn.cursor()
+        for tx_id, nama, timestamp, paid, kg in rows:
+            nasabah_id = upsert_nasabah(c, nama, timestamp)
+            c.execute("UPDATE transactions SET nasabah_id = ? WHERE id = ?", (nasabah_id, tx_id))
+            post_ledger(c, nasabah_id, 'setor', int(paid or 0), kg or 0.0, tx_id, timestamp)
+    return len(rows)
+
+def init_partitions():
+    """Create missing partitions and bring existing ones up to the current schema."""
+    for lokasi in list_units():
+        conn = get_unit_connection(lokasi)
+        _init_schema(conn, lokasi)
+        conn.close()
+
+def list_units():
+    """Configured units plus any unit that already has a partition on disk."""
+    units = list(UNITS)
+    if os.path.isdir(PARTITION_DIR):
+        known = {unit_slug(u) for u in units}
+        for fname in sorted(os.listdir(PARTITION_DIR)):
+            if not fname.endswith(".db") or fname[:-3] in known:
+                continue
+            conn = sqlite3.connect(os.path.join(PARTITION_DIR, fname))
+            try:
+                row = conn.execute("SELECT value FROM unit_meta WHERE key = 'lokasi'").fetchone()
+            except sqlite3.DatabaseError:
+                row = None
+            finally:
+                conn.close()
+            if row:
+                units.append(row[0])
+    return units
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) + 4), thread_name_prefix="unit-store")
+    return _executor
+
+def fan_out(func, units=None, read_only=False):
+    """Run `func(conn, lokasi)` on every partition in parallel; returns the results in unit order.
+
+    With `read_only`, connections come from the read replicas when they are current enough.
+    """
+    units = list_units() if units is None else units
+    if read_only:
+        from modules import replica  # replica builds on this module
+        connect = replica.read_connection
+    else:
+        connect = get_unit_connection
+
+    def run(lokasi):
+        conn = connect(lokasi)
+        try:
+            return func(conn, lokasi)
+        finally:
+            conn.close()
+
+    if len(units) <= 1:
+        return [run(lokasi) for lokasi in units]
+    return list(_get_executor().map(run, units))
+
+def read_frames(query, params=(), units=None):
+    """Run the same SELECT on every partition (or its read replica) and concatenate the rows."""
+    results = fan_out(lambda conn, _: pd.read_sql_query(query, conn, params=params), units, read_only=True)
+    frames = [f for f in results if not f.empty]
+    if not frames:
+        # Keep the column layout even when every partition is empty
+        return results[0] if results else pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+def aggregate(query, params=(), group_by=None, units=None):
+    """Fan out an aggregate query and merge the partials by summation.
+
+    Only additive aggregates (SUM, COUNT) merge correctly this way; averages
+    must be derived from merged sums and counts.
+    """
+    df = read_frames(query, params, units)
+    if group_by is None:
+        if df.empty:
+            return pd.Series(0, index=df.columns)
+        return df.sum(numeric_only=True)
+    if df.empty:
+        return df
+    return df.groupby(group_by, as_index=False).sum(numeric_only=True)
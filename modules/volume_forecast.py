@@ -0,0 +1,183 @@
+import datetime
+import hashlib
+import json
+import threading
+import numpy as np
+import pandas as pd
+from modules import rollup_service, unit_store
+
+# Daily volume and revenue forecasts with additive Holt-Winters (damped
+# trend, weekly seasonality) in error-correction form:
+#   e_t = y_t - (l + phi*b + s_t-m);  l += phi*b + alpha*e;  b = phi*b + beta*e;  s_t = s_t-m + gamma*e
+# Every series (each waste category, the total weight and the revenue at the
+# current sell prices) and every candidate parameter set run through the
+# recursion together as (parameter sets x series) arrays, one day per step.
+# The daily series come from the per-officer rollups, never from the raw
+# transactions. Fitted states are cached per data version: when new days
+# arrive only those days are run through the recursion with the chosen
+# parameters, which are re-selected every REFIT_DAYS new days or when past
+# days changed (e.g. a backdated deposit).
+SEASON = 7
+DAMPING = 0.98
+MIN_DAYS = 3 * SEASON
+REFIT_DAYS = 28
+HORIZONS = (30, 90)
+INTERVAL_LEVEL = 0.90
+INTERVAL_Z = 1.645  # normal quantile of INTERVAL_LEVEL (two-sided)
+ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.5)
+BETAS = (0.0, 0.005, 0.02)
+GAMMAS = (0.01, 0.05, 0.1, 0.2)
+TOTAL = "Total"
+REVENUE = "Pendapatan"
+
+_lock = threading.Lock()
+_fits = {}  # scope -> fitted state of the last data version seen
+
+def param_grid():
+    """Candidate (alpha, beta, gamma) arrays, restricted to the stable region."""
+    grid = [(a, b, g) for a in ALPHAS for b in BETAS for g in GAMMAS if b <= a and g <= 1 - a]
+    return tuple(np.array(column) for column in zip(*grid))
+
+def _initial_state(y):
+    """Level, trend and weekly seasonal indices from the first two weeks of `y` (days x series)."""
+    first, second = y[:SEASON].mean(axis=0), y[SEASON:2 * SEASON].mean(axis=0)
+    return first, (second - first) / SEASON, y[:SEASON] - first
+
+def _recurse(y, t0, alpha, beta, gamma, level, trend, season):
+    """Run the smoothing recursion over `y` starting at day index `t0`.
+
+    Parameters broadcast against the state arrays (shape (sets, series));
+    returns the final states and the sum of squared one-step errors.
+    """
+    level, trend, season = level.copy(), trend.copy(), season.copy()
+    sse = np.zeros(np.broadcast_shapes(level.shape, np.shape(alpha)))
+    for i, row in enumerate(y):
+        k = (t0 + i) % SEASON
+        damped = DAMPING * trend
+        error = row - (level + damped + season[k])
+        level = level + damped + alpha * error
+        trend = damped + beta * error
+        season[k] = season[k] + gamma * error
+        sse += error * error
+    return level, trend, season, sse
+
+def fit(y):
+    """Select parameters per series on the whole history and return the fitted state."""
+    alpha, beta, gamma = (p[:, None] for p in param_grid())
+    level, trend, season = _initial_state(y)
+    sets = len(alpha)
+    grid_state = (np.repeat(level[None], sets, 0), np.repeat(trend[None], sets, 0),
+                  np.repeat(season[:, None], sets, 1))
+    level, trend, season, sse = _recurse(y, 0, alpha, beta, gamma, *grid_state)
+    best = sse.argmin(axis=0)
+    cols = np.arange(y.shape[1])
+    return {
+        'alpha': alpha[best, 0], 'beta': beta[best, 0], 'gamma': gamma[best, 0],
+        'level': level[best, cols], 'trend': trend[best, cols], 'season': season[:, best, cols],
+        'sse': sse[best, cols], 'days': len(y), 'fitted_days': len(y),
+    }
+
+def extend(state, y_new):
+    """Continue a fitted state over newly arrived days with its chosen parameters."""
+    level, trend, season, sse = _recurse(y_new, state['days'], state['alpha'], state['beta'], state['gamma'],
+                                         state['level'], state['trend'], state['season'])
+    return {**state, 'level': level, 'trend': trend, 'season': season,
+            'sse': state['sse'] + sse, 'days': state['days'] + len(y_new)}
+
+def forecast(state, horizon):
+    """Mean, standard deviation per day, and the standard deviation of the horizon total.
+
+    Uses the ETS(A,Ad,A) forecast variance: sigma^2 * (1 + sum c_j^2) with
+    c_j = alpha + beta*phi*(1-phi^j)/(1-phi) + gamma*[j multiple of the season].
+    """
+    h = np.arange(1, horizon + 1)[:, None]
+    damp_sum = DAMPING * (1 - DAMPING ** h) / (1 - DAMPING)
+    k = (state['days'] - 1 + h[:, 0]) % SEASON
+    mean = state['level'] + damp_sum * state['trend'] + state['season'][k]
+    sigma2 = state['sse'] / max(state['days'], 1)
+    c = state['alpha'] + state['beta'] * damp_sum + state['gamma'] * (h % SEASON == 0)
+    # Day h carries the errors of days 1..h-1 through c_1..c_h-1
+    c_prev = np.vstack([np.zeros_like(c[:1]), c[:-1]])
+    day_sd = np.sqrt(sigma2 * (1 + np.cumsum(c_prev ** 2, axis=0)))
+    # The error of day t reaches every later day of the horizon: (1 + c_1 + ... + c_H-t)
+    reach = 1 + np.vstack([np.zeros_like(c[:1]), np.cumsum(c, axis=0)[:-1]])
+    total_sd = np.sqrt(sigma2 * (reach ** 2).sum(axis=0))
+    return mean, day_sd, total_sd
+
+def daily_series(units=None, prices=None):
+    """Daily weight per category, total weight and revenue at `prices`, from the rollups.
+
+    Days without deposits are zeros; the current (incomplete) day is left out.
+    """
+    from modules import auth_db
+    categories = list(auth_db.CATEGORY_COLUMNS.values())
+    df = rollup_service.load(units=units)
+    yesterday = pd.Timestamp(datetime.date.today() - datetime.timedelta(days=1))
+    df = df[df['Tanggal'] <= yesterday]
+    if df.empty:
+        return pd.DataFrame(columns=[*categories, TOTAL, REVENUE])
+    daily = df.groupby('Tanggal')[categories].sum().astype('float64')
+    daily = daily.reindex(pd.date_range(daily.index.min(), yesterday, freq='D'), fill_value=0.0)
+    daily[TOTAL] = daily[categories].sum(axis=1)
+    sell = pd.Series({c: float((prices or {}).get(c, {}).get('sell', 0)) for c in categories})
+    daily[REVENUE] = daily[categories].to_numpy() @ sell.to_numpy()
+    daily.index.name = 'Tanggal'
+    return daily
+
+def _prices_key(prices):
+    return hashlib.blake2b(json.dumps(prices or {}, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+def get_fit(units=None, prices=None):
+    """Fitted state for the current data, reusing or extending the cached fit; None with too little history.
+
+    The cache key is the rollup watermark of every unit plus the prices, so
+    an unchanged database costs one rollup refresh check and no model work.
+    """
+    units = unit_store.list_units() if units is None else list(units)
+    rollup_service.refresh(units)
+    scope = (tuple(units), _prices_key(prices))
+    data_version = (rollup_service.version(units), datetime.date.today())
+    with _lock:
+        cached = _fits.get(scope)
+    if cached is not None and cached['version'] == data_version:
+        return cached
+
+    daily = daily_series(units, prices)
+    if len(daily) < MIN_DAYS:
+        return None
+    y = daily.to_numpy()
+    state = None
+    if cached is not None and cached['start'] == daily.index[0] and cached['days'] <= len(y):
+        seen = cached['history']
+        unchanged = np.allclose(y[:len(seen)], seen, rtol=1e-9, atol=1e-9)
+        if unchanged and len(y) - cached['fitted_days'] < REFIT_DAYS:
+            # Only the new days go through the recursion
+            state = extend(cached, y[len(seen):]) if len(y) > len(seen) else dict(cached)
+    if state is None:
+        state = fit(y)
+    state.update(version=data_version, start=daily.index[0], history=y, columns=list(daily.columns))
+    with _lock:
+        _fits[scope] = state
+    return state
+
+def forecast_frame(state, horizon):
+    """Long table (Tanggal, Seri, Prediksi, Bawah, Atas) for `horizon` days after the fitted history."""
+    mean, day_sd, _ = forecast(state, horizon)
+    dates = pd.date_range(state['start'] + pd.Timedelta(days=state['days']), periods=horizon, freq='D')
+    frames = []
+    for i, name in enumerate(state['columns']):
+        frames.append(pd.DataFrame({
+            'Tanggal': dates, 'Seri': name, 'Prediksi': np.clip(mean[:, i], 0, None),
+            'Bawah': np.clip(mean[:, i] - INTERVAL_Z * day_sd[:, i], 0, None),
+            'Atas': mean[:, i] + INTERVAL_Z * day_sd[:, i],
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+def horizon_totals(state, horizon):
+    """Forecast total over the horizon per series with its prediction interval."""
+    mean, _, total_sd = forecast(state, horizon)
+    total = np.clip(mean, 0, None).sum(axis=0)
+    return pd.DataFrame({
+        'Seri': state['columns'], 'Prediksi': total,
+        'Bawah': np.clip(total - INTERVAL_Z * total_sd, 0, None), 'Atas': total + INTERVAL_Z * total_sd,
+    })
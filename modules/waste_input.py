@@ -4,6 +4,7 @@ import pandas as pd
 import os
 import base64
 
+from modules import auth_db, unit_store
 from modules.price_service import load_prices
 
 def show():
@@ -22,14 +23,44 @@ def show():
         c_date, c_cust, c_staff, c_loc = st.columns([1, 2, 2, 2])
         with c_date:
             tanggal_setor = st.date_input("📅 Tanggal", datetime.date.today())
+        with c_loc:
+            # Chosen first: customer search is per unit
+            lokasi = st.selectbox("📍 Lokasi", unit_store.list_units())
         with c_cust:
-            nasabah = st.text_input("👤 Nama Nasabah", placeholder="Contoh: Bu Siti / RT 05")
+            nasabah = st.text_input("👤 Nama Nasabah", placeholder="Ketik nama atau RT, contoh: Bu Siti / RT 05")
+            if nasabah:
+                # Autocomplete against registered customers so typos don't split one customer
+                matches = auth_db.search_nasabah(lokasi, nasabah)
+                options = [m['nama'] for m in matches]
+                if unit_store.nasabah_key(nasabah) not in {unit_store.nasabah_key(o) for o in options}:
+                    options.append(nasabah)
+                known = {m['nama']: m for m in matches}
+                nasabah = st.selectbox(
+                    "Pilih Nasabah", options, label_visibility="collapsed",
+                    format_func=lambda o: f"👤 {o} · Rp {known[o]['saldo']:,.0f}" if o in known else f"➕ Daftarkan baru: {o}"
+                )
         with c_staff:
             # Auto-fill Officer Name (Locked)
             current_officer = st.session_state.get('user_info', {}).get('name', 'Petugas')
             petugas = st.text_input("👮 Petugas", value=current_officer, disabled=True)
-        with c_loc:
-            lokasi = st.selectbox("📍 Lokasi", ["Unit Pusat", "Unit Satelit 1", "Unit Satelit 2"])
+
+        # Savings balance straight from the customer master (no transaction scan)
+        if nasabah:
+            info = auth_db.get_nasabah(lokasi, nasabah)
+            if info:
+                st.info(f"💰 Saldo **{info['nama']}** ({lokasi}): **Rp {info['saldo']:,.0f}** · "
+                        f"{info['jumlah_transaksi']} setoran · {info['total_kg']:,.1f} kg")
+                with st.expander("📒 Riwayat Tabungan"):
+                    st.dataframe(
+                        auth_db.get_nasabah_ledger(lokasi, info['id']),
+                        use_container_width=True, hide_index=True,
+                        column_config={
+                            "Jumlah": st.column_config.NumberColumn(format="Rp %d"),
+                            "Saldo": st.column_config.NumberColumn(format="Rp %d"),
+                        }
+                    )
+            else:
+                st.caption("🆕 Nasabah baru — akan didaftarkan otomatis saat transaksi disimpan.")
 
     st.markdown("---")
 
@@ -134,26 +165,17 @@ def show():
         }
         
         # --- 2. Data Persistence (SQLite) ---
-        from modules import auth_db
+        saldo = None
         if auth_db.save_transaction(new_data):
-            pass # Creating successful
+            info = auth_db.get_nasabah(lokasi, nasabah)
+            saldo = info['saldo'] if info else None
         else:
              st.error("Gagal menyimpan data ke database.")
 
         # --- 3. Visual Feedback (Financial Dashboard) ---
         st.success("Transaksi Berhasil Disimpan!")
         
-        # Styled Metrics using HTML/CSS
-        st.markdown("""
-        <style>
-            .metric-box {
-                padding: 15px; border-radius: 10px; text-align: center; color: white;
-                box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            }
-            .metric-val { font-size: 24px; font-weight: bold; margin: 5px 0; }
-            .metric-lbl { font-size: 14px; opacity: 0.9; }
-        </style>
-        """, unsafe_allow_html=True)
+        # Styled Metrics using HTML/CSS (.metric-box in static/app.css)
 
         m1, m2, m3 = st.columns(3)
         with m1:
@@ -216,6 +238,7 @@ def show():
                 <b>TOTAL BAYAR</b>
                 <b>Rp {total_paid:,.0f}</b>
             </div>
+            {f'<div style="display:flex; justify-content:space-between"><span>SALDO TABUNGAN</span><span>Rp {saldo:,.0f}</span></div>' if saldo is not None else ''}
             <hr>
             <center>Terima Kasih - Salam Lestari 🌱</center>
         </body>
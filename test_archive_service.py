@@ -0,0 +1,128 @@
+import os
+import glob
+import sqlite3
+import datetime
+from modules import auth_db, unit_store, archive_service, analytics_engine, metrics, report_service
+from conftest import make_transaction, use_workdir
+
+def test_parquet_archive(workdir):
+    print("Testing Parquet Archive Tier...")
+
+    auth_db.init_db()
+
+    today = datetime.date.today()
+    old = today.replace(year=today.year - 2, day=1)
+    for lokasi, tanggal, kg in [("Unit Pusat", old, 2.0), ("Unit Pusat", old + datetime.timedelta(days=40), 3.0),
+                                ("Unit Satelit 1", old, 4.0), ("Unit Pusat", today, 1.0)]:
+        tx = make_transaction(lokasi, "Andi", kg, 0.0, int(kg * 140))
+        tx["Tanggal"] = tanggal
+        assert auth_db.save_transaction(tx)
+    before = auth_db.get_category_totals()
+
+    # 1. Old rows move into month partitions, recent rows stay hot
+    print("1. Archiving rows older than the horizon...")
+    moved = archive_service.archive_transactions(horizon_days=365)
+    assert moved["Unit Pusat"] == 2 and moved["Unit Satelit 1"] == 1
+    assert len(unit_store.read_frames("SELECT id FROM transactions")) == 1
+    parts = glob.glob(os.path.join(archive_service.ARCHIVE_DIR, "unit=*", "bulan=*", "*.parquet"))
+    assert len(parts) == 3
+
+    # The archive job deletes hot rows of every unit: admins only
+    auth_db.create_user("andi@x.com", "-", "Andi", "user")
+    auth_db.create_user("admin@x.com", "-", "Admin", "admin")
+    for requester in (None, "andi@x.com", "tidak@ada.com"):
+        try:
+            report_service.run_archive({'horizon_days': 365, 'requested_by': requester}, lambda *a: None)
+            raise AssertionError(f"archive job ran for {requester}")
+        except PermissionError:
+            pass
+    data, _, _ = report_service.run_archive({'horizon_days': 365, 'requested_by': "admin@x.com"}, lambda *a: None)
+    assert b"Unit Pusat,0" in data
+
+    # 2. Readers combine both tiers
+    print("2. Unified reads over hot + cold...")
+    assert len(auth_db.get_all_transactions()) == 4
+    after = auth_db.get_category_totals()
+    assert after['Jumlah_Transaksi'] == before['Jumlah_Transaksi'] == 4
+    assert abs(after['Burnable'] - before['Burnable']) < 1e-9
+    assert abs(auth_db.get_daily_totals()['Berat (kg)'].sum() - 10.0) < 1e-9
+
+    # 3. Pruning and projection
+    print("3. Month pruning and column projection...")
+    month = archive_service.read_archive(columns=['tanggal', 'total_kg'], start=old, end=old, units=["Unit Pusat"])
+    assert list(month.columns) == ['tanggal', 'total_kg']
+    assert month['total_kg'].tolist() == [2.0]
+
+    # 4. Interrupted run: a pending part whose rows are still hot is discarded
+    print("4. Recovering an interrupted archive run...")
+    tx = make_transaction("Unit Satelit 1", "Andi", 5.0, 0.0, 700)
+    tx["Tanggal"] = old
+    auth_db.save_transaction(tx)
+    conn = unit_store.get_unit_connection("Unit Satelit 1")
+    hot = archive_service.pd.read_sql_query("SELECT * FROM transactions", conn)
+    stale = os.path.join(archive_service._month_dir("Unit Satelit 1", old.isoformat()[:7]), "part-stale.parquet.pending")
+    archive_service.pq.write_table(archive_service._to_table(hot), stale)
+    archive_service._recover_pending(conn, "Unit Satelit 1")
+    assert not os.path.exists(stale)
+
+    # A month with more rows than SQLite's bound-variable limit (32766 in stock builds) still recovers
+    conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 32766)
+    huge = os.path.join(os.path.dirname(stale), "part-huge.parquet.pending")
+    ids = list(range(10**6, 10**6 + 40000)) + hot['id'].tolist()
+    archive_service.pq.write_table(archive_service.pa.table({'id': ids}), huge)
+    archive_service._recover_pending(conn, "Unit Satelit 1")
+    conn.close()
+    assert not os.path.exists(huge)
+
+    yoy = archive_service.yearly_comparison(years=3)
+    assert abs(yoy['Total_KG'].sum() - 15.0) < 1e-9
+
+    # 5. The optional DuckDB read path agrees with the SQLite fan-out
+    print("5. DuckDB analytics vs SQLite...")
+    os.environ[analytics_engine.ENV_VAR] = "sqlite"
+    sqlite_totals = auth_db.get_category_totals()
+    sqlite_daily = auth_db.get_daily_totals()
+    del os.environ[analytics_engine.ENV_VAR]
+    if analytics_engine.available():
+        served = analytics_engine.queries_served()
+        duck_totals = auth_db.get_category_totals()
+        assert analytics_engine.queries_served() > served, "DuckDB installed but the SQLite fallback answered"
+        assert ((duck_totals - sqlite_totals).abs() < 1e-9).all()
+        assert abs(auth_db.get_daily_totals()['Berat (kg)'].sum() - sqlite_daily['Berat (kg)'].sum()) < 1e-9
+        assert len(auth_db.get_all_transactions()) == 5
+
+        # In-place corrections reach the mirror as deltas, not only appended rows,
+        # through the sqlite scanner (when installed) and through Arrow batches
+        for scanner in (True, False):
+            analytics_engine.reset()
+            analytics_engine.USE_SQLITE_SCANNER = scanner
+            auth_db.get_category_totals()
+            reloads = metrics.summary("analytics_sync_seconds").set_index("mode")["count"].get("reload", 0)
+            conn = unit_store.get_unit_connection("Unit Pusat")
+            with conn:
+                conn.execute("UPDATE transactions SET burnable = burnable + 10")
+            duck_totals = auth_db.get_category_totals()
+            assert abs(duck_totals['Burnable'] - sqlite_totals['Burnable'] - 10) < 1e-9
+            syncs = metrics.summary("analytics_sync_seconds").set_index("mode")["count"]
+            assert syncs.get("reload", 0) == reloads, "an UPDATE is applied as a delta"
+
+            # More changes than the change log keeps: the unit is reloaded instead
+            with conn:
+                for _ in range(unit_store.CHANGE_LOG_ROWS + 1):
+                    conn.execute("UPDATE transactions SET burnable = burnable - 10 WHERE id = (SELECT MIN(id) FROM transactions)")
+                conn.execute("UPDATE transactions SET burnable = burnable + 10 * ? WHERE id = (SELECT MIN(id) FROM transactions)",
+                             (unit_store.CHANGE_LOG_ROWS + 1,))
+                conn.execute("UPDATE transactions SET burnable = burnable - 10")
+            conn.close()
+            assert ((auth_db.get_category_totals() - sqlite_totals).abs() < 1e-9).all()
+            syncs = metrics.summary("analytics_sync_seconds").set_index("mode")["count"]
+            assert syncs.get("reload", 0) == reloads + 1
+        analytics_engine.USE_SQLITE_SCANNER = True
+        analytics_engine.reset()
+    else:
+        assert analytics_engine.query("SELECT 1") is None
+
+    print("\nParquet Archive Verified! ✅")
+
+if __name__ == "__main__":
+    test_parquet_archive(use_workdir(setattr))
@@ -1,5 +1,6 @@
 from modules import auth_db, auth_service
 import os
+import time
 
 def test_auth_flow():
     print("Testing Authentication Logic...")
@@ -43,6 +44,30 @@ def test_auth_flow():
     login_fail = auth_service.login(test_email, "wrongpass")
     print(f"   Login Result: {login_fail}")
     assert login_fail == False, "Login should fail"
+
+    # 4. Signed session token restores the login without the password
+    print("4. Testing Session Token Restore...")
+    auth_service.login(test_email, test_pass)
+    token = st.query_params[auth_service.TOKEN_PARAM]
+    assert auth_service.verify_token(token)[0] == test_email
+    assert auth_service.verify_token(token[:-2] + "xx") is None
+    if not os.environ.get(auth_service.SECRET_ENV):
+        # The key is generated once and then reused: a restart keeps tokens valid
+        assert os.stat(auth_service.SECRET_FILE).st_mode & 0o077 == 0, "Signing key is private to the owner"
+        auth_service._secret = None
+        assert auth_service.verify_token(token)[0] == test_email
+    session_id = st.session_state['auth_session']
+    assert auth_service.verify_token(auth_service.issue_token(session_id, issued=0)) is None  # idle too long
+    capped = auth_db.create_auth_session(test_email, -1)
+    assert auth_service.verify_token(auth_service.issue_token(capped)) is None  # past the hard lifetime cap
+    st.session_state['logged_in'] = False
+    assert auth_service.restore_session()
+    assert st.session_state['user_info']['name'] == test_name
+    auth_service.logout()
+    assert auth_service.TOKEN_PARAM not in st.query_params
+    # Revocation lives in users.db: a fresh token for the session (or another process) is refused too
+    assert auth_service.verify_token(token) is None
+    assert auth_service.verify_token(auth_service.issue_token(session_id, issued=time.time() - 5)) is None
     
     print("\nAuthentication Backend Verified! ✅")
 
@@ -0,0 +1,63 @@
+import time
+from modules import extrusion_runner
+
+def test_extrusion_runner():
+    print("Testing Extrusion Runner...")
+
+    # 1. Invalid set points are rejected instead of looping forever
+    print("1. Validating set points...")
+    too_much = extrusion_runner.MAX_INPUT_KG + 1
+    for speed, qty in [(0, 1.0), (-5, 1.0), (25, 0.0), (50, too_much), (1, 10.0)]:
+        try:
+            extrusion_runner.ExtrusionRun(255, speed, qty)
+            assert False, f"speed={speed}, qty={qty} should be rejected"
+        except ValueError:
+            pass
+
+    # 2. A run in the foreground uses up the input and keeps OEE consistent
+    print("2. Running to completion...")
+    run = extrusion_runner.ExtrusionRun(255, 40, 0.5, seconds_per_sample=0, seed=7)
+    run.run()
+    snap = run.snapshot()
+    assert snap['status'] == "done" and snap['progress'] == 1.0
+    assert abs(snap['produced_kg'] - 0.5 * extrusion_runner.YIELD) < 1e-9
+    assert abs(sum(s['output_kg'] for s in snap['log']) - snap['produced_kg']) < 1e-9
+    oee = snap['oee']
+    running = sum(s['state'] == "running" for s in snap['log'])
+    assert abs(oee['availability'] - running / len(snap['log']) * 100) < 1e-9
+    assert 0 < oee['performance'] <= 102 and 0 < oee['quality'] <= 100
+    assert abs(oee['oee'] - oee['availability'] * oee['performance'] * oee['quality'] / 1e4) < 1e-9
+    print(f"   {len(snap['log'])} min simulated, OEE {oee['oee']:.1f}%")
+
+    # 3. Long runs keep a bounded log and are cut off at MAX_RUN_MINUTES
+    print("3. Bounded run log...")
+    run = extrusion_runner.ExtrusionRun(255, 50, 15.0, seconds_per_sample=0, seed=3)
+    run.run()
+    snap = run.snapshot()
+    assert snap['status'] == "done" and abs(snap['produced_kg'] - 15.0 * extrusion_runner.YIELD) < 1e-9
+    assert len(snap['log']) == extrusion_runner.LOG_SAMPLES
+    assert snap['log'][-1]['minute'] > extrusion_runner.LOG_SAMPLES
+    assert [s['minute'] for s in run.snapshot(tail=5)['log']] == [s['minute'] for s in snap['log'][-5:]]
+
+    jam_probability = extrusion_runner.JAM_PROBABILITY
+    extrusion_runner.JAM_PROBABILITY = 1.0  # the line never gets to run
+    try:
+        run = extrusion_runner.ExtrusionRun(255, 50, 1.0, seconds_per_sample=0, seed=3)
+        run.run()
+    finally:
+        extrusion_runner.JAM_PROBABILITY = jam_probability
+    snap = run.snapshot(tail=1)
+    assert snap['status'] == "stopped" and snap['log'][-1]['minute'] == extrusion_runner.MAX_RUN_MINUTES
+
+    # 4. Background runs finish and are reachable by id
+    print("4. Background run...")
+    run_id = extrusion_runner.start_run(255, 50, 0.2, seconds_per_sample=0, seed=1)
+    deadline = time.time() + 5
+    while extrusion_runner.get_run(run_id).is_active and time.time() < deadline:
+        time.sleep(0.01)
+    assert extrusion_runner.get_run(run_id).status == "done"
+
+    print("\nExtrusion Runner Verified! ✅")
+
+if __name__ == "__main__":
+    test_extrusion_runner()
@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from modules import job_runner
+
+def wait_for(job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = job_runner.get_job(job_id)
+        if job['status'] not in ('queued', 'running'):
+            return job
+        time.sleep(0.02)
+    raise AssertionError("Job did not finish in time")
+
+def test_job_runner():
+    print("Testing Background Job Runner...")
+
+    job_runner.JOBS_DB = os.path.join(tempfile.mkdtemp(), "jobs.db")
+    job_runner.init_jobs_db()
+
+    release = threading.Event()
+
+    def slow_report(params, progress):
+        progress(0.5, "Setengah jalan")
+        release.wait(5)
+        return f"laporan {params['petugas']}".encode(), "laporan.txt", "text/plain"
+
+    def broken_report(params, progress):
+        raise RuntimeError("disk penuh")
+
+    job_runner.register_job("test_slow", slow_report)
+    job_runner.register_job("test_broken", broken_report)
+
+    # 1. Identical in-flight jobs are deduplicated
+    print("1. Deduplicating identical jobs...")
+    first = job_runner.submit("test_slow", {"petugas": "Andi"}, owner="Andi")
+    second = job_runner.submit("test_slow", {"petugas": "Andi"}, owner="Andi")
+    other = job_runner.submit("test_slow", {"petugas": "Budi"}, owner="Budi")
+    assert first == second, "Same kind & params should share one job"
+    assert first != other
+
+    # 2. Results are stored for download
+    print("2. Storing results...")
+    release.set()
+    assert wait_for(first)['status'] == 'done'
+    data, file_name, mime = job_runner.get_result(first, "Andi")
+    assert data == b"laporan Andi" and file_name == "laporan.txt"
+    assert [j['id'] for j in job_runner.list_jobs(owner="Budi")] == [other]
+
+    # Only the submitter gets the result, and owners never share a job
+    assert job_runner.get_result(first, "Budi") is None
+    assert job_runner.get_result(first, None) is None
+    release.clear()
+    andi_job = job_runner.submit("test_slow", {"petugas": "Andi"}, owner="Andi")
+    budi_job = job_runner.submit("test_slow", {"petugas": "Andi"}, owner="Budi")
+    assert budi_job != andi_job
+    release.set()
+    wait_for(andi_job)
+    wait_for(budi_job)
+    assert job_runner.get_result(budi_job, "Budi")[0] == b"laporan Andi"
+
+    # 3. A finished job no longer blocks a fresh run
+    third = job_runner.submit("test_slow", {"petugas": "Andi"}, owner="Andi")
+    assert third not in (first, andi_job)
+    wait_for(third)
+
+    # 4. Failures are recorded
+    print("3. Recording failures...")
+    failed = wait_for(job_runner.submit("test_broken"))
+    assert failed['status'] == 'failed' and "disk penuh" in failed['error']
+
+    # 5. A new process only fails jobs whose owner is gone
+    print("4. Orphaned jobs across processes...")
+    live = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    now = time.time()
+    conn = job_runner.get_connection()
+    for job_id, pid, beat in [("live", live.pid, now), ("dead", dead.pid, now),
+                              ("silent", live.pid, now - job_runner.STALE_AFTER_SECONDS - 1)]:
+        conn.execute("INSERT INTO jobs (id, kind, job_key, status, created_at, worker_pid, heartbeat_at) "
+                     "VALUES (?, 'test_slow', ?, 'running', ?, ?, ?)", (job_id, job_id, now, pid, beat))
+    conn.commit()
+    conn.close()
+    try:
+        job_runner.init_jobs_db()  # e.g. check_db.py starting next to the app
+        assert job_runner.get_job("live")['status'] == 'running', "Jobs of a live worker are left alone"
+        assert job_runner.get_job("dead")['status'] == 'failed'
+        assert job_runner.get_job("silent")['status'] == 'failed'
+    finally:
+        live.kill()
+
+    print("\nJob Runner Verified! ✅")
+
+if __name__ == "__main__":
+    test_job_runner()
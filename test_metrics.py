@@ -0,0 +1,140 @@
+import gc
+import os
+import sqlite3
+import tempfile
+import threading
+import tracemalloc
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+from modules import metrics, profiler, session_memory
+
+def test_metrics_registry():
+    print("Testing Metrics Instrumentation...")
+    metrics.reset()
+
+    # 1. Statements are fingerprinted and timed through the connection factory
+    print("1. Timing SQL through TimedConnection...")
+    conn = sqlite3.connect(":memory:", factory=metrics.TimedConnection)
+    conn.execute("CREATE TABLE t (a INTEGER)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(100)])
+    for i in range(3):
+        conn.execute(f"SELECT a FROM t WHERE a IN ({i}, {i + 1})").fetchall()
+    conn.close()
+
+    assert metrics.fingerprint("SELECT a FROM t WHERE a IN (1, 2)") == "SELECT a FROM t WHERE a IN (...)"
+    queries = metrics.summary("sql_query_seconds").set_index("query")
+    assert queries.loc["SELECT a FROM t WHERE a IN (...)", "count"] == 3
+    assert metrics.counter_value("sql_rows_total", query="SELECT a FROM t WHERE a IN (...)") == 6
+    assert metrics.counter_value("sql_rows_total", query="INSERT INTO t VALUES (...)") == 100
+
+    # 2. Timers record even when the block raises (st.rerun does)
+    print("2. Page timers...")
+    try:
+        with metrics.timer("page_render_seconds", page="Dashboard"):
+            raise RuntimeError("rerun")
+    except RuntimeError:
+        pass
+    assert metrics.summary("page_render_seconds")['count'].tolist() == [1]
+
+    # 3. Prometheus text export
+    print("3. Prometheus exposition...")
+    path = os.path.join(tempfile.mkdtemp(), "metrics.prom")
+    metrics.write_prometheus(path)
+    text = open(path).read()
+    assert "# TYPE page_render_seconds histogram" in text
+    assert 'page_render_seconds_bucket{page="Dashboard",le="+Inf"} 1' in text
+    assert 'sql_rows_total{query="INSERT INTO t VALUES (...)"} 100' in text
+
+    # Concurrent sessions flushing at once never trip over a shared temp file
+    errors = []
+    def flush_many():
+        for _ in range(100):
+            try:
+                metrics.write_prometheus(path)
+            except OSError as e:
+                errors.append(e)
+    workers = [threading.Thread(target=flush_many) for _ in range(4)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    assert not errors and os.listdir(os.path.dirname(path)) == ["metrics.prom"]
+
+    # A failed flush is counted, not raised into the page
+    metrics.METRICS_FILE = os.path.join(path, "not-a-dir", "metrics.prom")
+    metrics._last_flush = 0.0
+    metrics.maybe_flush()
+    assert metrics.counter_value("metrics_flush_errors_total") == 1
+    metrics.METRICS_FILE = path
+
+    # 4. Per-user profiling writes rotating pstats/tracemalloc files
+    print("4. Profiling mode...")
+    profiler.PROFILE_DIR = tempfile.mkdtemp()
+    profiler.MAX_PROFILES = 2
+    with profiler.profile_render("Dashboard", "andi@x.com"):
+        sum(range(1000))
+    assert profiler.list_profiles().empty
+    profiler.enable("Andi@x.com", memory=True)
+    for _ in range(3):
+        with profiler.profile_render("Dashboard", "andi@x.com"):
+            sorted(str(i) for i in range(10000))
+    profiler.disable("andi@x.com")
+    profiles = profiler.list_profiles()
+    assert len(profiles) == 2 and profiles['memory'].all()
+    assert not profiler.top_functions(profiles['stem'][0]).empty
+    assert not profiler.top_allocations(profiles['stem'][0]).empty
+
+    # Overlapping memory-profiled renders share one trace: the first to finish
+    # must not stop tracing under the other
+    profiler.enable("andi@x.com", memory=True)
+    profiler.enable("budi@x.com", memory=True)
+    first = profiler.profile_render("Dashboard", "andi@x.com")
+    second = profiler.profile_render("Laporan", "budi@x.com")
+    first.__enter__()
+    second.__enter__()
+    first.__exit__(None, None, None)
+    assert tracemalloc.is_tracing()
+    second.__exit__(None, None, None)  # used to raise: snapshot of a stopped trace
+    assert not tracemalloc.is_tracing()
+    profiler.disable("andi@x.com")
+    profiler.disable("budi@x.com")
+    assert profiler.list_profiles()['memory'].all()
+
+    print("\nMetrics Verified! ✅")
+
+def test_session_memory_accounting():
+    print("Testing session-state accounting...")
+    state = {
+        "prediction_sim_data": pd.DataFrame({"x": range(50000)}),
+        "user_info": {"email": "andi@x.com"},
+    }
+    sizes = session_memory.usage(state)
+    assert list(sizes) == ["prediction_sim_data", "user_info"]
+    assert sizes["prediction_sim_data"] >= 400000
+
+    # The registry outlives the per-run SafeSessionState wrapper and only
+    # records sizes: tracking never removes anything from the session
+    session_memory.reset()
+    at = AppTest.from_function(_tracked_page).run()
+    at.run()
+    gc.collect()
+    sessions = session_memory.top_sessions()
+    assert len(sessions) == 1, "Session survives a rerun in the registry"
+    assert sessions["Pengguna"][0] == "andi@x.com" and not sessions["Di Atas Batas"][0]
+    assert set(session_memory.session_keys(sessions["Sesi"][0])) == {"prediction_sim_data", "user_info"}
+    assert "prediction_sim_data" in at.session_state and "user_info" in at.session_state
+
+    print("\nSession Memory Verified! ✅")
+
+def _tracked_page():
+    import streamlit as st
+    import pandas as pd
+    from modules import session_memory
+    if "prediction_sim_data" not in st.session_state:
+        st.session_state.prediction_sim_data = pd.DataFrame({"x": range(1000)})
+    st.session_state.user_info = {"email": "andi@x.com"}
+    session_memory.track()
+
+if __name__ == "__main__":
+    test_metrics_registry()
+    test_session_memory_accounting()
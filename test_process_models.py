@@ -0,0 +1,55 @@
+import time
+import numpy as np
+from modules import process_models
+
+def test_process_models():
+    print("Testing Process Model Library...")
+
+    # 1. Single scenarios reproduce the page defaults
+    print("1. Scalar scenarios...")
+    pyro = process_models.pyrolysis(100, 400)
+    assert abs(pyro['output_oil_liters'] - 60 / 0.85) < 1e-9 and abs(pyro['profit'] - (60 / 0.85 * 12000 + 40000 - 200000)) < 1e-6
+    assert process_models.pyrolysis(100, 460)['yield_gas_pct'] == 0.2 + 0.6 * 0.4
+    compost = process_models.compost(1000)
+    assert compost['total_revenue'] == 2_500_000 and abs(compost['hpp_per_kg'] - (1_100_000 + 40_000_000 / 60 / 4) / 500) < 1e-9
+    assert process_models.maggot(50)['fcr'] == 5.0 and process_models.maggot(0)['fcr'] == 0.0
+    assert abs(process_models.upcycling(1.0)['added_value'] - (0.95 * 150000 - 5500)) < 1e-9
+    assert isinstance(pyro['roi'], float)
+
+    # 2. Array parameters match scenario-by-scenario evaluation
+    print("2. Vectorized vs. scalar...")
+    kg = np.array([0.0, 80.0, 250.0, 900.0])
+    temp = np.array([320, 380, 450, 480])
+    batch = process_models.pyrolysis(kg, temp, price_oil=np.array([9000, 12000, 12000, 15000]))
+    for i in range(len(kg)):
+        single = process_models.pyrolysis(kg[i], temp[i], price_oil=[9000, 12000, 12000, 15000][i])
+        for key, value in single.items():
+            assert abs(batch[key][i] - value) < 1e-9, key
+
+    # 3. Sweeps cover the full grid and fill in defaults
+    print("3. Scenario sweep...")
+    grid = process_models.sweep('compost', input_waste_kg=np.arange(100, 2001, 100), ratio_liquid=range(0, 51, 5),
+                                price_solid=[2000, 2500, 3000])
+    assert len(grid) == 20 * 11 * 3
+    row = grid[(grid.input_waste_kg == 1000) & (grid.ratio_liquid == 10) & (grid.price_solid == 2500)].iloc[0]
+    assert abs(row['net_profit'] - compost['net_profit']) < 1e-6
+    try:
+        process_models.evaluate('maggot', {'waste': [1, 2]})
+        assert False, "Unknown parameters are rejected"
+    except ValueError:
+        pass
+
+    # 4. Thousands of scenarios per call in milliseconds
+    print("4. Throughput...")
+    rng = np.random.default_rng(0)
+    scenarios = {'input_plastic_kg': rng.uniform(50, 1000, 100_000), 'target_temp': rng.uniform(300, 500, 100_000)}
+    start = time.perf_counter()
+    table = process_models.evaluate('pyrolysis', scenarios)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"   100,000 scenarios in {elapsed_ms:.1f} ms")
+    assert len(table) == 100_000 and elapsed_ms < 500
+
+    print("\nProcess Model Library Verified! ✅")
+
+if __name__ == "__main__":
+    test_process_models()
@@ -0,0 +1,76 @@
+import time
+import numpy as np
+from modules import route_planner
+
+def test_route_planner():
+    print("Testing Pickup Route Planner...")
+
+    # 1. Grid neighbours match a brute-force search, also for clustered points
+    print("1. Spatial grid nearest neighbours...")
+    rng = np.random.default_rng(5)
+    xy = rng.uniform(0, 20, (1500, 2))
+    xy[:400] *= 0.05
+    grid = route_planner.SpatialGrid(xy)
+    for i in range(0, len(xy), 29):
+        d = np.hypot(*(xy - xy[i]).T)
+        d[i] = np.inf
+        found = np.hypot(*(xy[grid.nearest(i, 10)] - xy[i]).T)
+        assert np.allclose(np.sort(d)[:10], found)
+
+    # Points without 2-D extent (same latitude, duplicates) keep the grid small
+    line = np.column_stack([np.linspace(0, 30, 200), np.zeros(200)])
+    for points in (line, np.zeros((50, 2)), np.array([[0.0, 0.0], [0.0, 0.0], [4.0, 0.0]])):
+        grid = route_planner.SpatialGrid(points)
+        assert max(grid.span) <= len(points)
+        for i in range(len(points)):
+            d = np.hypot(*(points - points[i]).T)
+            d[i] = np.inf
+            k = min(5, len(points) - 1)
+            assert np.allclose(np.sort(d)[:k], np.hypot(*(points[grid.nearest(i, 5)] - points[i]).T))
+    same_lat = route_planner.pd.DataFrame({'Lat': [-6.92, -6.92, -6.87], 'Lon': [107.60, 107.62, 107.57],
+                                           'KG': [40.0, 60.0, 30.0]})
+    start = time.perf_counter()
+    tiny = route_planner.plan_routes(same_lat, 300)
+    assert time.perf_counter() - start < 2.0
+    assert sorted(s for stops in tiny['routes']['Mitra'] for s in stops) == [0, 1, 2] and tiny['trips'] == 2
+
+    # 2. Every stop is served once, within capacity, shorter than one trip per stop
+    print("2. Capacitated routes...")
+    partners = route_planner.synthetic_partners(300, 25, seed=11)
+    partners.loc[0, 'KG'] = 700  # two full direct trips plus a remainder
+    plan = route_planner.plan_routes(partners, 300)
+    routes = plan['routes']
+    visits = sorted(s for stops in routes['Mitra'] for s in stops)
+    assert visits == sorted([*range(len(partners)), 0, 0])
+    assert (routes['Muatan_KG'] <= 300 + 1e-9).all()
+    assert abs(routes['Muatan_KG'].sum() - partners['KG'].sum()) < 1e-6
+    assert plan['trips'] >= np.ceil(partners['KG'].sum() / 300)
+    origin = np.mean(list(route_planner.UNIT_LOCATIONS.values()), axis=0)
+    star_km = 0.0
+    for unit, stops in routes.groupby('Unit')['Mitra']:
+        depot = route_planner.to_km(*route_planner.UNIT_LOCATIONS[unit], origin)
+        members = [s for trip in stops for s in trip]
+        stop_xy = route_planner.to_km(partners['Lat'].iloc[members], partners['Lon'].iloc[members], origin)
+        star_km += 2 * np.hypot(*(stop_xy - depot).T).sum() * route_planner.ROAD_FACTOR
+    assert plan['km'] < 0.5 * star_km
+    assert route_planner.plan_routes(partners, 300) is plan
+
+    # 3. Local search never lengthens the savings routes
+    print("3. 2-opt / or-opt improvement...")
+    savings_only = route_planner.plan_routes(partners, 300, time_limit=0.0)
+    assert plan['km'] <= savings_only['km'] + 1e-9
+
+    # 4. Thousands of stops stay within the time limit
+    print("4. 5000 partner stops...")
+    large = route_planner.synthetic_partners(5000, 20, seed=2)
+    start = time.perf_counter()
+    big = route_planner.plan_routes(large, 500, time_limit=1.0)
+    elapsed = time.perf_counter() - start
+    print(f"   {big['trips']} trips, {big['km']:,.0f} km in {elapsed:.2f} s")
+    assert sum(len(stops) for stops in big['routes']['Mitra']) == 5000
+    assert elapsed < 5.0
+
+    print("\nRoute Planner Verified! ✅")
+
+if __name__ == "__main__":
+    test_route_planner()
@@ -0,0 +1,65 @@
+import datetime
+import numpy as np
+from modules import price_service, scenario_store
+from conftest import use_workdir
+
+def test_scenario_store(workdir):
+    print("Testing Saved Scenario Store...")
+
+    # 1. Scenarios round-trip as aligned vectors over the union of categories
+    print("1. Save and load...")
+    old = {"Paper": {"buy": 2000, "sell": 2800}, "Cans": {"buy": 9000, "sell": 13000}}
+    new = {"Paper": {"buy": 2100, "sell": 3000}, "Cans": {"buy": 9800, "sell": 14000}, "Cloth": {"buy": 1000, "sell": 1500}}
+    andi = "andi@x.com"
+    scenario_store.save("Kertas", {"Paper": 100.0}, {"Paper": 2000}, {"Paper": 2800}, owner=andi, created_by="Andi")
+    scenario_store.save("Campuran", {"Paper": 50.0, "Cans": 10.5}, {"Paper": 2000, "Cans": 9000},
+                        {"Paper": 2800, "Cans": 13000}, source="prediction", owner=andi)
+    try:
+        scenario_store.save("Kertas", {"Paper": 120.0}, {"Paper": 2000}, {"Paper": 2800}, owner=andi)
+        assert False, "Saving over an existing name needs overwrite=True"
+    except ValueError:
+        pass
+    scenario_store.save("Kertas", {"Paper": 120.0}, {"Paper": 2000}, {"Paper": 2800}, owner=andi, overwrite=True)
+    meta, categories, weights, buy, sell = scenario_store.load()
+    assert list(meta['Skenario']) == ["Campuran", "Kertas"]
+    assert categories == ["Paper", "Cans"]
+    assert weights.tolist() == [[50.0, 10.5], [120.0, 0.0]]
+    try:
+        scenario_store.save("  ", {"Paper": 1.0}, {}, {})
+        assert False, "Empty names are rejected"
+    except ValueError:
+        pass
+
+    # 2. Re-pricing against saved, current and historical prices
+    print("2. Re-pricing...")
+    saved = scenario_store.reprice(weights, buy, sell)
+    assert saved['Profit'].tolist() == [50 * 800 + 10.5 * 4000, 120 * 800]
+    current = scenario_store.reprice(weights, *scenario_store.price_vectors(new, categories))
+    assert current['Pendapatan'].tolist() == [50 * 3000 + 10.5 * 14000, 120 * 3000]
+
+    price_service.record_history(old, datetime.datetime(2026, 1, 1))
+    price_service.record_history(new, datetime.datetime(2026, 3, 1))
+    assert not price_service.record_history(new, datetime.datetime(2026, 4, 1)), "Unchanged prices are not stored again"
+    assert price_service.prices_at(datetime.date(2026, 2, 15)) == old
+    assert price_service.prices_at(datetime.date(2026, 3, 1)) == new
+    assert price_service.prices_at(datetime.date(2025, 12, 1)) == old
+
+    profits = scenario_store.profit_history(weights, categories)
+    for j, (_, prices) in enumerate(price_service.price_history()):
+        b, s = scenario_store.price_vectors(prices, categories)
+        assert np.allclose(profits.iloc[:, j], scenario_store.reprice(weights, b, s)['Profit'])
+
+    # 3. Names are per owner; only the owner or an admin deletes
+    print("3. Ownership and delete...")
+    scenario_store.save("Kertas", {"Paper": 5.0}, {"Paper": 2000}, {"Paper": 2800}, owner="budi@x.com", created_by="Budi")
+    meta = scenario_store.load()[0]
+    assert list(zip(meta['Skenario'], meta['Pemilik'])) == [("Campuran", andi), ("Kertas", andi), ("Kertas", "budi@x.com")]
+    assert scenario_store.delete([(andi, "Kertas")], "budi@x.com") == 0
+    assert scenario_store.delete([(andi, "Kertas")], andi) == 1
+    assert scenario_store.delete([("budi@x.com", "Kertas")], "admin@x.com", admin=True) == 1
+    assert list(scenario_store.load()[0]['Skenario']) == ["Campuran"]
+
+    print("\nScenario Store Verified! ✅")
+
+if __name__ == "__main__":
+    test_scenario_store(use_workdir(setattr))
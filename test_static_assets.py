@@ -0,0 +1,35 @@
+import os
+import glob
+from modules import static_assets
+
+def test_static_assets():
+    print("Testing Static Asset Pipeline...")
+
+    # 1. One minified stylesheet carries every page's rules
+    print("1. Stylesheet bundle...")
+    css = static_assets.stylesheet()
+    assert css.startswith("<style>") and css.endswith("</style>")
+    for selector in (".metric-card{", ".metric-box{", ".login-container{", ".stButton>button:hover{", ".main .block-container{"):
+        assert selector in css, selector
+    assert "/*" not in css and "\n" not in css
+    assert static_assets.stylesheet() is css, "Bundle is read once per process"
+    print(f"   {os.path.getsize(static_assets.path(static_assets.STYLESHEET))} B source -> {len(css)} B injected")
+
+    # 2. Pages no longer carry inline <style> blocks or remote images
+    print("2. No inline styles / remote images...")
+    for source in ["app.py", *glob.glob("modules/*.py")]:
+        with open(source, encoding="utf-8") as f:
+            text = f.read()
+        assert "<style>" not in text or source.endswith("static_assets.py"), source
+        assert "icons8.com" not in text, source
+
+    # 3. Versioned URLs and the guide fallback
+    print("3. Asset URLs...")
+    url = static_assets.url(static_assets.LOGO)
+    assert url.startswith("app/static/recycle.svg?v=") and url == static_assets.url(static_assets.LOGO)
+    assert os.path.exists(static_assets.guide_image())
+
+    print("\nStatic Asset Pipeline Verified! ✅")
+
+if __name__ == "__main__":
+    test_static_assets()
@@ -0,0 +1,129 @@
+import os
+import sqlite3
+import threading
+import time
+from modules import auth_db, unit_store, analytics_engine, replica
+from conftest import make_transaction, use_workdir
+
+def test_partitioned_storage(workdir):
+    print("Testing Per-Unit Partitioning...")
+
+    # 1. Legacy rows in users.db are moved into unit partitions
+    print("1. Migrating legacy single-file transactions...")
+    conn = sqlite3.connect(auth_db.DB_FILE)
+    conn.execute(unit_store.TRANSACTIONS_DDL)
+    conn.execute("INSERT INTO transactions (tanggal, petugas, lokasi, burnable, total_paid) VALUES ('2026-01-01', 'Andi', 'Unit Satelit 2', 4.0, 560)")
+    conn.execute("INSERT INTO transactions (tanggal, petugas, lokasi, burnable, total_paid) VALUES ('2026-01-01', 'Andi', NULL, 1.0, 140)")
+    conn.execute("INSERT INTO transactions (tanggal, petugas, lokasi, burnable, total_paid) VALUES ('2026-01-02', 'Budi', 'Unit Satelit 2', 2.5, 350)")
+    conn.commit()
+    conn.close()
+    unit_conn = unit_store.get_unit_connection("Unit Satelit 2")
+    with unit_conn:
+        # An earlier run was interrupted after copying legacy row 1 but before deleting it
+        unit_conn.execute("INSERT INTO transactions (id, tanggal, petugas, lokasi, burnable, total_paid) VALUES (1, '2026-01-01', 'Andi', 'Unit Satelit 2', 4.0, 560)")
+        # ...and an older process already wrote a different row under legacy row 3's id
+        unit_conn.execute("INSERT INTO transactions (id, tanggal, petugas, lokasi, burnable, total_paid) VALUES (3, '2026-01-03', 'Citra', 'Unit Satelit 2', 9.0, 1260)")
+    unit_conn.close()
+
+    auth_db.init_db()
+    assert os.path.exists(unit_store.partition_path("Unit Satelit 2"))
+    conn = sqlite3.connect(auth_db.DB_FILE)
+    assert conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == 0
+    conn.close()
+    unit_conn = unit_store.get_unit_connection("Unit Satelit 2")
+    rows = unit_conn.execute("SELECT id, petugas, burnable FROM transactions ORDER BY id").fetchall()
+    assert rows == [(1, 'Andi', 4.0), (3, 'Citra', 9.0), (4, 'Budi', 2.5)], "Copied once; a taken id gets a new one"
+    with unit_conn:
+        unit_conn.execute("DELETE FROM transactions WHERE petugas != 'Andi'")  # keep the totals below simple
+    unit_conn.close()
+
+    # 2. Each unit writes to its own file, new units are discovered
+    print("2. Writing to separate partitions...")
+    assert auth_db.save_transaction(make_transaction("Unit Pusat", "Andi", 2.0, 1.0, 2380))
+    assert auth_db.save_transaction(make_transaction("Unit Satelit 3", "Budi", 3.0, 0.0, 420))
+    assert "Unit Satelit 3" in unit_store.list_units()
+
+    # 3. Fan-out reads merge every unit
+    print("3. Fan-out aggregation...")
+    df = auth_db.get_all_transactions()
+    assert len(df) == 4
+    assert set(df['Lokasi']) == {"Unit Pusat", "Unit Satelit 2", "Unit Satelit 3"}
+    assert str(df['Lokasi'].dtype) == 'category'
+    assert df['Burnable'].dtype == 'float32' and df['Total_Bayar_Nasabah'].dtype == 'int32'
+    assert str(df['Tanggal'].dtype).startswith('datetime64')
+
+    totals = auth_db.get_category_totals(petugas_filter="Andi")
+    assert totals['Jumlah_Transaksi'] == 3
+    assert abs(totals['Burnable'] - 7.0) < 1e-9
+    assert totals['Total_Bayar_Nasabah'] == 560 + 140 + 2380
+
+    daily = auth_db.get_daily_totals()
+    assert list(daily['Berat (kg)']) == [5.0, 6.0]
+
+    # 4. Customer master and savings ledger follow every deposit
+    print("4. Nasabah balance and ledger...")
+    assert auth_db.save_transaction(make_transaction("Unit Pusat", "Andi", 1.0, 0.0, 140))
+    siti = auth_db.get_nasabah("Unit Pusat", "  bu   SITI ")
+    assert siti['saldo'] == 2380 + 140 and siti['jumlah_transaksi'] == 2
+    ledger = auth_db.get_nasabah_ledger("Unit Pusat", siti['id'])
+    assert ledger['Saldo'].tolist() == [2520, 2380]
+
+    # Rows written before the master existed are linked on startup
+    conn = unit_store.get_unit_connection("Unit Satelit 2")
+    conn.execute("INSERT INTO transactions (tanggal, nasabah, lokasi, total_kg, total_paid) VALUES ('2026-01-02', 'Pak Budi', 'Unit Satelit 2', 2.0, 300)")
+    conn.commit()
+    conn.close()
+    unit_store.init_partitions()
+    assert auth_db.get_nasabah("Unit Satelit 2", "pak budi")['saldo'] == 300
+
+    # 5. Autocomplete: prefix, RT/RW tag and typo-tolerant lookups
+    print("5. Nasabah search...")
+    tx = make_transaction("Unit Pusat", "Andi", 1.0, 0.0, 140)
+    tx["Nasabah"] = "Pak Bambang Sutrisno rt.5/rw 2"
+    assert auth_db.save_transaction(tx)
+    assert auth_db.search_nasabah("Unit Pusat", "si")[0]['nama'] == "Bu Siti"
+    assert auth_db.search_nasabah("Unit Pusat", "RT 05")[0]['rt_rw'] == "RT 05 RW 02"
+    assert auth_db.search_nasabah("Unit Pusat", "bambng sutrsno")[0]['nama'].startswith("Pak Bambang")
+    assert auth_db.search_nasabah("Unit Satelit 1", "siti") == []
+    # Cached trigram counts don't hide a customer registered afterwards
+    assert auth_db.search_nasabah("Unit Pusat", "wulandri") == []
+    tx["Nasabah"] = "Bu Wulandari"
+    assert auth_db.save_transaction(tx)
+    assert auth_db.search_nasabah("Unit Pusat", "wulandri")[0]['nama'] == "Bu Wulandari"
+
+    # 6. Report reads go to a snapshot that lags the counter until refreshed
+    print("6. Read replica snapshots...")
+    os.environ[analytics_engine.ENV_VAR] = "sqlite"  # exercise the SQLite fan-out
+    replica.ENABLED = True
+    assert replica.staleness() is None
+    for lokasi in unit_store.list_units():
+        assert replica.refresh(lokasi) > 0
+    rows = len(unit_store.read_frames("SELECT id FROM transactions"))
+    assert replica.staleness() is not None
+    assert auth_db.save_transaction(make_transaction("Unit Pusat", "Andi", 1.0, 0.0, 140))
+    assert len(unit_store.read_frames("SELECT id FROM transactions")) == rows
+    replica.refresh("Unit Pusat")
+    assert len(unit_store.read_frames("SELECT id FROM transactions")) == rows + 1
+    # A refresh completes while the counter keeps saving
+    stop = threading.Event()
+    def keep_saving():
+        while not stop.is_set():
+            auth_db.save_transaction(make_transaction("Unit Pusat", "Andi", 1.0, 0.0, 140))
+    writer = threading.Thread(target=keep_saving)
+    writer.start()
+    try:
+        time.sleep(0.05)
+        assert replica.refresh("Unit Pusat") > 0
+    finally:
+        stop.set()
+        writer.join()
+    assert len(unit_store.read_frames("SELECT id FROM transactions", units=["Unit Pusat"])) > 0
+    replica.invalidate("Unit Pusat")
+    assert replica.staleness() is None
+    replica.ENABLED = False
+    del os.environ[analytics_engine.ENV_VAR]
+
+    print("\nPartitioned Storage Verified! ✅")
+
+if __name__ == "__main__":
+    test_partitioned_storage(use_workdir(setattr))
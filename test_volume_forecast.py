@@ -0,0 +1,54 @@
+import datetime
+import numpy as np
+from modules import auth_db, volume_forecast
+from conftest import make_transaction, use_workdir
+
+def test_holt_winters_forecast(workdir):
+    print("Testing Holt-Winters Volume Forecast...")
+
+    # 1. A weekly pattern with a slow trend is forecast within its interval
+    print("1. Weekly seasonal series...")
+    rng = np.random.default_rng(7)
+    days = np.arange(400)
+    pattern = np.array([1.0, 1.1, 0.9, 1.0, 1.2, 1.6, 0.2])
+    y = (100 + 0.05 * days) * pattern[days % 7] + rng.normal(0, 3, len(days))
+    series = np.column_stack([y, 2 * y])
+    state = volume_forecast.fit(series[:-28])
+    mean, day_sd, total_sd = volume_forecast.forecast(state, 28)
+    assert np.all(np.abs(mean - series[-28:]) < 4 * day_sd)
+    assert abs(mean[:, 0].sum() - y[-28:].sum()) < volume_forecast.INTERVAL_Z * total_sd[0]
+    assert np.all(day_sd[1:] >= day_sd[:-1] - 1e-12), "Uncertainty grows with the horizon"
+
+    # 2. Extending a fit over new days equals running the recursion over everything
+    print("2. Incremental update...")
+    extended = volume_forecast.extend(volume_forecast.fit(series[:-10]), series[-10:])
+    full = volume_forecast._recurse(series, 0, extended['alpha'], extended['beta'], extended['gamma'],
+                                    *volume_forecast._initial_state(series))
+    assert np.allclose(extended['level'], full[0]) and np.allclose(extended['season'], full[2])
+
+    # 3. Fits are cached per data version and follow new transactions
+    print("3. Cached fit from the rollups...")
+    auth_db.init_db()
+    today = datetime.date.today()
+    for back in range(1, 43):
+        tx = make_transaction("Unit Pusat", "Andi", 2.0 + (back % 7 == 0), 1.0, 420)
+        tx["Tanggal"] = today - datetime.timedelta(days=back)
+        assert auth_db.save_transaction(tx)
+    prices = {"Burnable": {"buy": 140, "sell": 300}, "Paper": {"buy": 2100, "sell": 3000}}
+    state = volume_forecast.get_fit(prices=prices)
+    assert state['days'] == 42 and abs(state['history'][:, state['columns'].index("Pendapatan")].sum() - 42 * 3600 - 6 * 300) < 1e-6
+    assert volume_forecast.get_fit(prices=prices) is state
+
+    tx = make_transaction("Unit Pusat", "Andi", 5.0, 0.0, 700)
+    tx["Tanggal"] = today - datetime.timedelta(days=3)
+    auth_db.save_transaction(tx)
+    volume_forecast.rollup_service.refresh(force=True)
+    refit = volume_forecast.get_fit(prices=prices)
+    assert refit is not state and refit['history'][-3, state['columns'].index("Burnable")] == 7.0
+    totals = volume_forecast.horizon_totals(refit, 30).set_index('Seri')
+    assert (totals['Bawah'] <= totals['Prediksi']).all() and (totals['Prediksi'] <= totals['Atas']).all()
+
+    print("\nVolume Forecast Verified! ✅")
+
+if __name__ == "__main__":
+    test_holt_winters_forecast(use_workdir(setattr))